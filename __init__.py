@@ -13,7 +13,6 @@
 #    (see compositor refresh, perhaps it's because of node.update()?? need to investigate)
 #  - Finalize NexScript for Shader/compositor. Need to overview functions..
 #  - Codebase review for extension.. Ask AI to do a big check.
-#  - Velocity Node: Better history calculations just doing last middle first is not precise enough. 
 #  - Experiment with custom Socket Types:
 #     - For this to work in geometry node, we'll need this PR to get accepted 
 #       https://projects.blender.org/blender/blender/pulls/136968
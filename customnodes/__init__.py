@@ -65,6 +65,9 @@ from . objectvelocity import (
         NODEBOOSTER_NG_SH_ObjectVelocity,
         NODEBOOSTER_NG_CP_ObjectVelocity,
         )
+from . collectionvelocity import (
+        NODEBOOSTER_NG_GN_CollectionVelocity,
+        )
 from . interpolation.interpolationinput import (
         NODEBOOSTER_OT_interpolation_input_update,
         NODEBOOSTER_NG_GN_InterpolationInput,
@@ -117,6 +120,7 @@ GN_CustomNodes = (
             NODEBOOSTER_NG_GN_CameraInfo,
             None, #separator
             NODEBOOSTER_NG_GN_ObjectVelocity,
+            NODEBOOSTER_NG_GN_CollectionVelocity, #this one doesn't make sense in other editors.
             NODEBOOSTER_NG_GN_DeviceInput,
             NODEBOOSTER_NG_GN_IsRenderedView, #this one doesn't make sense in other editors.
             NODEBOOSTER_NG_GN_SequencerSound,
@@ -253,6 +257,7 @@ classes = (
     NODEBOOSTER_NG_GN_ObjectVelocity,
     NODEBOOSTER_NG_SH_ObjectVelocity,
     NODEBOOSTER_NG_CP_ObjectVelocity,
+    NODEBOOSTER_NG_GN_CollectionVelocity,
     NODEBOOSTER_NG_GN_InterpolationInput,
     NODEBOOSTER_NG_SH_InterpolationInput,
     NODEBOOSTER_NG_CP_InterpolationInput,
@@ -0,0 +1,306 @@
+# SPDX-FileCopyrightText: 2025 BD3D DIGITAL DESIGN (Dorian B.)
+#
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+# NOTE this node is the batched version of the Object Velocity node, for crowds, debris ect..
+# all objects of a collection are read in one foreach_get() call, their metrics are calculated
+# in vectorized numpy operations, then written as points attributes of a hidden buffer mesh
+# that geometry node can read with an Object Info node.
+
+# TODO
+# - support the 'Random Access' subframe mode of the Object Velocity node?
+
+
+import bpy
+import numpy as np
+
+from ..__init__ import get_addon_prefs
+from ..utils.str_utils import word_wrap
+from ..utils.nbr_utils import RingBuffer, polyfit_derivatives
+from ..utils.node_utils import (
+    create_new_nodegroup,
+    get_all_nodes,
+    link_sockets,
+)
+from .objectvelocity import HIST_FRAME, HIST_TIME, HIST_FRAMES
+
+
+DEBUG = False
+
+# Store the history of each collection {collection name: {'names':tuple, 'history':RingBuffer}}
+# The history rows are laid out as [frame, time, x0, y0, z0, x1, y1, z1, ..] for all objects of the collection.
+COLVELOCITIES = {}
+
+def calculate_collection_metrics(history:np.ndarray) -> tuple:
+    """Vectorized version of 'calculate_object_metrics()', for N objects at once.
+    Expects a chronological history array of rows [frame, time, x0, y0, z0, x1, ..].
+    Returns a tuple of arrays (directions (N,3), velocities (N,), accelerations (N,), stopping powers (N,))"""
+
+    count = (history.shape[1] - 2) // 3
+    directions = np.zeros((count, 3), dtype=np.float64)
+    zeros = np.zeros(count, dtype=np.float64)
+
+    if (len(history) < 2):
+        return directions, zeros, zeros, zeros
+
+    times = history[:,HIST_TIME]
+    if ((times[-1] - times[0]) <= 0):
+        return directions, zeros, zeros, zeros
+
+    # Fit the trajectories of all objects at once, evaluated at the newest sample.
+    velocities, accelerations = polyfit_derivatives(times, history[:,2:], degree=2)
+    velocities = velocities.reshape(count, 3)
+    accelerations = accelerations.reshape(count, 3)
+
+    speeds = np.linalg.norm(velocities, axis=1)
+    np.divide(velocities, speeds[:,None], out=directions, where=(speeds[:,None] > 0.0))
+
+    # The rate of change of the speed is the acceleration projected on the direction of travel.
+    speed_changes = np.einsum('ij,ij->i', accelerations, directions)
+
+    return directions, speeds, np.maximum(speed_changes, 0.0), np.maximum(-speed_changes, 0.0)
+
+def get_collection_locations(collection) -> tuple[tuple, np.ndarray]:
+    """get the world locations of all objects of a collection, in one batch.
+    Returns a tuple of (objects names, locations (N,3))"""
+
+    objs = collection.all_objects
+    count = len(objs)
+
+    matrices = np.empty(count * 16, dtype=np.float32)
+    objs.foreach_get('matrix_world', matrices)
+
+    # NOTE matrices are stored column-major, the translation is the 4th column.
+    locations = matrices.reshape(count, 4, 4)[:,3,:3].astype(np.float64)
+
+    return tuple(objs.keys()), locations
+
+def get_buffer_object(collection):
+    """get or create the hidden object storing the evaluated attributes of a collection"""
+
+    name = f".NodeBoosterCollectionVelocity|{collection.name}"
+    obj = bpy.data.objects.get(name)
+    if (obj is None):
+        obj = bpy.data.objects.new(name, bpy.data.meshes.new(name))
+    return obj
+
+def write_buffer_mesh(mesh, locations:np.ndarray, attributes:dict) -> None:
+    """write points and their attributes {name:values} on the given mesh, with foreach_set() batches.
+    (N,3) values are stored as vectors, (N,) values as floats."""
+
+    count = len(locations)
+    if (len(mesh.vertices) != count):
+        mesh.clear_geometry()
+        mesh.vertices.add(count)
+
+    mesh.vertices.foreach_set('co', locations.astype(np.float32).ravel())
+
+    for name, values in attributes.items():
+        is_vector = (values.ndim == 2)
+        attr = mesh.attributes.get(name)
+        if (attr is None):
+            attr = mesh.attributes.new(name, 'FLOAT_VECTOR' if is_vector else 'FLOAT', 'POINT')
+        attr.data.foreach_set('vector' if is_vector else 'value', values.astype(np.float32).ravel())
+        continue
+
+    mesh.update()
+    return None
+
+
+# ooooo      ooo                 .o8
+# `888b.     `8'                "888
+#  8 `88b.    8   .ooooo.   .oooo888   .ooooo.
+#  8   `88b.  8  d88' `88b d88' `888  d88' `88b
+#  8     `88b.8  888   888 888   888  888ooo888
+#  8       `888  888   888 888   888  888    .o
+# o8o        `8  `Y8bod8P' `Y8bod88P" `Y8bod8P'
+
+class Base():
+
+    bl_idname = "NodeBoosterCollectionVelocity"
+    bl_label = "Collection Velocity"
+    bl_description = """Track the velocity, acceleration, and stopping power of all objects of a collection.
+    • Outputs one point per object, located at the object world location.
+    • The points store the 'velocity', 'direction', 'speed', 'acceleration' and 'stopping_power' attributes, readable with the 'Named Attribute' node.
+    • The points are in the same order as the objects of the collection.
+    • Like the Object Velocity node, the timeline needs to be played in order."""
+    auto_update = {'FRAME_PRE',}
+    tree_type = "*ChildrenDefined*"
+
+    target_collection: bpy.props.PointerProperty(
+        type=bpy.types.Collection,
+        name="Target Collection",
+        description="Collection of objects to track velocity",
+        update=lambda self, context: self.sync_out_values(),
+        )
+
+    @classmethod
+    def poll(cls, context):
+        """mandatory poll"""
+        return True
+
+    def init(self, context):
+        """this fct run when appending the node for the first time"""
+        name = f".{self.bl_idname}"
+
+        sockets = {"Points": "NodeSocketGeometry",}
+        descriptions = {"Points": "One point per object of the collection, storing the velocity attributes",}
+
+        ng = bpy.data.node_groups.get(name)
+        if (ng is None):
+            ng = create_new_nodegroup(name, tree_type=self.tree_type,
+                out_sockets=sockets, sockets_description=descriptions)
+
+            # the points are read from a buffer object
+            info = ng.nodes.new('GeometryNodeObjectInfo')
+            info.name = info.label = "Buffer Info"
+            info.transform_space = 'ORIGINAL'
+            info.location = (0, 0)
+            link_sockets(info.outputs['Geometry'], ng.nodes["Group Output"].inputs[0])
+
+        ng = ng.copy()  # always using a copy of the original ng
+        self.node_tree = ng
+
+        self.width = 160
+
+        return None
+
+    def copy(self, node):
+        """fct run when duplicating the node"""
+        self.node_tree = node.node_tree.copy()
+        return None
+
+    def update(self):
+        """generic update function"""
+
+        return None
+
+    def sync_out_values(self):
+        """sync the buffer object points with the collection objects"""
+
+        scene = bpy.context.scene
+        ng = self.node_tree
+        sock = ng.nodes["Buffer Info"].inputs['Object']
+
+        coll = self.target_collection
+        if (not coll):
+            if (sock.default_value is not None):
+                sock.default_value = None
+            return None
+
+        buffer_obj = get_buffer_object(coll)
+        if (sock.default_value != buffer_obj):
+            sock.default_value = buffer_obj
+
+        names, locations = get_collection_locations(coll)
+        current_frame = scene.frame_current
+        current_time = current_frame / scene.render.fps
+
+        #get the collection history, reset it if the objects changed
+        COLVEL = COLVELOCITIES.get(coll.name)
+        if (COLVEL is None) or (COLVEL['names'] != names):
+            COLVEL = COLVELOCITIES[coll.name] = {
+                'names': names,
+                'history': RingBuffer(HIST_FRAMES+1, 2 + len(names)*3),
+                }
+        history = COLVEL['history']
+
+        #if the timeline reset, we clear everything
+        if (current_frame == scene.frame_start):
+            history.clear()
+
+        #if the frame is re-evaluated or the timeline went backward, the newer samples are obsolete
+        while (len(history) and (history.last()[HIST_FRAME] >= current_frame)):
+            history.pop()
+
+        history.append(np.concatenate(((current_frame, current_time), locations.ravel())))
+
+        samples = history.ordered()
+        samples = samples[samples[:,HIST_FRAME] >= (current_frame - HIST_FRAMES)]
+
+        directions, speeds, accelerations, stopping_powers = calculate_collection_metrics(samples)
+
+        if (DEBUG):
+            print(f"Collection Velocity '{coll.name}': {len(names)} objects, {len(samples)} samples")
+
+        write_buffer_mesh(buffer_obj.data, locations, {
+            'velocity': directions * speeds[:,None],
+            'direction': directions,
+            'speed': speeds,
+            'acceleration': accelerations,
+            'stopping_power': stopping_powers,
+            })
+
+        return None
+
+    def draw_label(self):
+        """node label"""
+        if (self.label==''):
+            return 'Collection Velocity'
+        return self.label
+
+    def draw_buttons(self, context, layout):
+        """node interface drawing"""
+
+        col = layout.column()
+        col.prop(self, "target_collection", text="")
+
+        return None
+
+    def draw_panel(self, layout, context):
+        """draw in the nodebooster N panel 'Active Node'"""
+        n = self
+
+        header, panel = layout.panel("params_panelid", default_closed=False)
+        header.label(text="Parameters")
+        if panel:
+
+            col = panel.column(align=True)
+            col.prop(self, "target_collection", text="")
+
+        header, panel = layout.panel("doc_panelid", default_closed=True)
+        header.label(text="Documentation")
+        if panel:
+            word_wrap(layout=panel, alert=False, active=True, max_char='auto',
+                char_auto_sidepadding=0.9, context=context, string=n.bl_description)
+            panel.operator("wm.url_open", text="Documentation").url = "https://blenderartists.org/t/node-booster-extending-blender-node-editors"
+
+        header, panel = layout.panel("dev_panelid", default_closed=True)
+        header.label(text="Development")
+        if panel:
+            panel.active = False
+
+            col = panel.column(align=True)
+            col.label(text="NodeTree:")
+            col.template_ID(n, "node_tree")
+
+            if (self.target_collection) and (self.target_collection.name in COLVELOCITIES):
+                COLVEL = COLVELOCITIES[self.target_collection.name]
+
+                col = panel.column(align=True)
+                col.label(text="Collection Data:")
+                box = col.box().column(align=True)
+                box.label(text=f"Tracked Objects: {len(COLVEL['names'])}")
+                box.label(text=f"Tracked Frames: {len(COLVEL['history'])}")
+
+        return None
+
+    @classmethod
+    def update_all(cls, using_nodes=None, signal_from_handlers=False,):
+        """update all instances of this node in all node trees"""
+
+        for node in get_all_nodes(exactmatch_idnames={
+            NODEBOOSTER_NG_GN_CollectionVelocity.bl_idname,
+            }):
+            node.sync_out_values()
+
+        return None
+
+
+#Per Node-Editor Children:
+#Respect _NG_ + _GN_/_SH_/_CP_ nomenclature
+#NOTE only geometry node can make use of per-point attributes.
+
+class NODEBOOSTER_NG_GN_CollectionVelocity(Base, bpy.types.GeometryNodeCustomGroup):
+    tree_type = "GeometryNodeTree"
+    bl_idname = "GeometryNode" + Base.bl_idname
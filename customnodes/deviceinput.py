@@ -16,7 +16,6 @@
 # bonus:
 # - instead of using a string reprenting the user keys, blender has a system for keys properties, we could add up to 25 or so 
 #   bpy.props.string with that special property to catch event perhaps? see prop(full_event=True)
-# - the Mouse direction and Velocity could benefit from some sort of smoothing? as option in the N panel?
 # - Could add a mouse projected location in the XY plane?
 # - Storing velocity damping global settings like this will lead to a a reset of user values on each blender session.
 #   we should use plugin preferences instead.
@@ -30,11 +29,12 @@
 
 import bpy
 import time
-import math
+import numpy as np
 
 from ..__init__ import get_addon_prefs
 from ..utils.str_utils import word_wrap
 from ..resources import cust_icon
+from ..utils.nbr_utils import RingBuffer, polyfit_at
 from ..utils.node_utils import (
     create_new_nodegroup,
     set_ng_socket_defvalue,
@@ -66,13 +66,21 @@ POSSIBLE_EVENTS = {
 
 class STORAGE:
     is_listening = False
-    mouse_history = [] # Store mouse position history: [(x, y, timestamp), ...]
-    history_max_length = 10 # Maximum number of history entries to keep
+    history_size = 64 # Global amount of mouse positions kept in the history
+    mouse_history = RingBuffer(history_size, 3) # Store mouse position history, preallocated rows of (x, y, timestamp)
+    smoothing_time = 0.05 # Global time constant, in seconds, of the exponential weighting of the mouse history
     custom_event_types = set() # Store custom event types that user has added, we need to update event_data with their values.
     execution_counter = 0 # Counter for tracking execution cycles (for UI animation)
     use_velocity_damping = True  # Global toggle for velocity damping
     damping_factor = 0.7  # Global damping factor for mouse velocity
     damping_speed = 0.1  # Global threshold in seconds before velocity damping is applied
+    flush_rate = 60 # Global rate, in Hz, at which the accumulated events are passed to the nodes
+    use_transitions_only = False # Global toggle, only pass the events to the nodes on key transitions
+    is_dirty = False # Did the mouse moved since the last metrics calculation?
+    raw_velocity = 0.0 # Mouse velocity before damping
+    raw_acceleration = 0.0 # Mouse acceleration before damping
+    flushed_data = {} # Copy of the event_data at the time of the last flush, to only write the outputs that changed
+    synced_trees = set() # Nodetrees that received a full flush since we started listening
     event_data = {
         'type': '',
         'value': '',
@@ -92,38 +100,58 @@ class STORAGE:
         'mouse_velocity': 0.0,
         'mouse_direction_x': 0.0,
         'mouse_direction_y': 0.0,
+        'mouse_acceleration': 0.0,
+        'mouse_smooth_x': 0.0,
+        'mouse_smooth_y': 0.0,
         }
 
-def calculate_mouse_metrics(history:list) -> tuple:
-    """Calculate mouse velocity and direction. pass a location history with time indication (x, y, timestamp)
-    returns a tuple with velocity and direction"""
+# The event_data keys each output socket depend on. Custom keys sockets "{EVENT} Key" depend on their {EVENT}.
+SOCKETS_EVENT_KEYS = {
+    "Mouse Position": ('mouse_region_x', 'mouse_region_y'),
+    "Mouse Direction": ('mouse_direction_x', 'mouse_direction_y'),
+    "Mouse Velocity": ('mouse_velocity',),
+    "Mouse Acceleration": ('mouse_acceleration',),
+    "Smoothed Position": ('mouse_smooth_x', 'mouse_smooth_y'),
+    "Ctrl": ('ctrl',),
+    "Shift": ('shift',),
+    "Alt": ('alt',),
+    "Left Click": ('LEFTMOUSE',),
+    "Right Click": ('RIGHTMOUSE',),
+    "Middle Click": ('MIDDLEMOUSE',),
+    "Wheel Up": ('WHEELUPMOUSE',),
+    "Wheel Down": ('WHEELDOWNMOUSE',),
+    }
+
+def calculate_mouse_metrics(history:np.ndarray, smoothing:float=0.05) -> tuple:
+    """Calculate mouse velocity, acceleration, direction and smoothed position, from the whole history in one vectorized pass.
+    pass a chronological location history array of rows (x, y, timestamp), and the time constant of the smoothing in seconds.
+    returns a tuple with velocity, direction, acceleration and smoothed position"""
 
-    if (not history or len(history) < 2):
-        return 0.0, (0.0, 0.0)
+    if (len(history) < 2):
+        position = tuple(history[-1,:2].tolist()) if len(history) else (0.0, 0.0)
+        return 0.0, (0.0, 0.0), 0.0, position
 
-    # Get the oldest and newest positions
-    # NOTE should'nt we smooth out and take the whole of the history into consideration?
-    oldest_entry, newest_entry = history[0], history[-1]
+    times = history[:,2]
+    if ((times[-1] - times[0]) <= 0):
+        return 0.0, (0.0, 0.0), 0.0, tuple(history[-1,:2].tolist())
 
-    # Calculate time difference in seconds
-    time_diff = newest_entry[2] - oldest_entry[2]
-    if (time_diff <= 0):
-        return 0.0, (0.0, 0.0)
+    # Exponentially decaying weights, an EMA over the history. Recent motion dominates the fit,
+    # and positions from a previous, unrelated gesture fade out instead of skewing the result.
+    weights = np.exp((times - times[-1]) / max(smoothing, 1e-3))
 
-    # Calculate distance moved
-    dx = newest_entry[0] - oldest_entry[0]
-    dy = newest_entry[1] - oldest_entry[1]
-    distance = math.sqrt(dx*dx + dy*dy)
+    # Weighted least-squares fit of the trajectory, evaluated at the newest sample.
+    position, velocity, acceleration = polyfit_at(times, history[:,:2], degree=2, weights=weights)
 
-    # Calculate velocity (1k pixels per second)
-    velocity = (distance / time_diff) / 1000
+    speed = float(np.linalg.norm(velocity))
+    if (speed > 0):
+          direction = velocity / speed
+    else: direction = np.zeros(2)
 
-    # Calculate direction (normalized vector)
-    if (distance > 0):
-          direction = (dx/distance, dy/distance)
-    else: direction = (0.0, 0.0)
+    # The rate of change of the speed is the acceleration projected on the direction of travel.
+    speed_change = float(np.dot(acceleration, direction))
 
-    return velocity, direction
+    # Velocity in 1k pixels per second, acceleration in 1k pixels per second²
+    return speed / 1000, tuple(direction.tolist()), speed_change / 1000, tuple(position.tolist())
 
 class NODEBOOSTER_OT_DeviceInputEventListener(bpy.types.Operator):
 
@@ -133,33 +161,56 @@ class NODEBOOSTER_OT_DeviceInputEventListener(bpy.types.Operator):
     bl_options = {'INTERNAL'}
 
     _timer = None  # Store the timer reference
+    _timer_rate = None  # Rate of the timer, in Hz
+
+    def add_timer(self, context):
+        """(re)start the timer, ticking at the global flush rate"""
+        if self._timer:
+            context.window_manager.event_timer_remove(self._timer)
+        self._timer_rate = STORAGE.flush_rate
+        self._timer = context.window_manager.event_timer_add(1/self._timer_rate, window=context.window)
+        return None
 
     def process_mouse_event(self, context, event):
-        """Process mouse events to update velocity calculations"""
+        """Accumulate the mouse positions. Cheap, the metrics are only calculated on flush"""
 
         # Update mouse history
         current_time = time.time()
         mouse_pos = (event.mouse_region_x, event.mouse_region_y, current_time)
 
         # Only add new position if it's different from the last one
-        if not STORAGE.mouse_history or mouse_pos[:2] != STORAGE.mouse_history[-1][:2]:
+        if (not len(STORAGE.mouse_history)) or (tuple(STORAGE.mouse_history.last()[:2]) != mouse_pos[:2]):
             STORAGE.mouse_history.append(mouse_pos)
-            
-            # Keep history to the maximum length
-            if len(STORAGE.mouse_history) > STORAGE.history_max_length:
-                STORAGE.mouse_history.pop(0)
-
-        # calculate velocity and direction
-        velocity, direction = calculate_mouse_metrics(STORAGE.mouse_history)
+            STORAGE.is_dirty = True
 
         STORAGE.event_data.update({
             'mouse_x': event.mouse_x,
             'mouse_y': event.mouse_y,
             'mouse_region_x': event.mouse_region_x,
             'mouse_region_y': event.mouse_region_y,
+            })
+
+        return None
+
+    def process_mouse_metrics(self, context):
+        """calculate velocity, acceleration, direction and smoothed position, if the mouse moved since last time"""
+
+        if (not STORAGE.is_dirty):
+            return None
+        STORAGE.is_dirty = False
+
+        velocity, direction, acceleration, position = calculate_mouse_metrics(
+            STORAGE.mouse_history.ordered(), smoothing=STORAGE.smoothing_time,)
+
+        STORAGE.raw_velocity = velocity
+        STORAGE.raw_acceleration = acceleration
+        STORAGE.event_data.update({
             'mouse_velocity': velocity,
             'mouse_direction_x': direction[0],
             'mouse_direction_y': direction[1],
+            'mouse_acceleration': acceleration,
+            'mouse_smooth_x': position[0],
+            'mouse_smooth_y': position[1],
             })
 
         return None
@@ -171,15 +222,12 @@ class NODEBOOSTER_OT_DeviceInputEventListener(bpy.types.Operator):
         STOREVENT = STORAGE.event_data
 
         # If we have mouse history, check if we need to apply damping
-        if STORAGE.mouse_history and len(STORAGE.mouse_history) >= 2:
+        if (len(STORAGE.mouse_history) >= 2):
             # Get the most recent entry and check its timestamp
-            last_entry = STORAGE.mouse_history[-1]
+            last_entry = STORAGE.mouse_history.last()
             current_time = time.time()
             time_since_last_movement = current_time - last_entry[2]
 
-            # Current velocity
-            current_velocity = STOREVENT['mouse_velocity']
-
             # If mouse hasn't moved recently and velocity is still > 0, apply damping
             if time_since_last_movement > 0.01:  # Small threshold to ensure we're not moving
 
@@ -188,7 +236,7 @@ class NODEBOOSTER_OT_DeviceInputEventListener(bpy.types.Operator):
                 dampspeed = STORAGE.damping_speed if (STORAGE.use_velocity_damping) else 0.01
             
                 damping_multiplier = dampfac ** (time_since_last_movement / dampspeed)
-                damped_velocity = current_velocity * damping_multiplier
+                damped_velocity = STORAGE.raw_velocity * damping_multiplier
                 
                 # Set to zero if below threshold
                 if damped_velocity < 0.1:  # Threshold below which we consider velocity zero
@@ -196,29 +244,39 @@ class NODEBOOSTER_OT_DeviceInputEventListener(bpy.types.Operator):
                 
                 # Update the velocity in storage
                 STOREVENT['mouse_velocity'] = damped_velocity
-                
-                # Update the node outputs with the new damped velocity
-                self.pass_event_to_nodes(context)
+                STOREVENT['mouse_acceleration'] = STORAGE.raw_acceleration * damping_multiplier if (damped_velocity) else 0.0
 
         return None
 
-    def pass_event_to_nodes(self, context,):
-        """Pass the event data to the nodes"""
+    def flush_event_data(self, context,):
+        """Pass the event data that changed since the last flush to the nodes"""
+
+        STOREVENT = STORAGE.event_data
+        changed = {k for k,v in STOREVENT.items() if ((k not in STORAGE.flushed_data) or (STORAGE.flushed_data[k] != v))}
+        STORAGE.flushed_data = STOREVENT.copy()
 
         for node in get_all_nodes(exactmatch_idnames={
             NODEBOOSTER_NG_GN_DeviceInput.bl_idname,
             NODEBOOSTER_NG_SH_DeviceInput.bl_idname,
             NODEBOOSTER_NG_CP_DeviceInput.bl_idname,
             }):
-            node.sync_out_event(STORAGE.event_data)
+            # nodes that never received data need a full flush
+            if (node.node_tree.name not in STORAGE.synced_trees):
+                STORAGE.synced_trees.add(node.node_tree.name)
+                node.sync_out_event(STOREVENT)
+                continue
+            if (changed):
+                node.sync_out_event(STOREVENT, changed_keys=changed)
             continue
 
         return None
 
     def process_keyboard_event(self, context, event):
-        """Process keyboard events"""
+        """Process keyboard events, return True if a key changed state"""
 
         STOREVENT = STORAGE.event_data
+        before = [STOREVENT.get(k) for k in STORAGE.custom_event_types]
+        before += [STOREVENT[k] for k in ('LEFTMOUSE','RIGHTMOUSE','MIDDLEMOUSE','WHEELUPMOUSE','WHEELDOWNMOUSE','shift','ctrl','alt')]
 
         # catch mouse and user defined events.
         keys_to_catch = {'LEFTMOUSE','RIGHTMOUSE','MIDDLEMOUSE'}
@@ -241,10 +299,10 @@ class NODEBOOSTER_OT_DeviceInputEventListener(bpy.types.Operator):
             'alt': event.alt,
             })
 
-        # Update all nodes
-        self.pass_event_to_nodes(context)
+        after = [STOREVENT.get(k) for k in STORAGE.custom_event_types]
+        after += [STOREVENT[k] for k in ('LEFTMOUSE','RIGHTMOUSE','MIDDLEMOUSE','WHEELUPMOUSE','WHEELDOWNMOUSE','shift','ctrl','alt')]
 
-        return None
+        return (before != after)
 
     def modal(self, context, event):
 
@@ -270,21 +328,27 @@ class NODEBOOSTER_OT_DeviceInputEventListener(bpy.types.Operator):
 
         #### Process mouse events:
 
-        # process velocity and direction from mouse
+        # accumulate the mouse positions, mouse-move events arrive at hundreds of Hz.
         self.process_mouse_event(context, event)
 
-        # Process timer events to update velocity calculations
+        # The accumulated events are flushed to the nodes at a steady rate.
         if (event.type == 'TIMER'):
+            if (self._timer_rate != STORAGE.flush_rate):
+                self.add_timer(context)
+            self.process_mouse_metrics(context)
             self.process_mouse_tamping(context)
-            self.pass_event_to_nodes(context)
+            if (not STORAGE.use_transitions_only):
+                self.flush_event_data(context)
             return {'PASS_THROUGH'}
 
         # except for passing the velocity and direction.
         if (event.type in {'MOUSEMOVE','INBETWEEN_MOUSEMOVE'}):
             return {'PASS_THROUGH'}
 
-        # Process keyboard events
-        self.process_keyboard_event(context, event)
+        # Process keyboard events, key transitions are flushed right away.
+        if self.process_keyboard_event(context, event):
+            self.process_mouse_metrics(context)
+            self.flush_event_data(context)
 
         # NOTE We don't escape User can use the node interface to ecape.
         # if (event.type== 'ESC' and event.value == 'PRESS'):
@@ -311,12 +375,14 @@ class NODEBOOSTER_OT_DeviceInputEventListener(bpy.types.Operator):
         else:
             # Start listening
             STORAGE.is_listening = True
-            # Clear mouse history
-            STORAGE.mouse_history = []
+            # Clear mouse history, and ensure the nodes will receive a full flush
+            STORAGE.mouse_history.clear()
+            STORAGE.flushed_data = {}
+            STORAGE.synced_trees = set()
             # Start the modal operator
             context.window_manager.modal_handler_add(self)
-            # Add timer for consistent updates - 30fps (0.033s interval)
-            self._timer = context.window_manager.event_timer_add(0.033, window=context.window)
+            # Add timer for consistent updates, at the flush rate
+            self.add_timer(context)
             # Update UI
             for area in context.screen.areas:
                 area.tag_redraw()
@@ -403,6 +469,77 @@ class Base():
         set=set_damping_speed
         )
 
+    def get_flush_rate(self):
+        return STORAGE.flush_rate
+
+    def set_flush_rate(self, value):
+        STORAGE.flush_rate = value
+        return None
+
+    flush_rate: bpy.props.IntProperty(
+        name="Refresh Rate",
+        description="How many times per second the accumulated events are passed to the nodes while listening. Lower values reduce the nodetree re-evaluations. Global value, applies to all instances of this node.",
+        min=1,
+        soft_max=120,
+        default=60,
+        get=get_flush_rate,
+        set=set_flush_rate
+        )
+
+    def get_transitions_only(self):
+        return STORAGE.use_transitions_only
+
+    def set_transitions_only(self, value):
+        STORAGE.use_transitions_only = value
+        return None
+
+    use_transitions_only: bpy.props.BoolProperty(
+        name="Key Transitions Only",
+        description="Only pass the events to the nodes when a key or button changes state, the mouse motion is passed along at that moment. Global value, applies to all instances of this node.",
+        default=False,
+        get=get_transitions_only,
+        set=set_transitions_only
+        )
+
+    def get_history_size(self):
+        return STORAGE.history_size
+
+    def set_history_size(self, value):
+        STORAGE.history_size = value
+        STORAGE.mouse_history.resize(value)
+        return None
+
+    history_size: bpy.props.IntProperty(
+        name="History Size",
+        description="Amount of mouse positions used to estimate the mouse metrics. Global value, applies to all instances of this node.",
+        min=2,
+        soft_max=256,
+        max=4096,
+        default=64,
+        get=get_history_size,
+        set=set_history_size
+        )
+
+    def get_smoothing_time(self):
+        return STORAGE.smoothing_time
+
+    def set_smoothing_time(self, value):
+        STORAGE.smoothing_time = value
+        return None
+
+    smoothing_time: bpy.props.FloatProperty(
+        name="Smoothing",
+        description="Time in seconds after which the weight of a past mouse position in the metrics estimation is reduced to about a third. Higher values give smoother but laggier metrics. Global value, applies to all instances of this node.",
+        min=0.001,
+        soft_max=0.5,
+        default=0.05,
+        precision=3,
+        subtype='TIME',
+        unit='TIME',
+        get=get_smoothing_time,
+        set=set_smoothing_time
+        )
+
     error_message : bpy.props.StringProperty(
         default=""
         )
@@ -487,6 +624,8 @@ class Base():
             "Mouse Position": "NodeSocketVector",
             "Mouse Direction": "NodeSocketVector",
             "Mouse Velocity": "NodeSocketFloat",
+            "Mouse Acceleration": "NodeSocketFloat",
+            "Smoothed Position": "NodeSocketVector",
             "Left Click": "NodeSocketBool",
             "Right Click": "NodeSocketBool",
             "Middle Click": "NodeSocketBool",
@@ -500,6 +639,8 @@ class Base():
             "Mouse Position": "ScreenSpace Mouse position in pixels.",
             "Mouse Direction": "ScreenSpace Mouse direction normalized vector.",
             "Mouse Velocity": "Speed Unit is calculated in 1k pixels / second.",
+            "Mouse Acceleration": "Rate of change of the mouse speed, in 1k pixels / second². Negative when the mouse slows down.",
+            "Smoothed Position": "ScreenSpace Mouse position in pixels, estimated from the smoothed mouse path.",
             }
 
         ng = bpy.data.node_groups.get(name)
@@ -526,32 +667,35 @@ class Base():
 
         return None
 
-    def sync_out_event(self, event_data):
-        """Update node outputs based on event data"""
+    def sync_out_event(self, event_data, changed_keys:set=None):
+        """Update node outputs based on event data. Pass a set of changed event_data keys to only write the concerned outputs"""
 
         ng = self.node_tree
+        outputs = ng.nodes["Group Output"].inputs
 
         # Update node outputs based on event data
-        set_ng_socket_defvalue(ng, socket_name="Mouse Position", value=(event_data['mouse_region_x'], event_data['mouse_region_y'], 0.0))
-        set_ng_socket_defvalue(ng, socket_name="Mouse Direction", value=(event_data['mouse_direction_x'], event_data['mouse_direction_y'], 0.0))
-        set_ng_socket_defvalue(ng, socket_name="Mouse Velocity", value=event_data['mouse_velocity'])
-        set_ng_socket_defvalue(ng, socket_name="Ctrl", value=event_data['ctrl'])
-        set_ng_socket_defvalue(ng, socket_name="Shift", value=event_data['shift'])
-        set_ng_socket_defvalue(ng, socket_name="Alt", value=event_data['alt'])
-        set_ng_socket_defvalue(ng, socket_name="Left Click", value=event_data['LEFTMOUSE'])
-        set_ng_socket_defvalue(ng, socket_name="Right Click", value=event_data['RIGHTMOUSE'])
-        set_ng_socket_defvalue(ng, socket_name="Middle Click", value=event_data['MIDDLEMOUSE'])
-        set_ng_socket_defvalue(ng, socket_name="Wheel Up", value=event_data['WHEELUPMOUSE'])
-        set_ng_socket_defvalue(ng, socket_name="Wheel Down", value=event_data['WHEELDOWNMOUSE'])
+        for socket_name, keys in SOCKETS_EVENT_KEYS.items():
+            if (changed_keys is not None) and changed_keys.isdisjoint(keys):
+                continue
+            # NOTE nodes created with older versions might not have all sockets
+            if (socket_name not in outputs):
+                continue
+            if (len(keys)==2):
+                  value = (event_data[keys[0]], event_data[keys[1]], 0.0)
+            else: value = event_data[keys[0]]
+            set_ng_socket_defvalue(ng, socket_name=socket_name, value=value)
+            continue
 
         # Update custom event outputs
         user_keys = [k.name for k in self.outputs if k.name.endswith(" Key")]
         for k in user_keys:
             data = k.replace(" Key", "")
             value = event_data.get(data, False)
-            set_ng_socket_defvalue(ng, socket_name=k, value=value)
             if (not value):
                 STORAGE.custom_event_types.add(data)
+            if (changed_keys is not None) and (data not in changed_keys):
+                continue
+            set_ng_socket_defvalue(ng, socket_name=k, value=value)
 
         return None
 
@@ -607,6 +751,28 @@ class Base():
             col.prop(self, "damping_factor", text="Factor", slider=True,)
             col.prop(self, "damping_speed", text="Speed (sec)",)
 
+        header, panel = layout.panel("smoothing_panelid", default_closed=True)
+        header.label(text="Smoothing")
+        if (panel):
+
+            col = panel.column()
+            col.use_property_split = True
+            col.use_property_decorate = False
+            col.prop(self, "smoothing_time", text="Time (sec)",)
+            col.prop(self, "history_size", text="History",)
+
+        header, panel = layout.panel("refresh_panelid", default_closed=True)
+        header.label(text="Refresh")
+        if (panel):
+
+            col = panel.column()
+            col.use_property_split = True
+            col.use_property_decorate = False
+            col.prop(self, "use_transitions_only", text="Transitions Only",)
+            sub = col.column()
+            sub.enabled = not STORAGE.use_transitions_only
+            sub.prop(self, "flush_rate", text="Rate (Hz)",)
+
         header, panel = layout.panel("doc_panelid", default_closed=True)
         header.label(text="Documentation")
         if panel:
@@ -638,8 +804,9 @@ class Base():
             box.separator(type='LINE')
             box.label(text="Mouse Metrics:")
             box.label(text=f"Velocity: {STOREVENT['mouse_velocity']:.1f} 1000px/s")
+            box.label(text=f"Acceleration: {STOREVENT['mouse_acceleration']:.1f} 1000px/s²")
             box.label(text=f"Direction: ({dir_x:.2f}, {dir_y:.2f}, 0.00)")
-            box.label(text=f"History: {len(STORAGE.mouse_history)}")
+            box.label(text=f"History: {len(STORAGE.mouse_history)}/{STORAGE.mouse_history.capacity}")
 
         layout.separator(factor=0.5)
         
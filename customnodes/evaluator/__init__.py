@@ -9,35 +9,162 @@
 # and an evaluator() function that accepts a socket as argument.
 # the evaluator shall return the value for the equivalent passed socket.
 
+# NOTE:
+# the evaluated values are cached persistently in EVALUATION_CACHE, keyed by (node, socket).
+# each entry store the signature of the upstream graph at the time of the evaluation:
+# the revision stamp of the node, and recursively the signatures of the nodes linked to its inputs.
+# - nodes are tagged dirty with 'tag_evaluator_dirty()' when their properties change, which gives them a new stamp.
+# - the animated or driven properties change without calling their update callbacks, so the values of the
+#   properties declared by the node class are part of the signature as well.
+# - if a link changes, the upstream socket changes, and so does the signature.
+# - 'volatile' nodes, depending on data outside of the nodetree (object data, current frame ect..), are always
+#   evaluated, their signature is the content hash of their evaluated value.
+# this way, one edit only recompute the nodes downstream of the edit.
+
 # TODO:
-# - need some sort of system to see which node is dirty.
 # - we could store the evaluated values as a node python numpy property
 
 
 import bpy
-from ...utils.node_utils import socket_intersections
+import numpy as np
+from itertools import count
 
+from ...utils.node_utils import NodeLinkIndex
+from ...utils.bezier2d_utils import hash_bezsegs
+
+
+# Persistent evaluation cache {(node key, socket identifier): (signature, value)}, see get_node_key()
+EVALUATION_CACHE = {}
+# Revision stamps of the nodes {node key: stamp}
+NODE_STAMPS = {}
+STAMP_COUNTER = count()
+# The animatable properties names declared by the node classes {node class: names}, see get_node_properties_values()
+NODE_PROPERTIES = {}
+# The current evaluation pass, nested evaluations share the same memo of values and signatures.
+EVALUATION_PASS = {'depth':0, 'memo':None}
 
-def evaluate_upstream_value(sock, match_evaluator_properties:set=None, set_link_invalid:bool=False, cached_values:dict=None):
-    """evaluate the value of a socket upstream, fallback to None if the node upstream is not compatible or not linked.
-    -Pass a match_evaluator_properties set to check if the node upstream node is compatible. ex: {'INTERPOLATION_NODE',}
-    -Pass a set_link_invalid to set the link invalid if the node upstream is not compatible.
-    -Pass a cached_values dict to cache the evaluated values, in order to avoid redundand evaluations calculations.
-    """
 
-    # if the socket is not links, there's nothing to fetch upstream..
-    if (not sock.links):
+def clear_evaluation_cache() -> None:
+    """forget all evaluated values, should be done when the data is reloaded (undo, file load).
+    as the node properties might change without their update callbacks being called."""
+
+    EVALUATION_CACHE.clear()
+    NODE_STAMPS.clear()
+    return None
+
+
+def get_node_key(node) -> tuple:
+    """identify a node by its nodetree, name, type and pointer.
+    NOTE blender reuses the addresses of the freed nodes, a pointer alone could match the entries of a deleted node."""
+
+    return (node.id_data.as_pointer(), node.name, node.bl_idname, node.as_pointer())
+
+
+def evaluator_depsgraph_callback(depsgraph) -> None:
+    """forget the stamps and cached values of the nodes removed from the updated nodetrees"""
+
+    if (not NODE_STAMPS) and (not EVALUATION_CACHE):
         return None
 
+    #the nodetrees embedded in materials, worlds, lights or scenes are updated through their owner
+    trees = {}
+    for u in depsgraph.updates:
+        idt = u.id.original
+        tree = idt if isinstance(idt, bpy.types.NodeTree) else getattr(idt, 'node_tree', None)
+        if (tree is not None):
+            trees[tree.as_pointer()] = tree
+        continue
+
+    keys = {k for k in NODE_STAMPS if (k[0] in trees)} | {k[0] for k in EVALUATION_CACHE if (k[0][0] in trees)}
+    if (not keys):
+        return None
+
+    alive = {get_node_key(n) for ptr in {k[0] for k in keys} for n in trees[ptr].nodes}
+    for k in keys - alive:
+        NODE_STAMPS.pop(k, None)
+    for k in [k for k in EVALUATION_CACHE if (k[0] in keys) and (k[0] not in alive)]:
+        del EVALUATION_CACHE[k]
+
+    return None
+
+
+def tag_evaluator_dirty(node) -> None:
+    """tag a node as dirty, its value and the values of the nodes downstream will be re-evaluated"""
+
+    NODE_STAMPS[get_node_key(node)] = next(STAMP_COUNTER)
+    return None
+
+
+def get_node_stamp(node) -> int:
+    """get the revision stamp of a node, nodes never seen before get a new one"""
+
+    key = get_node_key(node)
+    stamp = NODE_STAMPS.get(key)
+    if (stamp is None):
+        stamp = NODE_STAMPS[key] = next(STAMP_COUNTER)
+    return stamp
+
+
+def get_node_properties_values(node) -> tuple:
+    """get the values of the animatable properties declared by the node class"""
+
+    cls = type(node)
+    names = NODE_PROPERTIES.get(cls)
+    if (names is None):
+        animatables = {
+            bpy.props.FloatProperty, bpy.props.IntProperty, bpy.props.BoolProperty, bpy.props.EnumProperty,
+            bpy.props.FloatVectorProperty, bpy.props.IntVectorProperty, bpy.props.BoolVectorProperty,
+            }
+        names = NODE_PROPERTIES[cls] = tuple(name
+            for c in reversed(cls.__mro__) for name, prop in getattr(c, '__annotations__', {}).items()
+            if (getattr(prop, 'function', None) in animatables))
+
+    values = []
+    for name in names:
+        v = getattr(node, name)
+        if isinstance(v, set): #enum flags
+            v = frozenset(v)
+        elif (not isinstance(v, str)) and hasattr(v, '__len__'): #vectors
+            v = v[:]
+        values.append(v)
+        continue
+
+    return tuple(values)
+
+
+def get_value_hash(value) -> str:
+    """content hash of an evaluated value"""
+
+    if (value is None):
+        return ''
+    if (type(value) is np.ndarray):
+        return hash_bezsegs(value)
+    return str(value)
+
+
+def get_link_index(sock, memo:dict) -> NodeLinkIndex:
+    """get the links index of the socket nodetree, built once per evaluation pass and stored in the memo"""
+
+    link_index = memo.get('link_index')
+    if (link_index is None) or (link_index.node_tree != sock.id_data):
+        link_index = memo['link_index'] = NodeLinkIndex(sock.id_data)
+    return link_index
+
+
+def get_upstream_socket(sock, link_index:NodeLinkIndex):
+    """get the socket colliding with the given input socket, when parcouring the links upstream.
+    Returns a tuple (colliding_socket, parcoured_links) or (None, None)"""
+
+    if (not link_index.is_linked(sock)):
+        return None, None
+
     #get colliding nodes upstream, on the left in {socket:links}
     #return a dictionary of {colliding_socket:parcoured_links[]}
-    parcour_info = socket_intersections(sock, direction='LEFT')
-    # print(f"DEBUG: parcour_info: {parcour_info}, len: {len(parcour_info)}")
+    parcour_info = link_index.intersections(sock, direction='LEFT')
 
     #nothing hit?
     if (not parcour_info):
-        # print("DEBUG: no parcour info.")
-        return None
+        return None, None
 
     #get our colliding socket. when parcouring right to left, we expect only one collision.
     if (len(parcour_info) > 1):
@@ -45,14 +172,93 @@ def evaluate_upstream_value(sock, match_evaluator_properties:set=None, set_link_
 
     # Extract the first (and only) item from the dictionary
     colliding_socket = list(parcour_info.keys())[0]
-    parcoured_links = parcour_info[colliding_socket]
+    return colliding_socket, parcour_info[colliding_socket]
+
+
+def is_evaluable(node, match_evaluator_properties:set) -> bool:
+    """check if the node is compatible with our evaluation system"""
+
+    return hasattr(node,'evaluator_properties') \
+        and hasattr(node,'evaluator') \
+        and bool(match_evaluator_properties.intersection(node.evaluator_properties))
+
+
+def evaluate_cached(node, socket, signature:tuple):
+    """evaluate the given node output socket, reuse the cached value if the signature didn't change"""
+
+    cachekey = (get_node_key(node), socket.identifier)
+
+    entry = EVALUATION_CACHE.get(cachekey)
+    if (entry is not None) and (entry[0] == signature):
+        r = entry[1]
+    else:
+        r = node.evaluator(socket)
+        EVALUATION_CACHE[cachekey] = (signature, r)
+
+    # NOTE we give away a copy, the nodes downstream might modify the arrays in place.
+    if (type(r) is np.ndarray):
+        return r.copy()
+    return r
+
+
+def get_node_signature(node, socket, match_evaluator_properties:set, memo:dict) -> tuple:
+    """get the signature of the graph upstream of the given node output socket.
+    The signature changes if the node or any node upstream is tagged dirty, if their properties values change
+    (animated or driven properties don't call their update callbacks), or if the links changes."""
+
+    memokey = ('signature', node.as_pointer(), socket.identifier)
+    r = memo.get(memokey)
+    if (r is not None):
+        return r
+
+    # volatile nodes needs to be evaluated, we use the content of their value as signature.
+    if (getattr(node, 'evaluator_volatile', False)):
+        value = node.evaluator(socket)
+        signature = ('volatile', get_value_hash(value))
+        EVALUATION_CACHE[(get_node_key(node), socket.identifier)] = (signature, value)
+    else:
+        upstream = []
+        for inp in node.inputs:
+            if (not inp.enabled):
+                continue
+            colliding_socket, _ = get_upstream_socket(inp, get_link_index(inp, memo))
+            if (colliding_socket is None) or (not is_evaluable(colliding_socket.node, match_evaluator_properties)):
+                upstream.append(None)
+                continue
+            upstream.append((colliding_socket.identifier,
+                get_node_signature(colliding_socket.node, colliding_socket, match_evaluator_properties, memo=memo)))
+            continue
+        signature = (get_node_key(node), get_node_stamp(node), get_node_properties_values(node), tuple(upstream))
+
+    memo[memokey] = signature
+
+    return signature
+
+
+def evaluate_upstream_value(sock, match_evaluator_properties:set=None, set_link_invalid:bool=False, cached_values:dict=None):
+    """evaluate the value of a socket upstream, fallback to None if the node upstream is not compatible or not linked.
+    -Pass a match_evaluator_properties set to check if the node upstream node is compatible. ex: {'INTERPOLATION_NODE',}
+    -Pass a set_link_invalid to set the link invalid if the node upstream is not compatible.
+    -Pass a cached_values dict to cache the evaluated values, in order to avoid redundand evaluations calculations.
+    The values are also cached persistently across evaluations, see EVALUATION_CACHE.
+    """
+
+    #the memo is shared with the nested evaluations of the nodes upstream, along with the links index.
+    if (EVALUATION_PASS['depth'] == 0):
+        EVALUATION_PASS['memo'] = cached_values if (cached_values is not None) else {}
+    memo = EVALUATION_PASS['memo']
+
+    colliding_socket, parcoured_links = get_upstream_socket(sock, get_link_index(sock, memo))
+
+    #nothing hit?
+    if (colliding_socket is None):
+        return None
+
     colliding_node = colliding_socket.node
 
     #we are expecting to collide with specific socket types!
-    if (not hasattr(colliding_node,'evaluator_properties')) \
-        or (not hasattr(colliding_node,'evaluator')) \
-        or (not match_evaluator_properties.intersection(colliding_node.evaluator_properties)):
-        
+    if (not is_evaluable(colliding_node, match_evaluator_properties)):
+
         # print(f"DEBUG: parcour not successful.\n{colliding_node}")
         if (set_link_invalid and parcoured_links):
             first_link = parcoured_links[0]
@@ -60,14 +266,23 @@ def evaluate_upstream_value(sock, match_evaluator_properties:set=None, set_link_
         return None
 
     #caching system, perhaps multiple input sockets links to the same out socket..
-    if (cached_values):
-          cachekey = colliding_node.name + ':' + colliding_socket.identifier
-          r = cached_values.get(cachekey)
-    else: r = None
+    cachekey = (colliding_node.as_pointer(), colliding_socket.identifier)
+    r = memo.get(cachekey)
+    if (r is not None):
+        return r.copy() if (type(r) is np.ndarray) else r
+
+    EVALUATION_PASS['depth'] += 1
+    try:
+        signature = get_node_signature(colliding_node, colliding_socket, match_evaluator_properties, memo=memo)
+        r = evaluate_cached(colliding_node, colliding_socket, signature)
+    finally:
+        EVALUATION_PASS['depth'] -= 1
+        if (EVALUATION_PASS['depth'] == 0):
+            EVALUATION_PASS['memo'] = None
 
-    if (r is None):
-        r = colliding_node.evaluator(colliding_socket)
-        if (cached_values):
-            cached_values[cachekey] = r
+    memo[cachekey] = r
 
-    return r
\ No newline at end of file
+    # NOTE the memo keeps its own array, the caller might modify the returned one in place.
+    if (type(r) is np.ndarray):
+        return r.copy()
+    return r
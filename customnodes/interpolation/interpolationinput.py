@@ -9,6 +9,7 @@ import os
 from ...__init__ import get_addon_prefs
 from ...utils.str_utils import word_wrap
 from ...utils.bezier2d_utils import reverseengineer_curvemapping_to_bezsegs
+from ..evaluator import tag_evaluator_dirty
 from ...utils.node_utils import (
     import_new_nodegroup, 
     send_refresh_signal,
@@ -169,6 +170,7 @@ class Base():
     def update_trigger(self,):
         """send an update trigger to the whole node_tree"""
 
+        tag_evaluator_dirty(self)
         send_refresh_signal(self.outputs[0])
 
         return None
@@ -6,11 +6,12 @@
 import bpy 
 import os
 import numpy as np
+from collections import OrderedDict
 
 from ... import get_addon_prefs
 from ...utils.str_utils import word_wrap
-from ...utils.bezier2d_utils import looped_offset_bezsegs
-from ..evaluator import evaluate_upstream_value
+from ...utils.bezier2d_utils import looped_offset_bezsegs, ensure_monotonic_bezsegs, hash_bezsegs
+from ..evaluator import evaluate_upstream_value, tag_evaluator_dirty, get_node_key
 from ...utils.node_utils import (
     send_refresh_signal,
 )
@@ -18,7 +19,99 @@ from ...utils.node_utils import (
 
 #TODO IMPORTANT:
 # - fix when cut occurs right in a anchor. will create a None graph suddenly.. see todo in 'looped_offset_bezsegs'
-# - we'll need to improve the evaluation system for supporting animation mode
+
+
+# Looped curves of the nodes in animation mode, filled lazily per frame while playing.
+# {node key: {'key':tuple, 'start':int, 'period':int, 'frames':{frame slot:segments}, 'hits':int, 'store':bool}}
+# frames are cached within the scene frame range, or within one loop period if the speed makes it periodic.
+PLAYBACK_CACHE = OrderedDict()
+PLAYBACK_CACHE_MAX = 64 #nodes
+
+
+def clear_playback_cache() -> None:
+    """forget all cached looped curves, should be done when the data is reloaded (undo, file load)"""
+
+    PLAYBACK_CACHE.clear()
+    return None
+
+
+def get_loop_period(distance:float, speed:float, fps:float, tolerance:float=1e-6) -> int:
+    """get the number of frames after which the animated loop repeats itself, 0 if it's not periodic on whole frames"""
+
+    if (speed == 0.0):
+        return 1
+
+    period = (distance * fps) / abs(speed)
+    rounded = round(period)
+    if (rounded >= 1) and (abs(period - rounded) < tolerance):
+        return int(rounded)
+
+    return 0
+
+
+def get_looped_playback(node, segments:np.ndarray, frame:int, scene) -> np.ndarray:
+    """get the looped curve of an animated loop node at the given frame, from the playback cache.
+    The frames are computed lazily, the cache is reset when the upstream curve, the speed, or the scene timing changes.
+    If the upstream curve changes on every frame (animated), the cache is bypassed."""
+
+    fps = scene.render.fps
+    speed = node.speed
+    key = (hash_bezsegs(segments), segments.shape, speed, fps, scene.frame_start, scene.frame_end)
+    nodekey = get_node_key(node)
+
+    cache = PLAYBACK_CACHE.get(nodekey)
+    if (cache is None) or (cache['key'] != key):
+
+        # the monotonic curve is shared by all frames
+        mono_segments = ensure_monotonic_bezsegs(segments)
+        distance = mono_segments[-1, 6] - mono_segments[0, 0]
+        period = get_loop_period(distance, speed, fps)
+
+        # NOTE if a loop period is shorter than the frame range, we only need to cache one period.
+        frame_count = scene.frame_end - scene.frame_start + 1
+        if (period) and (period <= frame_count):
+              start = 0
+        else: start, period = scene.frame_start, 0
+
+        # NOTE the key churns if it changed before any cached frame got reused, storing frames would be a waste.
+        churning = (cache is not None) and (cache['hits'] == 0)
+
+        cache = PLAYBACK_CACHE[nodekey] = {
+            'key': key,
+            'start': start,
+            'period': period,
+            'mono_segments': mono_segments,
+            'frames': {},
+            'hits': 0,
+            'store': not churning,
+            }
+        if (len(PLAYBACK_CACHE) > PLAYBACK_CACHE_MAX):
+            PLAYBACK_CACHE.popitem(last=False)
+
+    # the key is stable again, we can store the frames
+    elif (not cache['store']):
+        cache['store'] = True
+
+    PLAYBACK_CACHE.move_to_end(nodekey)
+
+    if (cache['period']):
+          slot = frame % cache['period']
+    else: slot = frame if (0 <= frame - cache['start'] < scene.frame_end - scene.frame_start + 1) else None
+
+    r = cache['frames'].get(slot)
+    if (r is not None):
+        cache['hits'] += 1
+        return r.copy()
+
+    r = looped_offset_bezsegs(cache['mono_segments'], offset=speed * ((slot if (slot is not None) else frame) / fps))
+
+    # frames out of the scene frame range are not cached
+    if (slot is not None) and (cache['store']):
+        cache['frames'][slot] = r
+        return r.copy()
+
+    return r
+
 
 # ooooo      ooo                 .o8            
 # `888b.     `8'                "888            
@@ -39,6 +132,11 @@ class NODEBOOSTER_ND_InterpolationLoop(bpy.types.Node):
 
     evaluator_properties = {'INTERPOLATION_NODE',}
 
+    @property
+    def evaluator_volatile(self):
+        """the animated loop depends on the current frame, we can't rely on cached evaluations"""
+        return (self.mode == 'ANIMATION')
+
     mode : bpy.props.EnumProperty(
         name="Mode",
         description="Loop an interpolation 2D curve from a given offset or speed.",
@@ -95,6 +193,7 @@ class NODEBOOSTER_ND_InterpolationLoop(bpy.types.Node):
     def update_trigger(self,):
         """send an update trigger to the whole node_tree"""
 
+        tag_evaluator_dirty(self)
         send_refresh_signal(self.outputs[0])
 
         return None
@@ -111,11 +210,10 @@ class NODEBOOSTER_ND_InterpolationLoop(bpy.types.Node):
         
         match self.mode:
             case 'OFFSET':
-                offset = self.offset
+                return looped_offset_bezsegs(val, offset=self.offset)
             case 'ANIMATION':
-                offset = self.speed * (bpy.context.scene.frame_current / bpy.context.scene.render.fps)
-
-        return looped_offset_bezsegs(val, offset=offset)
+                scene = bpy.context.scene
+                return get_looped_playback(self, val, scene.frame_current, scene)
 
     def draw_buttons(self, context, layout):
         """node interface drawing"""
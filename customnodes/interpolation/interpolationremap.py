@@ -160,6 +160,7 @@ class Base():
 
         #get all nodes connected to the value socket
         cache = {}
+        is_dirty = False
         for k,c in sock_to_evaluate.items():
             sock = self.inputs[k]
             # retrieve the value from the node behind.
@@ -170,12 +171,16 @@ class Base():
                 cached_values=cache,
                 )
             # if the evaluator system failed to retrieve a value, we reset the curve to default..
-            # else we set the points.
+            # else we set the points. only the points that changed are written.
             if (val is None):
-                  reset_curvemapping(c)
-            else: bezsegs_to_curvemapping(c, val)
+                  is_dirty |= reset_curvemapping(c)
+            else: is_dirty |= bezsegs_to_curvemapping(c, val)
             continue
 
+        # the curves are identical, no need to refresh the nodetree.
+        if (not is_dirty):
+            return None
+
         # NOTE unfortunately python API for curve mapping is meh..
         # we need to send an update trigger. Maybe there's a solution for this?.
         for nd in self.node_tree.nodes:
@@ -10,7 +10,7 @@ import numpy as np
 from ...__init__ import get_addon_prefs
 from ...utils.str_utils import word_wrap
 from ...utils.bezier2d_utils import extend_bezsegs
-from ..evaluator import evaluate_upstream_value
+from ..evaluator import evaluate_upstream_value, tag_evaluator_dirty
 from ...utils.node_utils import (
     send_refresh_signal,
 )
@@ -86,6 +86,7 @@ class NODEBOOSTER_ND_2DCurveExtend(bpy.types.Node):
     def update_trigger(self,):
         """send an update trigger to the whole node_tree"""
 
+        tag_evaluator_dirty(self)
         send_refresh_signal(self.outputs[0])
 
         return None
@@ -8,11 +8,37 @@ import numpy as np
 
 from ...utils.bezier2d_utils import reverseengineer_curvemapping_to_bezsegs
 from ...utils.str_utils import word_wrap # Added for draw_panel
+from ..evaluator import tag_evaluator_dirty, get_node_key
 from ...utils.node_utils import (
     send_refresh_signal,
     )
 
 
+# Extracted 2D curves of the nodes {node key: (key, fingerprint, segments)}
+# the entries are validated against a fingerprint of the curve points and object matrix, read in batches on each evaluation.
+# this way animated points, or an animated object in world space, are never stale.
+CURVEINPUT_CACHE = {}
+
+
+def clear_curveinput_cache() -> None:
+    """forget all extracted curves"""
+
+    CURVEINPUT_CACHE.clear()
+    return None
+
+
+def read_bezier_points(bezier_points) -> np.ndarray:
+    """read the co, handle_left and handle_right of the bezier points in batches, as a (3,N,3) float32 array"""
+
+    count = len(bezier_points)
+    buffer = np.empty((3, count * 3), dtype=np.float32)
+    for i, attr in enumerate(('co', 'handle_left', 'handle_right')):
+        bezier_points.foreach_get(attr, buffer[i])
+        continue
+
+    return buffer.reshape(3, count, 3)
+
+
 class NODEBOOSTER_ND_2DCurveInput(bpy.types.Node):
 
     bl_idname = "NodeBooster2DCurveInput" 
@@ -22,6 +48,7 @@ class NODEBOOSTER_ND_2DCurveInput(bpy.types.Node):
     tree_type = "*ChildrenDefined*"
 
     evaluator_properties = {'INTERPOLATION_NODE',}
+    evaluator_volatile = True #the curve object data can change at any time, we can't rely on cached evaluations.
 
     curve_object: bpy.props.PointerProperty(
         type=bpy.types.Object,
@@ -85,6 +112,7 @@ class NODEBOOSTER_ND_2DCurveInput(bpy.types.Node):
     def update_trigger(self,):
         """send an update trigger to the whole node_tree"""
 
+        tag_evaluator_dirty(self)
         send_refresh_signal(self.outputs[0])
 
         return None
@@ -142,47 +170,44 @@ class NODEBOOSTER_ND_2DCurveInput(bpy.types.Node):
         if (len(bezier_points) < 2):
             return None
 
-        # Get the transformation matrix based on selected space
-        transform_matrix = curve_obj.matrix_world if (self.space == 'WORLD') else None
+        # the curve is extracted once, until the points or the object matrix change.
+        points = read_bezier_points(bezier_points)
+        matrix = np.array(curve_obj.matrix_world, dtype=np.float64) if (self.space == 'WORLD') else None
+        fingerprint = (points, matrix)
 
-        # Determine which axes map to 2D X and Y
-        match self.axis_source:
-            case 'X': idx_2d_x, idx_2d_y = 1, 2 # Use World Y, Z
-            case 'Y': idx_2d_x, idx_2d_y = 0, 2 # Use World X, Z
-            case 'Z': idx_2d_x, idx_2d_y = 0, 1 # Use World X, Y
-
-        # Build Bezier Segment Array Directly
-        bezsegs_list = []
-        num_segments = len(bezier_points) - 1
-        for i in range(num_segments):
-            bp_i = bezier_points[i]
-            bp_i1 = bezier_points[i+1]
-
-            # Get the 4 relevant 3D world-space points for the segment
-            P0_3d = bp_i.co
-            P1_3d = bp_i.handle_right
-            P2_3d = bp_i1.handle_left
-            P3_3d = bp_i1.co
-
-            # Apply transform if needed
-            if (transform_matrix):
-                P0_3d = transform_matrix @ P0_3d
-                P1_3d = transform_matrix @ P1_3d
-                P2_3d = transform_matrix @ P2_3d
-                P3_3d = transform_matrix @ P3_3d
-
-            # Extract the chosen 2 axes for each point
-            P0 = np.array([P0_3d[idx_2d_x], P0_3d[idx_2d_y]])
-            P1 = np.array([P1_3d[idx_2d_x], P1_3d[idx_2d_y]])
-            P2 = np.array([P2_3d[idx_2d_x], P2_3d[idx_2d_y]])
-            P3 = np.array([P3_3d[idx_2d_x], P3_3d[idx_2d_y]])
-
-            segment = np.concatenate((P0, P1, P2, P3))
-            bezsegs_list.append(segment)
-            
-            continue
+        key = (curve_obj.name, curve_data.name, self.spline_index, self.axis_source, self.space)
+        nodekey = get_node_key(self)
+        cache = CURVEINPUT_CACHE.get(nodekey)
+        if (cache is not None) and (cache[0] == key) \
+            and np.array_equal(cache[1][0], points) \
+            and ((matrix is None) or np.array_equal(cache[1][1], matrix)):
+            return cache[2]
 
-        if (not bezsegs_list):
-             return None
-        return np.array(bezsegs_list, dtype=float)
+        co, handle_left, handle_right = points.astype(np.float64)
 
+        # Apply transform if needed
+        if (matrix is not None):
+            rotscale, translation = matrix[:3,:3].T, matrix[:3,3]
+            co = co @ rotscale + translation
+            handle_left = handle_left @ rotscale + translation
+            handle_right = handle_right @ rotscale + translation
+
+        # Determine which axes map to 2D X and Y
+        match self.axis_source:
+            case 'X': axes = [1, 2] # Use World Y, Z
+            case 'Y': axes = [0, 2] # Use World X, Z
+            case 'Z': axes = [0, 1] # Use World X, Y
+
+        # Build Bezier Segment Array Directly, each segment goes from a point to the next one.
+        # [P0, P1, P2, P3] = [co[i], handle_right[i], handle_left[i+1], co[i+1]]
+        segments = np.concatenate((
+            co[:-1, axes],
+            handle_right[:-1, axes],
+            handle_left[1:, axes],
+            co[1:, axes],
+            ), axis=1)
+
+        # NOTE the returned array is shared with the cache, the evaluator give copies away downstream.
+        CURVEINPUT_CACHE[nodekey] = (key, fingerprint, segments)
+
+        return segments
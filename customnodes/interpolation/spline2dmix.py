@@ -10,7 +10,7 @@ import numpy as np
 from ... import get_addon_prefs
 from ...utils.str_utils import word_wrap
 from ...utils.bezier2d_utils import lerp_bezsegs
-from ..evaluator import evaluate_upstream_value
+from ..evaluator import evaluate_upstream_value, tag_evaluator_dirty
 from ...utils.node_utils import (
     send_refresh_signal,
 )
@@ -76,6 +76,7 @@ class NODEBOOSTER_ND_2DCurvesMix(bpy.types.Node):
     def update_trigger(self,):
         """send an update trigger to the whole node_tree"""
 
+        tag_evaluator_dirty(self)
         send_refresh_signal(self.outputs[0])
 
         return None
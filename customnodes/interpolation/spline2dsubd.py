@@ -10,7 +10,7 @@ import numpy as np
 from ... import get_addon_prefs
 from ...utils.str_utils import word_wrap
 from ...utils.bezier2d_utils import casteljau_subdiv_bezsegs, cut_bezsegs, subdiv_project_bezsegs
-from ..evaluator import evaluate_upstream_value
+from ..evaluator import evaluate_upstream_value, tag_evaluator_dirty
 from ...utils.node_utils import (
     send_refresh_signal,
 )
@@ -108,6 +108,7 @@ class NODEBOOSTER_ND_2DCurveSubdiv(bpy.types.Node):
             self.inputs[0].name = 'To Subdivide'
             self.inputs[1].enabled = True
 
+        tag_evaluator_dirty(self)
         send_refresh_signal(self.outputs[0])
 
         return None
@@ -30,6 +30,7 @@ from ..utils.node_utils import (
     remove_ng_socket,
     link_sockets,
     create_ng_constant_node,
+    arrange_nodes_layered,
 )
 from ..nex.nodesetter import (
     get_nodesetter_functions, 
@@ -637,6 +638,9 @@ class Base():
             self.error_message = str(e)
             return None
 
+        # The nodes were chained off the active node, we arrange them by their links.
+        arrange_nodes_layered(ng)
+
         #we count the number of nodes
         self.debug_nodes_quantity = len(ng.nodes)
 
@@ -16,12 +16,13 @@
 
 
 import bpy
-import time
-import math
+import numpy as np
+from mathutils import Matrix, Vector, Quaternion, Euler
 
 from ..__init__ import get_addon_prefs
 from ..utils.str_utils import word_wrap
 from ..resources import cust_icon
+from ..utils.nbr_utils import RingBuffer, polyfit_derivatives
 from ..utils.node_utils import (
     create_new_nodegroup,
     set_ng_socket_defvalue,
@@ -33,90 +34,203 @@ from ..utils.node_utils import (
 
 DEBUG = False
 
+# Layout of the rows stored in the per-object history ring buffers.
+HIST_FRAME, HIST_TIME = 0, 1
+HIST_LOC, HIST_ROT, HIST_SCA = slice(2,5), slice(5,8), slice(8,11)
+HIST_WIDTH = 11
+HIST_FRAMES = 10 #how many frames back do we look when fitting the motion
+
 def init_objvelocities():
     """Initialize object velocities dictionary on WindowManager"""
     if not hasattr(bpy.types.WindowManager, "objvelocities"):
         bpy.types.WindowManager.objvelocities = {}
     return None
 
-def calculate_object_metrics(history: list) -> tuple:
+def calculate_object_metrics(history:np.ndarray) -> tuple:
     """Calculate object velocity, acceleration and stopping power in 3D space.
-    Expects a history list with [(location, rotation, scale, frame_time), ...]
+    Expects a chronological history array of rows laid out as described by the HIST_ constants.
+    The velocity and acceleration are estimated with a least-squares polynomial fit over the whole history window.
     Returns a tuple with (direction vector, velocity magnitude, acceleration, stopping power)"""
 
-    if (not history) or (len(history) < 2):
+    if (history is None) or (len(history) < 2):
         return (0.0, 0.0, 0.0), 0.0, 0.0, 0.0
 
-    # Get the oldest and newest positions
-    oldest_entry, newest_entry = history[0], history[-1]
-    middle_entry = None
+    times = history[:,HIST_TIME]
+    locs = history[:,HIST_LOC]
 
     # Calculate time difference in seconds (frame_time is in seconds)
-    time_diff = newest_entry[3] - oldest_entry[3]
-    
+    time_diff = times[-1] - times[0]
     if (time_diff <= 0):
         return (0.0, 0.0, 0.0), 0.0, 0.0, 0.0
 
-    # Calculate distance moved
-    dx = newest_entry[0][0] - oldest_entry[0][0]
-    dy = newest_entry[0][1] - oldest_entry[0][1]
-    dz = newest_entry[0][2] - oldest_entry[0][2]
-    distance = math.sqrt(dx*dx + dy*dy + dz*dz)
-
-    # Calculate velocity in m/s
-    velocity_magnitude = distance / time_diff
-
-    # Calculate normalized direction vector
-    direction = (0.0, 0.0, 0.0) 
-    if (distance > 0.0):
-        direction = (dx/distance, dy/distance, dz/distance)
-
-    # Calculate acceleration and stopping power
-    acceleration = 0.0
-    stopping_power = 0.0
-
-    # We need at least 3 history points to calculate acceleration
-    if (len(history) >= 3):
-        middle_entry = history[len(history) // 2]
-
-        # Calculate velocity at the middle point
-        middle_time_diff = middle_entry[3] - oldest_entry[3]
-        if (middle_time_diff > 0):
-
-            mdx = middle_entry[0][0] - oldest_entry[0][0]
-            mdy = middle_entry[0][1] - oldest_entry[0][1]
-            mdz = middle_entry[0][2] - oldest_entry[0][2]
-            middle_distance = math.sqrt(mdx*mdx + mdy*mdy + mdz*mdz)
-            middle_velocity = middle_distance / middle_time_diff
-
-            # Calculate velocity at the newest point
-            newest_time_diff = newest_entry[3] - middle_entry[3]
-            if (newest_time_diff > 0):
-
-                ndx = newest_entry[0][0] - middle_entry[0][0]
-                ndy = newest_entry[0][1] - middle_entry[0][1]
-                ndz = newest_entry[0][2] - middle_entry[0][2]
-                newest_distance = math.sqrt(ndx*ndx + ndy*ndy + ndz*ndz)
-                newest_velocity = newest_distance / newest_time_diff
-
-                # Calculate acceleration and stopping power
-                velocity_diff = newest_velocity - middle_velocity
-
-                # If velocity is increasing, it's acceleration
-                if (velocity_diff > 0):
-                    acceleration = velocity_diff / (newest_entry[3] - middle_entry[3])
-                # If velocity is decreasing, it's stopping power
-                elif (velocity_diff < 0):
-                    stopping_power = -velocity_diff / (newest_entry[3] - middle_entry[3])
+    # Fit the trajectory, evaluated at the newest sample. in m/s and m/s²
+    velocity, acceleration_vec = polyfit_derivatives(times, locs, degree=2)
 
     if (DEBUG):
-        print(f" -oldest_entry: {oldest_entry}")
-        print(f" -newest_entry: {newest_entry}")
-        print(f" -middle_entry: {middle_entry}")
+        print(f" -samples: {len(history)}")
         print(f" -time_diff: {time_diff}")
+        print(f" -velocity_vec: {velocity}")
+        print(f" -acceleration_vec: {acceleration_vec}")
+
+    return compose_object_metrics(velocity, acceleration_vec)
+
+def compose_object_metrics(velocity:np.ndarray, acceleration_vec:np.ndarray) -> tuple:
+    """Convert a velocity and acceleration vector into our node outputs.
+    Returns a tuple with (direction vector, velocity magnitude, acceleration, stopping power)"""
+
+    # Calculate velocity magnitude and normalized direction vector
+    velocity_magnitude = float(np.linalg.norm(velocity))
+    direction = (0.0, 0.0, 0.0)
+    if (velocity_magnitude > 0.0):
+        direction = tuple((velocity / velocity_magnitude).tolist())
+
+    # The rate of change of the speed is the acceleration projected on the direction of travel.
+    # If velocity is increasing, it's acceleration, if decreasing, it's stopping power.
+    speed_change = float(np.dot(acceleration_vec, direction))
+    acceleration = max(speed_change, 0.0)
+    stopping_power = max(-speed_change, 0.0)
 
     return direction, velocity_magnitude, acceleration, stopping_power
 
+# Random access evaluation. The objects world matrices are computed from their animation curves at neighbouring subframes,
+# without changing the scene frame: frame_set() would re-send the frame & depsgraph signals to every other node, and is unsafe during renders.
+# Results are memorized per {(object name, frame+subframe, delta):metrics}, and invalidated on depsgraph changes of the object or actions.
+# Objects whose transforms can't be computed from their curves (constraints, drivers, NLA, bone parents, physics, or no animation
+# curves at all, they might be moved by scripts) are memorized as None, these nodes fall back on the playback history.
+
+SUBFRAME_MEMO = {}
+SUBFRAME_MEMO_MAX = 4096
+ROTATION_PATHS = {'QUATERNION':'rotation_quaternion', 'AXIS_ANGLE':'rotation_axis_angle',}
+PHYSICS_MODIFIERS = {'CLOTH', 'SOFT_BODY', 'FLUID',}
+
+def get_transforms_fcurves(obj) -> dict|None:
+    """get the fcurves animating the object transforms {(data_path, index):fcurve}, None if they can't be evaluated alone"""
+
+    if (obj.constraints and any(c.enabled for c in obj.constraints)):
+        return None
+    if (obj.parent is not None) and (obj.parent_type != 'OBJECT'):
+        return None
+    if (obj.rigid_body is not None) or any(m.type in PHYSICS_MODIFIERS for m in obj.modifiers):
+        return None
+
+    anim = obj.animation_data
+    if (anim is None):
+        return {}
+    if (anim.drivers and any(d.data_path.startswith(('location','rotation','scale','delta_')) for d in anim.drivers)):
+        return None
+    if any(strip.mute is False for track in anim.nla_tracks if (not track.mute) for strip in track.strips):
+        return None
+    if (anim.action is None):
+        return {}
+
+    # NOTE since 4.4 actions are layered, their fcurves are stored per slot.
+    try:
+        from bpy_extras.anim_utils import action_get_channelbag_for_slot
+        channelbag = action_get_channelbag_for_slot(anim.action, anim.action_slot)
+        fcurves = channelbag.fcurves if (channelbag is not None) else []
+    except ImportError:
+        fcurves = anim.action.fcurves
+
+    return {(fc.data_path, fc.array_index):fc for fc in fcurves if (not fc.mute)}
+
+def is_curves_animated(obj) -> bool:
+    """check if the object or one of its parents transforms are animated by curves"""
+
+    while (obj is not None):
+        if (get_transforms_fcurves(obj)):
+            return True
+        obj = obj.parent
+        continue
+
+    return False
+
+def get_animated_matrix_world(obj, times:list) -> list|None:
+    """compute the world matrices of an object at the given times (in frames), from its animation curves and its parents ones.
+    Returns None if the object transforms can't be evaluated from their curves alone."""
+
+    fcurves = get_transforms_fcurves(obj)
+    if (fcurves is None):
+        return None
+
+    def channel(path, default, t):
+        return [fcurves[(path,i)].evaluate(t) if ((path,i) in fcurves) else v for i,v in enumerate(default)]
+
+    rotation_path = ROTATION_PATHS.get(obj.rotation_mode, 'rotation_euler')
+    # NOTE the delta euler follows the object rotation order, there's no delta rotation in axis angle mode.
+    match obj.rotation_mode:
+        case 'QUATERNION': delta_rot = obj.delta_rotation_quaternion.to_matrix()
+        case 'AXIS_ANGLE': delta_rot = Matrix.Identity(3)
+        case _:            delta_rot = Euler(obj.delta_rotation_euler, obj.rotation_mode).to_matrix()
+
+    matrices = []
+    for t in times:
+        loc = Vector(channel('location', obj.location, t)) + obj.delta_location
+        sca = Vector(channel('scale', obj.scale, t)) * obj.delta_scale
+        rot = channel(rotation_path, getattr(obj, rotation_path), t)
+        match obj.rotation_mode:
+            case 'QUATERNION': rot = Quaternion(rot).normalized()
+            case 'AXIS_ANGLE': rot = Quaternion(rot[1:], rot[0])
+            case _:            rot = Euler(rot, obj.rotation_mode)
+        matrices.append(Matrix.LocRotScale(loc, delta_rot @ rot.to_matrix(), sca))
+        continue
+
+    if (obj.parent is not None):
+        parents = get_animated_matrix_world(obj.parent, times)
+        if (parents is None):
+            return None
+        matrices = [p @ obj.matrix_parent_inverse @ m for p, m in zip(parents, matrices)]
+
+    return matrices
+
+def sample_subframe_metrics(scene, objects:list, delta:float) -> None:
+    """Evaluate the given objects at frame±delta from their animation curves, and store their metrics in the SUBFRAME_MEMO.
+    The scene frame is never changed, this is safe to run from the frame handlers and during renders."""
+
+    time = scene.frame_current + scene.frame_subframe
+    objects = [o for o in objects if ((o.name, time, delta) not in SUBFRAME_MEMO)]
+    if (not objects):
+        return None
+
+    if (len(SUBFRAME_MEMO) > SUBFRAME_MEMO_MAX):
+        SUBFRAME_MEMO.clear()
+
+    # central finite differences, in seconds
+    h = delta / scene.render.fps
+
+    for o in objects:
+        #not animated by curves? the object might be moved by a script, we can't tell it's static.
+        matrices = get_animated_matrix_world(o, (time-delta, time, time+delta)) if is_curves_animated(o) else None
+        if (matrices is None):
+            SUBFRAME_MEMO[(o.name, time, delta)] = None
+            continue
+        l0, l1, l2 = (np.array(m.to_translation(), dtype=np.float64) for m in matrices)
+        velocity = (l2 - l0) / (2.0 * h)
+        acceleration = (l2 - 2.0 * l1 + l0) / (h * h)
+        SUBFRAME_MEMO[(o.name, time, delta)] = compose_object_metrics(velocity, acceleration)
+        continue
+
+    return None
+
+def objvelocity_depsgraph_callback(depsgraph) -> None:
+    """invalidate the memorized subframe evaluations of the objects that changed"""
+
+    if (not SUBFRAME_MEMO):
+        return None
+
+    #an edited action may animate any object
+    if any(isinstance(u.id, bpy.types.Action) for u in depsgraph.updates):
+        SUBFRAME_MEMO.clear()
+        return None
+
+    updated = {u.id.name for u in depsgraph.updates if isinstance(u.id, bpy.types.Object)}
+    #the children motion depends on their parents
+    updated |= {c.name for u in depsgraph.updates if isinstance(u.id, bpy.types.Object) for c in u.id.original.children_recursive}
+    if (updated):
+        for k in [k for k in SUBFRAME_MEMO if (k[0] in updated)]:
+            del SUBFRAME_MEMO[k]
+
+    return None
+
 # ooooo      ooo                 .o8            
 # `888b.     `8'                "888            
 #  8 `88b.    8   .ooooo.   .oooo888   .ooooo.  
@@ -132,6 +246,7 @@ class Base():
     bl_description = """Track an object's velocity, acceleration, and stopping power.
     • Monitors the selected object's position, rotation, and scale.
     • Calculates velocity, acceleration, and stopping power in real-time.
+    • Use the 'Random Access' mode when scrubbing the timeline or rendering frames out of order.
     • Provides damping controls to smooth the motion data."""
     auto_update = {'FRAME_PRE',}
     tree_type = "*ChildrenDefined*"
@@ -141,6 +256,22 @@ class Base():
         name="Target Object",
         description="Object to track velocity"
         )
+    velocity_mode: bpy.props.EnumProperty(
+        name="Mode",
+        description="How is the motion of the object evaluated?",
+        default='HISTORY',
+        items=(('HISTORY', "Playback History", "Fit the motion over the previously played frames. Fast, but the timeline needs to be played in order"),
+               ('SUBFRAME', "Random Access", "Evaluate the object animation curves at neighbouring subframes. Deterministic when scrubbing, jumping frames or rendering frames out of order. Objects moved by constraints, drivers, NLA strips, physics, or not animated by curves fall back on the playback history"),),
+        update=lambda self, context: self.sync_out_values(),
+        )
+    subframe_delta: bpy.props.FloatProperty(
+        name="Subframe Delta",
+        description="Offset in frames before and after the current frame, used to evaluate the object motion in 'Random Access' mode",
+        min=0.01,
+        max=1.0,
+        default=0.5,
+        update=lambda self, context: self.sync_out_values(),
+        )
     use_velocity_damping: bpy.props.BoolProperty(
         name="Velocity Damping",
         description="Enable or disable velocity damping. When disabled, velocity will stop immediately.",
@@ -226,6 +357,22 @@ class Base():
             set_ng_socket_defvalue(ng, socket_name="Stopping Power", value=0.0)
             return None
         
+        if (self.velocity_mode=='SUBFRAME'):
+            scene = context.scene
+            key = (self.target_obj.name, scene.frame_current + scene.frame_subframe, self.subframe_delta)
+            if (key not in SUBFRAME_MEMO):
+                sample_subframe_metrics(scene, [self.target_obj], self.subframe_delta)
+
+            #None if the object motion can't be evaluated from its curves, we fall back on the playback history.
+            metrics = SUBFRAME_MEMO[key]
+            if (metrics is not None):
+                direction, velocity_magnitude, acceleration, stopping_power = metrics
+                set_ng_socket_defvalue(ng, socket_name="Direction", value=direction)
+                set_ng_socket_defvalue(ng, socket_name="Velocity", value=velocity_magnitude)
+                set_ng_socket_defvalue(ng, socket_name="Acceleration", value=acceleration)
+                set_ng_socket_defvalue(ng, socket_name="Stopping Power", value=stopping_power)
+                return None
+
         # Initialize object entry if it doesn't exist
         if not hasattr(wm, "objvelocities"):
             init_objvelocities()
@@ -236,47 +383,33 @@ class Base():
         sca = tuple(self.target_obj.scale)
 
         #get the object data, where we store the object transforms per frame
-        if (self.target_obj.name not in wm.objvelocities):
-            wm.objvelocities[self.target_obj.name] = {}
-        OBJVEL = wm.objvelocities[self.target_obj.name]
-        
+        OBJVEL = wm.objvelocities.get(self.target_obj.name)
+        if (OBJVEL is None):
+            OBJVEL = wm.objvelocities[self.target_obj.name] = RingBuffer(HIST_FRAMES+1, HIST_WIDTH)
+
         # Get current frame info
         current_frame = context.scene.frame_current
         current_time = context.scene.frame_current / context.scene.render.fps
-        
+
         #if the timeline reset, we clear everything
         if (current_frame == context.scene.frame_start):
             OBJVEL.clear()
 
+        #if the frame is re-evaluated or the timeline went backward, the newer samples are obsolete
+        while (len(OBJVEL) and (OBJVEL.last()[HIST_FRAME] >= current_frame)):
+            OBJVEL.pop()
+
         # Store the current frame information
-        OBJVEL[current_frame] = {
-            "location": loc,
-            "rotation": rot,
-            "scale": sca,
-            "time": current_time,
-            }
+        OBJVEL.append((current_frame, current_time, *loc, *rot, *sca))
 
-        # Build history list for velocity calculation
-
-        history = []
-        maxhist = 10
-        stored_frames = set(sorted(OBJVEL.keys()))
-        frame_to_cover = [f for f in range(max(current_frame-maxhist,0), current_frame+1) if f in stored_frames]
-        
-        for frame in frame_to_cover:
-            frame_data = OBJVEL[frame]
-            history.append((
-                frame_data["location"],
-                frame_data["rotation"],
-                frame_data["scale"],
-                frame_data["time"]
-                ))
+        # Build history for velocity calculation, only the samples within our frame window
+        history = OBJVEL.ordered()
+        history = history[history[:,HIST_FRAME] >= (current_frame - HIST_FRAMES)]
 
         if (DEBUG):
             print("--------------------------------")
             print("current_frame", current_frame)
-            print("stored_frames", stored_frames)
-            print("frame_to_cover", frame_to_cover)
+            print("stored_frames", history[:,HIST_FRAME])
             print("calculate_object_metrics() start")
         # Calculate metrics
         direction, velocity_magnitude, acceleration, stopping_power = calculate_object_metrics(history)
@@ -334,6 +467,7 @@ class Base():
         
         col = layout.column()
         col.prop(self, "target_obj", text="")
+        col.prop(self, "velocity_mode", text="")
         
         # col.separator(factor=0.5)
         # row = col.row()
@@ -358,6 +492,20 @@ class Base():
 
             col = panel.column(align=True)
             col.prop(self, "target_obj", text="")
+            col.prop(self, "velocity_mode", text="")
+
+            if (self.velocity_mode=='SUBFRAME'):
+                col = panel.column()
+                col.use_property_split = True
+                col.use_property_decorate = False
+                col.prop(self, "subframe_delta", text="Delta")
+
+                #the object motion can't be evaluated from its curves? let the user know.
+                if (self.target_obj):
+                    scene = context.scene
+                    key = (self.target_obj.name, scene.frame_current + scene.frame_subframe, self.subframe_delta)
+                    if (key in SUBFRAME_MEMO) and (SUBFRAME_MEMO[key] is None):
+                        col.label(text="Using Playback History", icon='INFO')
 
             # header, panel = panel.panel("velocity_damping_panelid", default_closed=False)
             # header.prop(self, "use_velocity_damping", text="Velocity Damping")
@@ -395,13 +543,13 @@ class Base():
                     col.label(text="Object Data:")
                     
                     box = col.box().column(align=True)
-                    box.label(text=f"Tracked Frames: {len(OBJVEL.keys())}")
+                    box.label(text=f"Tracked Frames: {len(OBJVEL)}")
                     
                     # Show current frame velocity if available
                     current_frame = context.scene.frame_current
-                    if current_frame in OBJVEL:
+                    if len(OBJVEL) and (OBJVEL.last()[HIST_FRAME] == current_frame):
                         box.label(text=f"Current Frame: {current_frame}")
-                        box.label(text=f"Location: {OBJVEL[current_frame]['location']}")
+                        box.label(text=f"Location: {tuple(OBJVEL.last()[HIST_LOC].round(3))}")
                     
                     # Show output socket values
                     box.separator(type='LINE')
@@ -420,12 +568,22 @@ class Base():
     def update_all(cls, using_nodes=None, signal_from_handlers=False,):
         """update all instances of this node in all node trees"""
         
-        # Update all object velocity nodes
-        for node in get_all_nodes(exactmatch_idnames={
+        nodes = get_all_nodes(exactmatch_idnames={
             NODEBOOSTER_NG_GN_ObjectVelocity.bl_idname,
             NODEBOOSTER_NG_SH_ObjectVelocity.bl_idname,
             NODEBOOSTER_NG_CP_ObjectVelocity.bl_idname,
-            }):
+            })
+
+        # Random access nodes are batched, the subframes are evaluated once for all objects sharing the same delta.
+        batches = {}
+        for node in nodes:
+            if (node.target_obj and (node.velocity_mode=='SUBFRAME')):
+                batches.setdefault(node.subframe_delta, set()).add(node.target_obj)
+        for delta, objects in batches.items():
+            sample_subframe_metrics(bpy.context.scene, list(objects), delta)
+
+        # Update all object velocity nodes
+        for node in nodes:
             node.sync_out_values()
 
         return None
@@ -24,7 +24,7 @@ from ..utils.node_utils import (
     set_ng_socket_defvalue,
     remove_ng_socket,
     set_ng_socket_label,
-    get_farest_node,
+    arrange_nodes_layered,
     get_all_nodes,
     
 )
@@ -586,11 +586,9 @@ class Base():
         #we count the number of nodes
         self.debug_nodes_quantity = len(ng.nodes)
 
-        #Clean up the nodetree spacing a little, for the output node
+        #Arrange the rebuilt nodetree, the nodesetter.py arrangement only chains the nodes off the active one.
         if (is_dirty or rebuild):
-            farest = get_farest_node(ng)
-            if (farest!=out_nod):
-                out_nod.location.x = farest.location.x + 250
+            arrange_nodes_layered(ng)
 
         return None
     
@@ -27,16 +27,29 @@ from gpu_extras.batch import batch_for_shader
 
 from ..__init__ import get_addon_prefs
 from ..utils.nbr_utils import map_positions
+from ..utils.shape_utils import (
+    rectangles_geometry,
+    rectangles_outlines_geometry,
+    headers_bounds,
+    density_grid_geometry,
+)
 from ..utils.node_utils import (
-    get_node_absolute_location,
-    get_node_bounds,
-    get_nodes_bounds,
+    get_node_spatial_index,
+    get_nodes_fingerprint,
 )
 
 
 #Global dict of minimap bounds being draw, key is the area as_pointer() memory adress as str
 MINIMAP_BOUNDS = {}
 MINIMAP_VIEWBOUNDS = {}
+#Global dict of the minimap bounds in window space (xmin, ymin, xmax, ymax), for a cheap hit test of the mouse events
+MINIMAP_WINDOWBOUNDS = {}
+#Global dict of the cached minimap nodes geometry, key is (area as_pointer() as str, node_tree as_pointer())
+MINIMAP_CACHE = {}
+#The exact drawing needs to go over the time budget this many consecutive builds before we switch to the level of detail,
+#a single slow build might be the first shaders setup or a garbage collection pause. the switch is re-evaluated after a cooldown, in seconds.
+MINIMAP_OVERBUDGET_STRIKES = 2
+MINIMAP_OVERBUDGET_COOLDOWN = 10.0
 CURSOR_POSITION = {'area_id':None, 'x':0, 'y':0}
 NAVIGATION_EVENT = {'panning':False,}
 
@@ -63,6 +76,24 @@ COLOR_TAG_TO_THEME_API = {
     #'REPEAT':
 }
 
+def clear_minimap_cache() -> None:
+    """forget all cached minimap geometry, should be done when the data is reloaded (undo, file load)"""
+
+    MINIMAP_CACHE.clear()
+    return None
+
+
+def evict_minimap_cache() -> None:
+    """forget the cached minimap geometry of the areas that no longer exist"""
+
+    areas_keys = {str(area.as_pointer()) for window in bpy.context.window_manager.windows for area in window.screen.areas}
+    for cache_key in [k for k in MINIMAP_CACHE if (k[0] not in areas_keys)]:
+        del MINIMAP_CACHE[cache_key]
+        continue
+
+    return None
+
+
 def get_theme_color(node):
     """get the color of the node from the theme"""
 
@@ -194,61 +225,98 @@ def draw_spline(points, color, width):
     return None
 
 
-def draw_simple_rectangle(bounds,
-    fill_color=(0.1, 0.1, 0.1, 0.8),
-    outline_color=None,
-    outline_width=0,
-    header_height=None,
-    header_color=None,
-    ):
-    """Draw a filled rectangle an optional outline and colored header. expected a bound in location bottom left and top right"""
+def get_minimap_nodes_batches(items:list, outline_width:float=1.0) -> list:
+    """Get the batches of the minimap nodes rectangles, with their header and outlines, drawn in two draw calls.
+    expect a list of items [i, node, node_color, node_bounds, outline_width, outline_color, header_height, header_color]
+    Returns a list of (batch, line_width or None) to be drawn with draw_minimap_batches()"""
 
-    original_blend = gpu.state.blend_get()
-    gpu.state.blend_set('ALPHA')
+    batches = []
 
-    x1, y1 = bounds[0]
-    x2, y2 = bounds[1]
-    width, height = x2 - x1, y2 - y1
+    if (not items):
+        return batches
 
-    if ((width <= 0) or (height <= 0)):
-        return # Cannot draw zero or negative size rectangle
+    bounds = np.array([item[3] for item in items], dtype=np.float32).reshape(-1, 2, 2)
 
-    shader = gpu.shader.from_builtin('UNIFORM_COLOR')
+    # Cannot draw zero or negative size rectangle
+    valid = np.all(bounds[:,1] > bounds[:,0], axis=1)
+    if (not np.any(valid)):
+        return batches
 
-    # Fill
-    vertices = ((x1, y1), (x2, y1), (x1, y2), (x2, y2),)
-    indices = ((0, 1, 2), (1, 3, 2),)
-    shader.uniform_float("color", fill_color)
-    batch = batch_for_shader(shader, 'TRIS', {"pos": vertices}, indices=indices)
-    batch.draw(shader)
+    colors = np.array([item[2] for item in items], dtype=np.float32)
+    has_header = np.array([bool(item[6] and (item[6] > 0) and item[7]) for item in items]) & valid
+    has_outline = np.array([bool(item[5] and (item[4] > 0)) for item in items]) & valid
+    header_heights = np.array([item[6] if h else 0.0 for item, h in zip(items, has_header)], dtype=np.float32)
+    header_colors = np.array([item[7] if h else (0,0,0,0) for item, h in zip(items, has_header)], dtype=np.float32)
 
-    # Header?
-    if (header_height and (header_height > 0) and header_color):
+    # each node body is followed by its header, so a node is drawn above the previous ones.
+    rects = np.stack((bounds, headers_bounds(bounds, header_heights)), axis=1).reshape(-1, 2, 2)
+    rects_colors = np.stack((colors, header_colors), axis=1).reshape(-1, 4)
+    rects_mask = np.stack((valid, has_header), axis=1).ravel()
 
-        # Fill
-        header_y = y2 - header_height
-        vertices = ((x1, header_y), (x2, header_y), (x1, y2), (x2, y2),)
-        indices = ((0, 1, 2), (1, 3, 2),)
-        shader.uniform_float("color", header_color)
-        batch = batch_for_shader(shader, 'TRIS', {"pos": vertices}, indices=indices)
-        batch.draw(shader)
+    shader = gpu.shader.from_builtin('FLAT_COLOR')
 
-    # Outline?
-    if (outline_color and (outline_width > 0)):
+    # Fill & headers
+    vertices, vcolors, indices = rectangles_geometry(rects[rects_mask], rects_colors[rects_mask])
+    batches.append((batch_for_shader(shader, 'TRIS', {"pos": vertices, "color": vcolors}, indices=indices), None))
+
+    # Outlines?
+    if (np.any(has_outline) and (outline_width > 0)):
+
+        outline_colors = np.array([item[5] for item, o in zip(items, has_outline) if (o)], dtype=np.float32)
+
+        vertices, vcolors = rectangles_outlines_geometry(bounds[has_outline], outline_colors)
+        batches.append((batch_for_shader(shader, 'LINES', {"pos": vertices, "color": vcolors}), outline_width))
+
+    return batches
+
+
+def get_minimap_lod_batches(nodes_bounds:np.ndarray, frames_bounds:np.ndarray, frames_colors:list, domain:tuple, cell_size:float, color:tuple,) -> list:
+    """Get the batches of the minimap level of detail drawing: the nodes density heatmap, and the frames outlines.
+    Returns a list of (batch, line_width or None) to be drawn with draw_minimap_batches()"""
+
+    batches = []
+    shader = gpu.shader.from_builtin('FLAT_COLOR')
+
+    # Nodes density heatmap
+    if (len(nodes_bounds)):
+        vertices, vcolors, indices = density_grid_geometry(nodes_bounds, np.array(domain), max(cell_size, 1.0), color)
+        if (len(vertices)):
+            batches.append((batch_for_shader(shader, 'TRIS', {"pos": vertices, "color": vcolors}, indices=indices), None))
+
+    # Frames outlines
+    if (len(frames_bounds)):
+        vertices, vcolors = rectangles_outlines_geometry(frames_bounds, frames_colors)
+        batches.append((batch_for_shader(shader, 'LINES', {"pos": vertices, "color": vcolors}), 1.0))
+
+    return batches
 
+
+def draw_minimap_batches(batches:list) -> None:
+    """Draw the batches of get_minimap_nodes_batches()"""
+
+    if (not batches):
+        return None
+
+    original_blend = gpu.state.blend_get()
+    gpu.state.blend_set('ALPHA')
+
+    shader = gpu.shader.from_builtin('FLAT_COLOR')
+
+    for batch, line_width in batches:
         # Note: Simple line drawing, width isn't accurate pixel width
-        gpu.state.line_width_set(outline_width)
-        outline_vertices = ((x1, y1), (x2, y1), (x2, y2), (x1, y2), (x1, y1),)
-        shader.uniform_float("color", outline_color)
-        batch = batch_for_shader(shader, 'LINE_STRIP', {"pos": outline_vertices})
+        if (line_width is not None):
+            gpu.state.line_width_set(line_width)
         batch.draw(shader)
-        gpu.state.line_width_set(1.0) # Reset line width
+        if (line_width is not None):
+            gpu.state.line_width_set(1.0) # Reset line width
+        continue
 
     # Restore State
     gpu.state.blend_set(original_blend)
 
     return None
 
+
 def draw_circle(center_pos, radius, color, segments=16):
     
     original_blend = gpu.state.blend_get()
@@ -298,12 +366,40 @@ def draw_minimap(node_tree, area, window_region, view2d, space, dpi_fac, zoom,):
         ):
         MINIMAP_BOUNDS[area_key] = (Vector((0,0)), Vector((0,0)))
         MINIMAP_VIEWBOUNDS[area_key] = (Vector((0,0)), Vector((0,0)))
+        MINIMAP_WINDOWBOUNDS.pop(area_key, None)
         return None
 
     # 1. Find the minimap bounds from the nodetree.nodes
 
-    #rassemble all nodes bounds
-    bounds_nodetree = get_nodes_bounds(node_tree.nodes)
+    # NOTE the nodes geometry is cached per area & node_tree, and only recomputed when the nodetree changes.
+    # panning and zooming the view only redraw the view zone.
+    cache_key = (area_key, node_tree.as_pointer())
+    fingerprint = get_nodes_fingerprint(node_tree.nodes)
+    cache = MINIMAP_CACHE.get(cache_key)
+    if (cache is None) or (cache['fingerprint'] != fingerprint):
+        if (cache is None):
+            evict_minimap_cache()
+        all_nodes = node_tree.nodes[:]
+        nodes_bounds = get_node_spatial_index(node_tree).bounds.copy()
+        nodes_types = [n.type for n in all_nodes]
+        is_lod_node = np.array([t not in {'FRAME','REROUTE'} for t in nodes_types], dtype=bool)
+        cache = MINIMAP_CACHE[cache_key] = {
+            'fingerprint': fingerprint,
+            'bounds_nodetree': (Vector(nodes_bounds[:,0].min(axis=0)), Vector(nodes_bounds[:,1].max(axis=0))), #rassemble all nodes bounds
+            'nodes_bounds': nodes_bounds,
+            'nodes_types': nodes_types,
+            'nodes_count': int(np.count_nonzero(is_lod_node)),
+            'nodes_median_width': float(np.median(nodes_bounds[is_lod_node,1,0] - nodes_bounds[is_lod_node,0,0])) if np.any(is_lod_node) else 0.0,
+            # the node count at which the exact drawing went over the frame time budget, when, and how many times in a row.
+            # kept across changes.
+            'overbudget_count': cache['overbudget_count'] if (cache is not None) else None,
+            'overbudget_time': cache['overbudget_time'] if (cache is not None) else 0.0,
+            'overbudget_strikes': cache['overbudget_strikes'] if (cache is not None) else 0,
+            'draw_key': None,
+            'batches': None,
+            }
+
+    bounds_nodetree = cache['bounds_nodetree']
     bound_nodetree_bottomleft, bound_nodetree_topright = bounds_nodetree
     node_tree_width = bound_nodetree_topright.x - bound_nodetree_bottomleft.x
     node_tree_height = bound_nodetree_topright.y - bound_nodetree_bottomleft.y
@@ -410,6 +506,10 @@ def draw_minimap(node_tree, area, window_region, view2d, space, dpi_fac, zoom,):
     
     # communicate the bounds with the navigation operator
     MINIMAP_BOUNDS[area_key] = bounds_minimap_background
+    MINIMAP_WINDOWBOUNDS[area_key] = (
+        window_region.x + bounds_minimap_background[0].x, window_region.y + bounds_minimap_background[0].y,
+        window_region.x + bounds_minimap_background[1].x, window_region.y + bounds_minimap_background[1].y,
+        )
     
     # 3.1 Also get the bouds of the nodetree zone of the minimap 
     # (might not be the same as the minimap bounds if the crop aspect ration is enabled)
@@ -449,94 +549,153 @@ def draw_minimap(node_tree, area, window_region, view2d, space, dpi_fac, zoom,):
 
     # 4. draw nodes within minimap
 
-    all_nodes = node_tree.nodes[:]
-
-    # gather all nodes types for header color
+    # gather the theme colors
     user_theme = bpy.context.preferences.themes.get('Default')
     node_theme = user_theme.node_editor
     active_theme = node_theme.node_active[:3] + (1,)
     select_theme = node_theme.node_selected[:3] + (1,)
-    all_colors = [get_theme_color(n) for n in all_nodes]
-
-    # gather select states
-    all_select_states = [n.select for n in all_nodes]
-    all_active_states = [n == node_tree.nodes.active for n in all_nodes]
-
-    # gather bounds positions and map them 2x bounds loc per node
-    all_bounds = [loc for node in all_nodes for loc in get_node_bounds(node)] 
-    all_positions = map_positions(np.array(all_bounds), bounds_nodetree, bounds_minimap_nodetree,)
-
-    # sort the element we are going to draw arranged with their draw args as well..
-    frame_to_draw, node_to_draw = [], []
-
-    for i in range(len(all_nodes)):        
 
-        node = all_nodes[i]
+    # 4.1 Level of detail: very large or very dezoomed nodetrees would draw sub-pixels rectangles.
+    # instead we draw a density heatmap of the nodes, and the frames outlines.
 
-        #we skip reroutes..
-        if (node.type =='REROUTE'):
-            continue
+    use_lod = False
+    if (scene_sett.minimap_lod_enable):
+        scale = min(
+            (bounds_minimap_nodetree[1].x - bounds_minimap_nodetree[0].x) / node_tree_width,
+            (bounds_minimap_nodetree[1].y - bounds_minimap_nodetree[0].y) / node_tree_height,
+            )
+        # the time budget switch expires after a cooldown, the exact drawing is measured again.
+        overbudget_count = cache['overbudget_count']
+        if (overbudget_count is not None) and (time.perf_counter() - cache['overbudget_time'] > MINIMAP_OVERBUDGET_COOLDOWN):
+            overbudget_count = cache['overbudget_count'] = None
+            cache['overbudget_strikes'] = 0
+        use_lod = (cache['nodes_count'] >= scene_sett.minimap_lod_node_threshold) \
+            or (cache['nodes_median_width'] * scale < scene_sett.minimap_lod_node_minsize) \
+            or ((overbudget_count is not None) and (cache['nodes_count'] >= overbudget_count))
+
+    # the nodes geometry also depends on the minimap placement and drawing settings.
+    draw_key = (
+        use_lod, scene_sett.minimap_lod_cell_size, tuple(scene_sett.minimap_lod_color),
+        tuple(bounds_minimap_nodetree[0]), tuple(bounds_minimap_nodetree[1]),
+        dezoom_factor, rescale_factor, active_theme, select_theme,
+        scene_sett.minimap_node_draw_typecolor, tuple(scene_sett.minimap_node_body_color),
+        scene_sett.minimap_node_draw_selection, scene_sett.minimap_node_outline_width,
+        scene_sett.minimap_node_draw_header, scene_sett.minimap_node_header_height,
+        scene_sett.minimap_node_header_minheight, scene_sett.minimap_node_draw_customcolor,
+        )
 
-        #get the node main color
-        node_color = all_colors[i]
-        # does the user allows to draw a custom color tho?
-        if (not scene_sett.minimap_node_draw_typecolor):
-            node_color = scene_sett.minimap_node_body_color
-
-        #special color if muted
-        if (node.mute):
-            node_color = (*node_color[:3], 0.15)
-        #special color for frame, their alpha is faded..
-        if (node.type == 'FRAME'):
-            node_color = (*node_color[:3], 0.4)
-
-        #selectin states
-        select = all_select_states[i]
-        active = all_active_states[i]
-        if (not scene_sett.minimap_node_draw_selection):
-            select = select and active
-
-        #get bounds
-        node_bounds = all_positions[i*2], all_positions[i*2+1]
-
-        #define outline
-        outline_width = scene_sett.minimap_node_outline_width if (select) else 0
-        outline_color = active_theme if (active) else select_theme if (select) else None
-
-        #header drawing?
-        header_height, header_color = None, None
-        if ((scene_sett.minimap_node_draw_header) and (not node.hide) and (node.type!='FRAME')):
-            #define header height..
-            header_height = scene_sett.minimap_node_header_height
-            header_height *= min(1, dezoom_factor) #influeced by dezoom
-            header_height *= rescale_factor
-            header_height = max(header_height, scene_sett.minimap_node_header_minheight)
-            header_color = node_color
-            node_color = scene_sett.minimap_node_body_color
+    if (use_lod) and ((cache['batches'] is None) or (cache['draw_key'] != draw_key)):
+
+        all_positions = map_positions(cache['nodes_bounds'].reshape(-1, 2), bounds_nodetree, bounds_minimap_nodetree,)
+        all_positions = all_positions.reshape(-1, 2, 2)
+        is_frame = np.array([t == 'FRAME' for t in cache['nodes_types']], dtype=bool)
+        is_node = np.array([t not in {'FRAME','REROUTE'} for t in cache['nodes_types']], dtype=bool)
+        frames_colors = [(*get_theme_color(n)[:3], 0.4) for n, f in zip(node_tree.nodes, is_frame) if (f)]
+
+        cache['batches'] = get_minimap_lod_batches(
+            all_positions[is_node],
+            all_positions[is_frame],
+            frames_colors,
+            domain=bounds_minimap_nodetree,
+            cell_size=scene_sett.minimap_lod_cell_size,
+            color=scene_sett.minimap_lod_color,
+            )
+        cache['draw_key'] = draw_key
+
+    elif (cache['batches'] is None) or (cache['draw_key'] != draw_key):
+
+        build_start = time.perf_counter()
+        all_nodes = node_tree.nodes[:]
+
+        # gather all nodes types for header color
+        all_colors = [get_theme_color(n) for n in all_nodes]
+
+        # gather select states
+        all_select_states = [n.select for n in all_nodes]
+        all_active_states = [n == node_tree.nodes.active for n in all_nodes]
+
+        # gather bounds positions and map them 2x bounds loc per node
+        all_positions = map_positions(cache['nodes_bounds'].reshape(-1, 2), bounds_nodetree, bounds_minimap_nodetree,)
+
+        # sort the element we are going to draw arranged with their draw args as well..
+        frame_to_draw, node_to_draw = [], []
+
+        for i in range(len(all_nodes)):        
+
+            node = all_nodes[i]
+
+            #we skip reroutes..
+            if (node.type =='REROUTE'):
+                continue
+
+            #get the node main color
+            node_color = all_colors[i]
+            # does the user allows to draw a custom color tho?
+            if (not scene_sett.minimap_node_draw_typecolor):
+                node_color = scene_sett.minimap_node_body_color
+
+            #special color if muted
+            if (node.mute):
+                node_color = (*node_color[:3], 0.15)
+            #special color for frame, their alpha is faded..
+            if (node.type == 'FRAME'):
+                node_color = (*node_color[:3], 0.4)
+
+            #selectin states
+            select = all_select_states[i]
+            active = all_active_states[i]
+            if (not scene_sett.minimap_node_draw_selection):
+                select = select and active
+
+            #get bounds
+            node_bounds = all_positions[i*2], all_positions[i*2+1]
+
+            #define outline
+            outline_width = scene_sett.minimap_node_outline_width if (select) else 0
+            outline_color = active_theme if (active) else select_theme if (select) else None
+
+            #header drawing?
+            header_height, header_color = None, None
+            if ((scene_sett.minimap_node_draw_header) and (not node.hide) and (node.type!='FRAME')):
+                #define header height..
+                header_height = scene_sett.minimap_node_header_height
+                header_height *= min(1, dezoom_factor) #influeced by dezoom
+                header_height *= rescale_factor
+                header_height = max(header_height, scene_sett.minimap_node_header_minheight)
+                header_color = node_color
+                node_color = scene_sett.minimap_node_body_color
                 
-        #using custom color?
-        if (node.use_custom_color and scene_sett.minimap_node_draw_customcolor):
-            node_color = (*node.color[:3], 0.9)
-
-        #pack item
-        #       0   1        2            3            4               5              6              7
-        item = [i, node, node_color, node_bounds, outline_width, outline_color, header_height, header_color,]
-        if (node.type == 'FRAME'):
-            frame_to_draw.append(item)
+            #using custom color?
+            if (node.use_custom_color and scene_sett.minimap_node_draw_customcolor):
+                node_color = (*node.color[:3], 0.9)
+
+            #pack item
+            #       0   1        2            3            4               5              6              7
+            item = [i, node, node_color, node_bounds, outline_width, outline_color, header_height, header_color,]
+            if (node.type == 'FRAME'):
+                frame_to_draw.append(item)
+                continue
+            node_to_draw.append(item)
             continue
-        node_to_draw.append(item)
-        continue
 
-    #draw node and frame elements
-    for item in frame_to_draw + node_to_draw:
-        draw_simple_rectangle(
-            item[3],
-            fill_color=item[2],
-            outline_color=item[5],
-            outline_width=item[4],
-            header_height=item[6],
-            header_color=item[7],
-            )
+        #get node and frame elements batches, drawn all at once
+        cache['batches'] = get_minimap_nodes_batches(frame_to_draw + node_to_draw, outline_width=scene_sett.minimap_node_outline_width)
+        cache['draw_key'] = draw_key
+
+        # too slow to rebuild, a few times in a row? we switch to the level of detail drawing for a while,
+        # or until the nodetree gets smaller.
+        build_time = (time.perf_counter() - build_start) * 1000
+        if (scene_sett.minimap_lod_enable and (scene_sett.minimap_lod_budget > 0)):
+            if (build_time > scene_sett.minimap_lod_budget):
+                cache['overbudget_strikes'] += 1
+                if (cache['overbudget_strikes'] >= MINIMAP_OVERBUDGET_STRIKES):
+                    cache['overbudget_count'] = cache['nodes_count']
+                    cache['overbudget_time'] = time.perf_counter()
+            else:
+                cache['overbudget_strikes'] = 0
+                cache['overbudget_count'] = None
+
+    draw_minimap_batches(cache['batches'])
     
     # 5. draw the view zone area
 
@@ -719,6 +878,16 @@ def draw_minimap(node_tree, area, window_region, view2d, space, dpi_fac, zoom,):
 #                                            "Y88888P'                                                
 
 
+def get_minimap_under_mouse(mouse_x, mouse_y) -> str|None:
+    """cheap hit test of a window mouse position against the drawn minimaps, return the area key of the hovered one"""
+
+    for area_key, (xmin, ymin, xmax, ymax) in MINIMAP_WINDOWBOUNDS.items():
+        if ((xmin <= mouse_x <= xmax) and (ymin <= mouse_y <= ymax)):
+            return area_key
+
+    return None
+
+
 #NOTE need to clean up this operator, it's a mess.. modals..
 
 class NODEBOOSTER_OT_MinimapInteraction(bpy.types.Operator):
@@ -737,6 +906,7 @@ class NODEBOOSTER_OT_MinimapInteraction(bpy.types.Operator):
         self._pan_start_mouse = None
         self._last_mouse_pos = None
         self._clicks = [] #for double or triple click detections
+        self._hovered_area_key = None #the area key of the hovered minimap, to detect hover changes
 
     def find_region_under_mouse(self, context, event):
 
@@ -776,6 +946,13 @@ class NODEBOOSTER_OT_MinimapInteraction(bpy.types.Operator):
         return found_area, found_region, region_mouse_x, region_mouse_y
                         
                         
+    def tag_redraw_area_key(self, context, area_key):
+        for area in context.window.screen.areas:
+            if (str(area.as_pointer()) == area_key):
+                area.tag_redraw()
+                break
+        return None
+
     def restore_cursor(self, context):
         if (self._cursor_modified is not None):
             context.window.cursor_modal_restore()
@@ -796,6 +973,20 @@ class NODEBOOSTER_OT_MinimapInteraction(bpy.types.Operator):
                 print("Minimap interaction modal stopped.")
                 return {'CANCELLED'}
 
+            # Most events happens far from any minimap. When no gesture is ongoing, we hit test the
+            # cached minimap bounds first, and let these events pass without any lookups nor redraws.
+            is_gesture = self._is_panning or (self._action_rescaling_edge is not None)
+            if (not is_gesture):
+                hovered_key = get_minimap_under_mouse(event.mouse_x, event.mouse_y)
+                if (hovered_key is None):
+                    if (self._hovered_area_key is not None):
+                        # the mouse just left a minimap, redraw it once to clear its hover state & cursor indicator.
+                        self.restore_cursor(context)
+                        CURSOR_POSITION['area_id'] = None
+                        self.tag_redraw_area_key(context, self._hovered_area_key)
+                        self._hovered_area_key = None
+                    return {'PASS_THROUGH'}
+
             # deduce region and area from window mouse position.
             area, region, mouse_x, mouse_y = self.find_region_under_mouse(context, event)
             if (area is None or region is None):
@@ -808,8 +999,17 @@ class NODEBOOSTER_OT_MinimapInteraction(bpy.types.Operator):
                     self._last_mouse_pos = None
                 return {'PASS_THROUGH'}
 
-            area.tag_redraw()
             area_key = str(area.as_pointer())
+
+            # Only redraw when needed: during gestures, when the hovered minimap changed,
+            # or when the mouse moved and the cursor indicator needs to follow.
+            is_hover_change = (not is_gesture) and (hovered_key != self._hovered_area_key)
+            if (is_hover_change):
+                if (self._hovered_area_key is not None):
+                    self.tag_redraw_area_key(context, self._hovered_area_key)
+                self._hovered_area_key = hovered_key
+            if (is_gesture or is_hover_change or (event.type == 'MOUSEMOVE' and scene_sett.minimap_cursor_show)):
+                area.tag_redraw()
             current_mouse_pos = Vector((mouse_x, mouse_y))
 
             # Triple click event - View All (CHECK THIS FIRST!)
@@ -920,6 +1120,7 @@ class NODEBOOSTER_OT_MinimapInteraction(bpy.types.Operator):
                         is_on_edge = 'RIGHT'
 
             # Update Cursor style
+            previous_cursor = self._cursor_modified
             if (not self._is_panning):
                 if (is_on_edge == 'TOP'):
                     if (self._cursor_modified != 'MOVE_Y'):
@@ -935,6 +1136,8 @@ class NODEBOOSTER_OT_MinimapInteraction(bpy.types.Operator):
                         self._cursor_modified = 'HAND'
                 else:
                     self.restore_cursor(context)
+            if (previous_cursor != self._cursor_modified):
+                area.tag_redraw()
 
             # Initiate or launch an action from events..
 
@@ -8,11 +8,17 @@ import bpy
 from collections.abc import Iterable
 
 from ..gpudraw import register_gpu_drawcalls
+from ..gpudraw.minimap import clear_minimap_cache
 from ..__init__ import get_addon_prefs, dprint
 from ..operators.palette import msgbus_palette_callback
-from ..utils.node_utils import get_all_nodes
+from ..operators.search import search_depsgraph_callback, clear_search_index, msgbus_search_callback, get_msgbus_search_keys
+from ..utils.node_utils import get_all_nodes, clear_node_spatial_indexes, clear_nodes_absolute_locations
 from ..customnodes import allcustomnodes
 from ..customnodes import NODEBOOSTER_NG_GN_IsRenderedView
+from ..customnodes.objectvelocity import objvelocity_depsgraph_callback
+from ..customnodes.evaluator import clear_evaluation_cache, evaluator_depsgraph_callback
+from ..customnodes.interpolation.spline2dinput import clear_curveinput_cache
+from ..customnodes.interpolation.interpolationloop import clear_playback_cache
 
 
 # oooooooooo.                                                   
@@ -26,6 +32,7 @@ from ..customnodes import NODEBOOSTER_NG_GN_IsRenderedView
 
 MSGBUSOWNER_VIEWPORT_SHADING = object()
 MSGBUSOWNER_PALETTE =  object()
+MSGBUSOWNER_SEARCH = object()
 
 def msgbus_viewportshading_callback(*args):
 
@@ -53,12 +60,28 @@ def register_msgbusses():
         options={"PERSISTENT"},
         )
 
+    #this function runs on each file load, the search keys are many, we don't want to subscribe them twice.
+    bpy.msgbus.clear_by_owner(MSGBUSOWNER_SEARCH)
+    nodes_keys, interface_keys = get_msgbus_search_keys()
+    for keys, is_interface in ((nodes_keys, False), (interface_keys, True)):
+        for key in keys:
+            bpy.msgbus.subscribe_rna(
+                key=key,
+                owner=MSGBUSOWNER_SEARCH,
+                notify=msgbus_search_callback,
+                args=(is_interface,),
+                options={"PERSISTENT"},
+                )
+            continue
+        continue
+
     return None
 
 def unregister_msgbusses():
 
     bpy.msgbus.clear_by_owner(MSGBUSOWNER_VIEWPORT_SHADING)
     bpy.msgbus.clear_by_owner(MSGBUSOWNER_PALETTE)
+    bpy.msgbus.clear_by_owner(MSGBUSOWNER_SEARCH)
 
     return None
 
@@ -147,6 +170,15 @@ def nodebooster_handler_depspost(scene,desp):
     if (get_addon_prefs().debug_depsgraph):
         print("nodebooster_handler_depspost(): depsgraph signal")
 
+    #invalidate cached object velocities evaluations
+    objvelocity_depsgraph_callback(desp)
+
+    #forget the evaluated values of the removed nodes
+    evaluator_depsgraph_callback(desp)
+
+    #re-index the updated nodetrees on the next search
+    search_depsgraph_callback(desp)
+
     #updates for our custom nodes
     upd_all_custom_nodes(DEPSPOST_UPD_NODES)
     return None
@@ -176,6 +208,15 @@ def nodebooster_handler_loadpost(scene,desp):
     #need to add message bus on each blender load
     register_msgbusses()
 
+    #the cached evaluations belong to the previous file
+    clear_evaluation_cache()
+    clear_curveinput_cache()
+    clear_playback_cache()
+    clear_node_spatial_indexes()
+    clear_nodes_absolute_locations()
+    clear_search_index()
+    clear_minimap_cache()
+
     #register gpu drawing functions
     register_gpu_drawcalls()
 
@@ -187,6 +228,23 @@ def nodebooster_handler_loadpost(scene,desp):
     upd_all_custom_nodes(LOADPOST_UPD_NODES)
     return None
 
+@bpy.app.handlers.persistent
+def nodebooster_handler_undopost(scene,desp):
+    """Handler function when user is undoing or redoing"""
+
+    if (get_addon_prefs().debug_depsgraph):
+        print("nodebooster_handler_undopost(): undo_post signal")
+
+    #the nodes properties were restored without their update callbacks, the cached evaluations are obsolete.
+    clear_evaluation_cache()
+    clear_curveinput_cache()
+    clear_playback_cache()
+    clear_node_spatial_indexes()
+    clear_nodes_absolute_locations()
+    clear_search_index()
+    clear_minimap_cache()
+    return None
+
 
 # ooooooooo.                        
 # `888   `Y88.                      
@@ -222,6 +280,10 @@ def load_handlers():
 
     if ('nodebooster_handler_loadpost' not in handler_names):
         bpy.app.handlers.load_post.append(nodebooster_handler_loadpost)
+
+    if ('nodebooster_handler_undopost' not in handler_names):
+        bpy.app.handlers.undo_post.append(nodebooster_handler_undopost)
+        bpy.app.handlers.redo_post.append(nodebooster_handler_undopost)
         
     return None 
 
@@ -238,4 +300,10 @@ def unload_handlers():
         if(h.__name__=='nodebooster_handler_loadpost'):
             bpy.app.handlers.load_post.remove(h)
 
+        if(h.__name__=='nodebooster_handler_undopost'):
+            if (h in bpy.app.handlers.undo_post):
+                bpy.app.handlers.undo_post.remove(h)
+            if (h in bpy.app.handlers.redo_post):
+                bpy.app.handlers.redo_post.remove(h)
+
     return None
@@ -13,6 +13,7 @@ from .drawframes import NODEBOOSTER_OT_draw_frame
 from .chamfer import NODEBOOSTER_OT_chamfer
 from .palette import NODEBOOSTER_OT_setcolor, NODEBOOSTER_OT_palette_reset_color, NODEBOOSTER_OT_initalize_palette
 from .codetemplates import NODEBOOSTER_OT_text_templates
+from .search import NODEBOOSTER_OT_search_jump
 
 from ..gpudraw.minimap import NODEBOOSTER_OT_MinimapInteraction
 
@@ -30,6 +31,7 @@ classes = (
     NODEBOOSTER_OT_palette_reset_color,
     NODEBOOSTER_OT_initalize_palette,
     NODEBOOSTER_OT_text_templates,
+    NODEBOOSTER_OT_search_jump,
     NODEBOOSTER_OT_MinimapInteraction,
 
     )
@@ -11,7 +11,7 @@ import bpy
 
 from datetime import datetime
 
-from ..utils.node_utils import get_node_absolute_location
+from ..utils.node_utils import get_node_spatial_index
 from ..utils.draw_utils import ensure_mouse_cursor
 
 
@@ -23,13 +23,20 @@ def get_nodes_in_frame_box(frame, nodes, frame_support=True,):
     bounds_top = frame.location.y
     bounds_bottom = frame.location.y - frame.dimensions.y
 
-    for n in nodes:
+    # only the nodes overlapping the box are tested, see the nodetree spatial index.
+    index = get_node_spatial_index(frame.id_data)
+    nodes = nodes if hasattr(nodes, 'id_data') else set(nodes)
+
+    for n in index.query_rect(bounds_left, bounds_bottom, bounds_right, bounds_top):
         if ((n==frame) or (n.parent==frame)):
             continue
         if (n.type=="FRAME"):
             continue
+        if (type(nodes) is set) and (n not in nodes):
+            continue
 
-        x, y = get_node_absolute_location(n)
+        #the node top left corner, its absolute location
+        (x, _), (_, y) = index.get_bounds(n)
         if (bounds_left <= x <= bounds_right) and \
            (bounds_top >= y >= bounds_bottom):
             yield n
@@ -4,76 +4,189 @@
 
 
 import bpy 
+import time
 
+from ..utils.node_utils import NodeLinkIndex, arrange_nodes_layered
 
-def is_node_used(node):
-    """check if node is reaching output"""
-            
-    found_output = False
-    
-    def recur_node(n):
 
-        #reached destination? 
-        if (n.type == "GROUP_OUTPUT"):
-            nonlocal found_output
-            found_output = True
-            return 
+# the nodes consuming the nodetree result, a node is used if it's reaching one of them.
+OUTPUT_NODE_TYPES = {'GROUP_OUTPUT', 'OUTPUT_MATERIAL', 'OUTPUT_WORLD', 'OUTPUT_LIGHT', 'OUTPUT_AOV', 'COMPOSITE',}
 
-        #else continue parcour
-        for out in n.outputs:
-            for link in out.links:
-                recur_node(link.to_node)
 
-        return None 
-        
-    recur_node(node)
+def get_used_nodes(node_group, link_index:NodeLinkIndex=None) -> set:
+    """get the pointers of the nodes reaching an output node, output nodes included.
+    Found in one iterative pass, walking the links upstream from all the output nodes.
+    Pass a link_index to share it between many calls"""
 
-    return found_output
+    if (link_index is None):
+        link_index = NodeLinkIndex(node_group)
 
+    stack = [n for n in node_group.nodes if (n.type in OUTPUT_NODE_TYPES)]
+    used = {n.as_pointer() for n in stack}
+
+    while stack:
+        node = stack.pop()
+        for inp in node.inputs:
+            for link in link_index.get_links(inp, direction='LEFT', include_muted=True):
+                from_node = link.from_node
+                ptr = from_node.as_pointer()
+                if (ptr not in used):
+                    used.add(ptr)
+                    stack.append(from_node)
+        continue
+
+    return used
+
+
+def is_node_used(node, link_index:NodeLinkIndex=None):
+    """check if node is reaching output. Pass a link_index to share it between many calls.
+    NOTE prefer get_used_nodes() when checking many nodes, it finds them all at once."""
+
+    return node.as_pointer() in get_used_nodes(node.id_data, link_index=link_index)
+
+
+def get_passthrough_source(socket, passthrough:set, link_index:NodeLinkIndex):
+    """follow the links upstream of an output socket of a pass-through node (reroute or muted node),
+    until reaching the output socket of a node that is not a pass-through. Return None if it leads nowhere.
+    - passthrough: the pointers of the pass-through nodes."""
+
+    visited = set()
+
+    while (socket.node.as_pointer() in passthrough):
+
+        node = socket.node
+        if (node.as_pointer() in visited):
+            return None #feedback loop?
+        visited.add(node.as_pointer())
+
+        #find the input socket passing its value to this output
+        if (node.type == 'REROUTE'):
+            inp = node.inputs[0]
+        else:
+            inp = next((il.from_socket for il in node.internal_links if (il.to_socket == socket)), None)
+            if (inp is None):
+                return None
+
+        links = link_index.get_links(inp, direction='LEFT', include_muted=True)
+        if (not links):
+            return None
+
+        socket = links[0].from_socket
+        continue
+
+    return socket
+
+
+def purge_unused_nodes(node_group, delete_muted=True, delete_reroute=True, delete_frame=True) -> dict:
+    """delete all unused nodes, and the muted & reroute nodes, reconnecting the links passing through them.
+    Works on the data directly, no operators nor editor context needed.
+    Returns the stats {'nodes_removed':int, 'links_removed':int, 'links_rewired':int, 'time':float in ms}"""
+
+    start_time = time.perf_counter()
+    nodes, links = node_group.nodes, node_group.links
+    nodes_count, links_count = len(nodes), len(links)
+
+    # NOTE we find the used nodes and the links to rewire first, with one shared links index,
+    # the index would be obsolete once we start removing nodes.
+    link_index = NodeLinkIndex(node_group)
+    used = get_used_nodes(node_group, link_index=link_index)
+
+    passthrough = set()
+    to_remove = []
+
+    for n in nodes:
+        ptr = n.as_pointer()
+
+        #delete if muted or reroute? their links will be rewired
+        if (delete_muted and n.mute) or (delete_reroute and (n.type=="REROUTE")):
+            passthrough.add(ptr)
+            to_remove.append(n)
+            continue
 
-def purge_unused_nodes(node_group, delete_muted=True, delete_reroute=True, delete_frame=True):
-    """delete all unused nodes, using 'ops.node.delete_reconnect' operator"""
-        
-    for n in list(node_group.nodes):
-        
-        #deselct all
-        n.select = False
-        
-        #delete if muted?
-        if (delete_muted==True and n.mute==True):  
-            n.select = True
-            continue 
-        
-        #delete if reroute?
-        if (delete_reroute==True and n.type=="REROUTE"):
-            n.select = True
-            continue         
-              
         #don't delete if frame?
         if (delete_frame==False and n.type=="FRAME"):
-            continue 
-        
+            continue
+
         #delete if unconnected
-        if not is_node_used(n):
-            node_group.nodes.remove(n)
-            
-        continue 
+        if (ptr not in used):
+            to_remove.append(n)
 
-    if (delete_muted or delete_reroute):
-        bpy.ops.node.delete_reconnect()
-        
-    return None 
+        continue
 
+    # the links leaving a pass-through node to a kept node are rewired to their upstream source
+    removed = {n.as_pointer() for n in to_remove}
+    rewires = []
+    for link in links:
+        if (link.from_node.as_pointer() in passthrough) and (link.to_node.as_pointer() not in removed):
+            source = get_passthrough_source(link.from_socket, passthrough, link_index)
+            if (source is not None):
+                rewires.append((source, link.to_socket, link.is_muted))
+        continue
 
-def re_arrange_nodes(node_group, Xmultiplier=1):
-    """re-arrange node by sorting them in X location, (could improve)"""
+    for n in to_remove:
+        nodes.remove(n)
+
+    # NOTE the links removed along with the nodes are counted before the rewired links are added back.
+    links_removed = links_count - len(links)
+
+    for from_socket, to_socket, is_muted in rewires:
+        link = links.new(from_socket, to_socket)
+        if (is_muted):
+            link.is_muted = True
+        continue
+
+    return {
+        'nodes_removed': nodes_count - len(nodes),
+        'links_removed': links_removed,
+        'links_rewired': len(rewires),
+        'time': (time.perf_counter() - start_time) * 1000,
+        }
+
+
+def purge_all_node_groups(node_groups=None, ignore_ng_name:str="NodeBooster", verbose:bool=False,
+    delete_muted=True, delete_reroute=True, delete_frame=True,) -> dict:
+    """purge the unused nodes of many node groups in one pass, see purge_unused_nodes().
+    - node_groups: the node groups to purge, all the node groups of the file if None. Linked node groups are skipped.
+    - ignore_ng_name: ignore the nodetrees containing a specific name, by default our own custom nodes nodetrees.
+    - verbose: print a report of the purge, useful in batch mode. ex: to sanitize files from the command line:
+      'blender -b file.blend --python-expr "import bpy; ...purge_all_node_groups(verbose=True); bpy.ops.wm.save_mainfile()"'
+    Returns the stats of each purged node group {name: stats}"""
+
+    if (node_groups is None):
+        node_groups = bpy.data.node_groups[:]
+
+    all_stats = {}
 
-    nodes = { n.location.x:n for n in node_group.nodes }
-    nodes = { k:nodes[k] for k in sorted(nodes) }
+    for ng in node_groups:
 
-    for i,n in enumerate(nodes.values()):
-        n.location.x = i*200*Xmultiplier
-        n.width = 150
+        #cannot edit linked data
+        if (ng.library is not None):
+            continue
+
+        #we ignore specific ng names?
+        if (ignore_ng_name and (ignore_ng_name in ng.name)):
+            continue
+
+        all_stats[ng.name] = purge_unused_nodes(ng,
+            delete_muted=delete_muted,
+            delete_reroute=delete_reroute,
+            delete_frame=delete_frame,
+            )
+        continue
+
+    if (verbose):
+        print(f"NodeBooster purge: {len(all_stats)} node group(s)")
+        for name, st in all_stats.items():
+            print(f"  '{name}': removed {st['nodes_removed']} node(s), {st['links_removed']} link(s), rewired {st['links_rewired']} link(s) in {st['time']:.2f}ms")
+        print(f"  total: removed {sum(st['nodes_removed'] for st in all_stats.values())} node(s) in {sum(st['time'] for st in all_stats.values()):.2f}ms")
+
+    return all_stats
+
+
+def re_arrange_nodes(node_group, Xmultiplier=1):
+    """re-arrange the nodes in layers following their links, see arrange_nodes_layered()"""
+
+    arrange_nodes_layered(node_group, xgap=70*Xmultiplier)
 
     return None 
 
@@ -85,6 +198,12 @@ class NODEBOOSTER_OT_node_purge_unused(bpy.types.Operator):
     bl_description = ""
     bl_options     = {'REGISTER','UNDO',}
 
+    scope : bpy.props.EnumProperty(
+        name="Scope",
+        items=(("ACTIVE","Active","Purge the node group being edited"),
+               ("ALL","All","Purge all the node groups of the file"),),
+        default="ACTIVE",
+        )
     delete_frame : bpy.props.BoolProperty(
         default=True,
         name="Remove Frame(s)",
@@ -112,17 +231,25 @@ class NODEBOOSTER_OT_node_purge_unused(bpy.types.Operator):
         return (context.space_data.type=='NODE_EDITOR') and (context.space_data.node_tree is not None)
 
     def execute(self, context):
-        node_group = context.space_data.node_tree
 
-        purge_unused_nodes(
-            node_group, 
+        match self.scope:
+            case 'ACTIVE': node_groups = [context.space_data.node_tree]
+            case 'ALL':    node_groups = None
+
+        all_stats = purge_all_node_groups(
+            node_groups=node_groups,
+            ignore_ng_name="" if (self.scope=='ACTIVE') else "NodeBooster",
             delete_muted=self.delete_muted,
             delete_reroute=self.delete_reroute,
             delete_frame=self.delete_frame,
             )
 
-        if (self.re_arrange and self.delete_frame):
-            re_arrange_nodes(node_group)
+        #only the edited node group is re-arranged, the others aren't in sight.
+        if (self.re_arrange and self.delete_frame and self.scope=='ACTIVE'):
+            re_arrange_nodes(context.space_data.node_tree)
+
+        removed = sum(st['nodes_removed'] for st in all_stats.values())
+        self.report({'INFO'}, f"Removed {removed} node(s) in {len(all_stats)} node group(s)")
 
         return {'FINISHED'}
 
@@ -132,6 +259,7 @@ class NODEBOOSTER_OT_node_purge_unused(bpy.types.Operator):
     def draw(self, context):
         layout = self.layout 
         
+        layout.row().prop(self, "scope", expand=True)
         layout.prop(self, "delete_muted")
         layout.prop(self, "delete_reroute")
         layout.prop(self, "delete_frame")
@@ -5,97 +5,461 @@
 
 import bpy
 
+from heapq import nlargest
+from bisect import bisect_left
+from difflib import get_close_matches
+
 
 #NOTE this functinality is implemented on an property update level
+# the nodes of all the nodetrees of the file are indexed once in SEARCH_INDEX, an inverted index {token: node refs}.
+# the nodetrees are re-indexed only when they are updated (see search_depsgraph_callback & msgbus_search_callback),
+# so typing stays fast.
 
 #TODO Requires rework
 # - would be nice to add a recursive search feature in there
 # - perhaps better to use a search operator instead of using a prop update
-# - perhaps it would be nicer to confirm if user want to select (or enter a subgroup)
-#    right now we directly select everything after search, perhaps 1) search, then display 
-#    the found match on the ui, then 2) propose operators to select, recenter view, and enter nodetrees?
 # - instead of simple boolean for types, we should have enum with type match..
 # - add a case for matching nodetree names
 # - add a recursive toggle option
 
 
-def search_upd(self, context):
-    """search in context nodetree for nodes"""
+# the searchable fields of a node, with their ranking weight
+SEARCH_FIELDS = {
+    'LABEL': 1.0,
+    'NAME': 0.8,
+    'TYPE': 0.6,
+    'SOCKET_NAME': 0.4,
+    'SOCKET_TYPE': 0.3,
+    }
+# the quality of a keyword match with a token
+MATCH_EXACT, MATCH_PREFIX, MATCH_SUBSTRING, MATCH_FUZZY = 1.0, 0.8, 0.5, 0.3
+# the nodes of the edited nodetree come first
+CURRENT_TREE_BONUS = 0.5
+# the number of ranked results kept
+SEARCH_RESULTS_LIMIT = 100
 
-    ng = context.space_data.edit_tree
 
-    keywords = self.search_keywords.lower().replace(","," ").split(" ")
-    keywords = set(keywords)
+def tokenize(text:str) -> list:
+    """split a text into lowercase search tokens"""
 
-    def is_matching(keywords,terms):
-        matches = []
-        for k in keywords:
-            for t in terms:
-                matches.append(k in t)
-        return any(matches) 
+    for c in "_,.-/|()":
+        text = text.replace(c, " ")
+    return text.lower().split()
 
-    found = []
-    for n in ng.nodes:
-        terms = []
-
-        if (self.search_labels):
-            name = n.label.lower()
-            if not name:
-                name = n.bl_label.lower()
-            terms += name.split(" ")
-
-        if (self.search_types):
-            terms += n.type.lower().split(" ")
-
-        if (self.search_names):
-            name = n.name + " " + n.bl_idname
-            terms += name.replace("_"," ").lower().split(" ")
-
-        if (self.search_socket_names):
-            for s in [*list(n.inputs),*list(n.outputs)]:
-                name = s.name.lower() 
-                if name not in terms:
-                    terms += name.split(" ")
-
-        if (self.search_socket_types):
-            for s in [*list(n.inputs),*list(n.outputs)]:
-                name = s.type.lower() 
-                if name not in terms:
-                    terms += name.split(" ")
-
-        if (not is_matching(keywords,terms)):
+
+def get_node_tokens(node) -> dict:
+    """get the search tokens of a node, per field {field: set of tokens}"""
+
+    sockets = [*node.inputs, *node.outputs]
+
+    return {
+        'LABEL': set(tokenize(node.label or node.bl_label)),
+        'NAME': set(tokenize(node.name + " " + node.bl_idname)),
+        'TYPE': set(tokenize(node.type)),
+        'SOCKET_NAME': {t for s in sockets for t in tokenize(s.name)},
+        'SOCKET_TYPE': {t for s in sockets for t in tokenize(s.type)},
+        }
+
+
+def get_sockets_signature(node) -> tuple:
+    """get the sockets count & names of a node, they change on node groups interface edits & dynamic sockets"""
+
+    return (tuple(s.name for s in node.inputs), tuple(s.name for s in node.outputs))
+
+
+def iter_node_trees():
+    """iterate all the nodetrees of the file, with their owner data (None for node groups)"""
+
+    for ng in bpy.data.node_groups:
+        yield ng, None
+    for collection in (bpy.data.materials, bpy.data.worlds, bpy.data.lights, bpy.data.scenes):
+        for owner in collection:
+            tree = getattr(owner, 'node_tree', None)
+            if (tree is not None):
+                yield tree, owner
+    return None
+
+
+class NodeSearchIndex():
+    """Inverted index of the nodes of all the nodetrees of the file {field: {token: {(tree key, node name)}}}.
+    Each nodetree is indexed once, then re-indexed incrementally: only when tagged dirty or when its nodes count changes,
+    and only its renamed, relabeled, new nodes or nodes with changed sockets are tokenized again.
+    NOTE the index holds references to the nodetrees, it needs to be cleared on undo & file load."""
+
+    def __init__(self):
+        self.postings = {field:{} for field in SEARCH_FIELDS}
+        self.trees = {}      #{tree key: {'tree', 'owner', 'count', 'nodes': {node name: (label, flags, tokens, sockets signature)}}}
+        self.dirty = set()   #tree keys to re-index
+        self.vocabulary = None #sorted tokens, built lazily
+
+    @staticmethod
+    def get_tree_key(tree) -> int:
+        return tree.as_pointer()
+
+    def tag_dirty(self, tree) -> None:
+        self.dirty.add(self.get_tree_key(tree))
+        return None
+
+    def tag_all_dirty(self) -> None:
+        self.dirty.update(self.trees.keys())
+        return None
+
+    def add_node(self, key, name, tokens) -> None:
+        for field, field_tokens in tokens.items():
+            postings = self.postings[field]
+            for t in field_tokens:
+                refs = postings.get(t)
+                if (refs is None):
+                    refs = postings[t] = set()
+                    self.vocabulary = None
+                refs.add((key, name))
+        return None
+
+    def remove_node(self, key, name, tokens) -> None:
+        for field, field_tokens in tokens.items():
+            postings = self.postings[field]
+            for t in field_tokens:
+                refs = postings.get(t)
+                if (refs is None):
+                    continue
+                refs.discard((key, name))
+                if (not refs):
+                    del postings[t]
+                    self.vocabulary = None
+        return None
+
+    def index_tree(self, tree, owner) -> None:
+        """index the nodes of a nodetree, only the new, renamed, relabeled nodes or nodes with changed sockets are tokenized"""
+
+        key = self.get_tree_key(tree)
+        entry = self.trees.get(key)
+        if (entry is None) or (entry['tree'] != tree):
+            if (entry is not None):
+                self.remove_tree(key)
+            entry = self.trees[key] = {'tree':tree, 'owner':owner, 'count':0, 'nodes':{}}
+
+        old_nodes = entry['nodes']
+        new_nodes = {}
+
+        for n in tree.nodes:
+            name, label, signature = n.name, n.label, get_sockets_signature(n)
+            old = old_nodes.pop(name, None)
+            if (old is not None) and (old[0] == label) and (old[3] == signature):
+                new_nodes[name] = old
+                continue
+            if (old is not None):
+                self.remove_node(key, name, old[2])
+            flags = (n.type == 'FRAME', len(n.inputs) == 0)
+            tokens = get_node_tokens(n)
+            self.add_node(key, name, tokens)
+            new_nodes[name] = (label, flags, tokens, signature)
             continue
 
-        found.append(n)
+        #the remaining nodes were removed
+        for name, old in old_nodes.items():
+            self.remove_node(key, name, old[2])
 
-        continue
+        entry['nodes'] = new_nodes
+        entry['count'] = len(new_nodes)
+        self.dirty.discard(key)
+        return None
 
-    #unselect all
-    for n in ng.nodes:
-        n.select = False
+    def remove_tree(self, key) -> None:
+        entry = self.trees.pop(key)
+        for name, (_, _, tokens, _) in entry['nodes'].items():
+            self.remove_node(key, name, tokens)
+        return None
+
+    def refresh(self) -> None:
+        """index the new nodetrees, and re-index the dirty ones"""
+
+        seen = set()
+        for tree, owner in iter_node_trees():
+            key = self.get_tree_key(tree)
+            seen.add(key)
+            entry = self.trees.get(key)
+            if (entry is None) or (key in self.dirty) or (entry['count'] != len(tree.nodes)):
+                self.index_tree(tree, owner)
+            continue
+
+        for key in [k for k in self.trees if (k not in seen)]:
+            self.remove_tree(key)
 
-    self.search_found = len(found)
-    if (self.search_found==0):
         return None
 
-    if (self.search_input_only):
-        for n in found.copy():
-            if (len(n.inputs)==0 and (n.type!="FRAME")):
+    def get_vocabulary(self) -> list:
+        """get all the indexed tokens, sorted"""
+
+        if (self.vocabulary is None):
+            self.vocabulary = sorted({t for postings in self.postings.values() for t in postings})
+        return self.vocabulary
+
+    def match_keyword(self, keyword:str) -> dict:
+        """find the tokens matching the keyword, exactly, by prefix, by substring or fuzzily. {token: match quality}"""
+
+        vocabulary = self.get_vocabulary()
+        matches = {}
+
+        #prefix matches are contiguous in the sorted vocabulary
+        i = bisect_left(vocabulary, keyword)
+        while (i < len(vocabulary)) and vocabulary[i].startswith(keyword):
+            token = vocabulary[i]
+            matches[token] = MATCH_EXACT if (token == keyword) else MATCH_PREFIX
+            i += 1
+
+        #single letters would match nearly everything by substring
+        if (len(keyword) < 2):
+            return matches
+
+        for token in vocabulary:
+            if (token not in matches) and (keyword in token):
+                matches[token] = MATCH_SUBSTRING
+
+        #nothing found? perhaps a typo..
+        if (not matches) and (len(keyword) >= 3):
+            for token in get_close_matches(keyword, vocabulary, n=5, cutoff=0.75):
+                matches[token] = MATCH_FUZZY
+
+        return matches
+
+    def search(self, query:str, fields:set, current_tree=None, input_only:bool=False, frame_only:bool=False, limit:int=SEARCH_RESULTS_LIMIT,) -> tuple:
+        """search the nodes matching any of the query keywords in the given fields.
+        Return a tuple (results, count, current) with:
+        - results: the best ranked matches [(score, tree, owner, node name)], at most 'limit'.
+        - count: the total number of matches.
+        - current: the names of all the matches in the given current_tree."""
+
+        self.refresh()
+
+        keywords = set(tokenize(query))
+        if (not keywords) or (not fields):
+            return [], 0, []
+
+        #score of a node: the sum of the best match of each keyword
+        scores = {}
+        for keyword in keywords:
+
+            # NOTE the matches are visited from the best to the worst, the first score a node gets is its best one.
+            # this way the nodes are assigned with set operations, instead of comparing scores one by one.
+            candidates = sorted(((quality * SEARCH_FIELDS[field], token, field)
+                for token, quality in self.match_keyword(keyword).items() for field in fields), reverse=True)
+
+            best, assigned = {}, set()
+            for score, token, field in candidates:
+                refs = self.postings[field].get(token)
+                if (refs):
+                    new = refs.difference(assigned)
+                    assigned |= new
+                    best.update(dict.fromkeys(new, score))
                 continue
-            found.remove(n)
+
+            if (not scores):
+                scores = best
+                continue
+            for ref, score in best.items():
+                scores[ref] = scores.get(ref, 0) + score
+            continue
+
+        current_key = self.get_tree_key(current_tree) if (current_tree is not None) else None
+        trees = self.trees
+        matches, current = [], []
+
+        for ref, score in scores.items():
+            key, name = ref
+            if (input_only or frame_only):
+                is_frame, is_input = trees[key]['nodes'][name][1]
+                if (input_only) and not (is_input and not is_frame):
+                    continue
+                if (frame_only) and (not is_frame):
+                    continue
+            if (key == current_key):
+                score += CURRENT_TREE_BONUS
+                current.append(name)
+            matches.append((score, ref))
+            continue
+
+        results = []
+        for score, (key, name) in nlargest(limit, matches, key=lambda m: m[0]):
+            entry = trees[key]
+            results.append((score, entry['tree'], entry['owner'], name))
             continue
 
-    if (self.search_frame_only):
-        for n in found.copy():
-            if (n.type!="FRAME"):
-                found.remove(n)
+        return results, len(matches), current
+
+
+SEARCH_INDEX = NodeSearchIndex()
+# The results of the latest search [(score, tree, owner, node name)]
+SEARCH_RESULTS = []
+
+
+def search_depsgraph_callback(depsgraph) -> None:
+    """tag the updated nodetrees dirty, they will be re-indexed on the next search"""
+
+    if (not SEARCH_INDEX.trees):
+        return None
+
+    for u in depsgraph.updates:
+        if isinstance(u.id, bpy.types.NodeTree):
+            SEARCH_INDEX.tag_dirty(u.id)
+        else:
+            tree = getattr(u.id, 'node_tree', None)
+            if isinstance(tree, bpy.types.NodeTree):
+                SEARCH_INDEX.tag_dirty(tree)
+        continue
+
+    return None
+
+
+def get_msgbus_search_keys() -> tuple:
+    """get the msgbus keys of the nodes names & labels, and of the nodegroups interface sockets names.
+    NOTE a msgbus subscription to a type doesn't match its subclasses, every node type needs its own key."""
+
+    nodes_types, interface_types = [], []
+    for name in dir(bpy.types):
+        cls = getattr(bpy.types, name)
+        if (not isinstance(cls, type)):
             continue
+        if issubclass(cls, bpy.types.Node):
+            nodes_types.append(cls)
+        elif issubclass(cls, bpy.types.NodeTreeInterfaceSocket):
+            interface_types.append(cls)
+        continue
+
+    nodes_keys = [(cls, prop) for cls in nodes_types for prop in ('name', 'label')]
+    interface_keys = [(cls, 'name') for cls in interface_types]
+    return nodes_keys, interface_keys
+
+
+def msgbus_search_callback(is_interface:bool) -> None:
+    """get notified when the user renames or relabels a node, or edits a nodegroup interface, from the interface.
+    The depsgraph doesn't update the nodegroups used by no object, the nodetrees of the node editors are tagged dirty instead.
+    The interface of a nodegroup changes the sockets of its group nodes, in any nodetree."""
+
+    if (not SEARCH_INDEX.trees):
+        return None
+
+    if (is_interface):
+        SEARCH_INDEX.tag_all_dirty()
+        return None
+
+    for window in bpy.context.window_manager.windows:
+        for area in window.screen.areas:
+            if (area.type == 'NODE_EDITOR'):
+                tree = area.spaces.active.edit_tree
+                if (tree is not None):
+                    SEARCH_INDEX.tag_dirty(tree)
+            continue
+        continue
+
+    return None
+
+
+def clear_search_index() -> None:
+    """forget all indexed nodes, should be done when the data is reloaded (undo, file load)"""
 
-    for n in found:
-        n.select = True 
+    global SEARCH_INDEX
+    SEARCH_INDEX = NodeSearchIndex()
+    SEARCH_RESULTS.clear()
+    return None
+
+
+def search_upd(self, context):
+    """search nodes across all nodetrees of the file, and select the matching nodes of the context nodetree"""
+
+    ng = context.space_data.edit_tree
+
+    fields = set()
+    if (self.search_labels): fields.add('LABEL')
+    if (self.search_types): fields.add('TYPE')
+    if (self.search_names): fields.add('NAME')
+    if (self.search_socket_names): fields.add('SOCKET_NAME')
+    if (self.search_socket_types): fields.add('SOCKET_TYPE')
+
+    results, count, found = SEARCH_INDEX.search(self.search_keywords, fields,
+        current_tree=ng,
+        input_only=self.search_input_only,
+        frame_only=self.search_frame_only,
+        )
+    SEARCH_RESULTS[:] = results
+
+    #unselect all
+    for n in ng.nodes:
+        n.select = False
+
+    self.search_found = count
+    if (not found):
+        return None
+
+    for name in found:
+        n = ng.nodes.get(name)
+        if (n is not None):
+            n.select = True
 
     if (self.search_center):
-        with bpy.context.temp_override(area=context.area, space=context.area.spaces[0], region=context.area.regions[3]): 
+        with bpy.context.temp_override(area=context.area, space=context.area.spaces[0], region=context.area.regions[3]):
+            bpy.ops.node.view_selected()
+
+    return None
+
+
+class NODEBOOSTER_OT_search_jump(bpy.types.Operator):
+    """Open the nodetree of a search result, select its node and recenter the view on it"""
+
+    bl_idname = "nodebooster.search_jump"
+    bl_label = "Jump to Search Result"
+    bl_options = {'REGISTER', 'INTERNAL'}
+
+    index : bpy.props.IntProperty(
+        default=0,
+        )
+
+    @classmethod
+    def poll(cls, context):
+        return (context.space_data.type=='NODE_EDITOR')
+
+    def execute(self, context):
+
+        if (self.index >= len(SEARCH_RESULTS)):
+            return {'CANCELLED'}
+
+        _, tree, owner, name = SEARCH_RESULTS[self.index]
+        space = context.space_data
+
+        try:
+            node = tree.nodes.get(name)
+        except ReferenceError:
+            node = None
+        if (node is None):
+            self.report({'WARNING'}, f"Node '{name}' not found, it might have been removed")
+            return {'CANCELLED'}
+
+        #open the nodetree in the editor, if needed
+        if (space.edit_tree != tree):
+
+            match owner:
+                case None:
+                    space.tree_type = tree.bl_idname
+                    space.node_tree = tree
+                case bpy.types.Material():
+                    obj = context.object
+                    slot = next((i for i,s in enumerate(obj.material_slots) if (s.material == owner)), None) if (obj) else None
+                    if (slot is None):
+                        self.report({'WARNING'}, f"Material '{owner.name}' is not used by the active object")
+                        return {'CANCELLED'}
+                    space.tree_type = tree.bl_idname
+                    space.shader_type = 'OBJECT'
+                    obj.active_material_index = slot
+                case _:
+                    self.report({'WARNING'}, f"Cannot open the nodetree of '{owner.name}' from here")
+                    return {'CANCELLED'}
+
+        for n in tree.nodes:
+            n.select = False
+        node.select = True
+        tree.nodes.active = node
+
+        region = next((r for r in context.area.regions if (r.type=='WINDOW')), None)
+        with context.temp_override(region=region):
             bpy.ops.node.view_selected()
 
-    return None
\ No newline at end of file
+        return {'FINISHED'}
@@ -232,6 +232,47 @@ class NODEBOOSTER_PR_scene(bpy.types.PropertyGroup):
         max=1,
         size=4,
         )
+    #level of detail
+    minimap_lod_enable : bpy.props.BoolProperty(
+        default=True,
+        name="Level of Detail",
+        description="Draw very large or very dezoomed node trees as a density heatmap of their nodes, with the frames outlines, instead of drawing each node.",
+        )
+    minimap_lod_node_threshold : bpy.props.IntProperty(
+        default=2500,
+        name="Nodes Threshold",
+        description="Use the level of detail drawing above this number of nodes.",
+        min=1,
+        )
+    minimap_lod_node_minsize : bpy.props.FloatProperty(
+        default=2,
+        name="Min Node Size",
+        description="Use the level of detail drawing when the nodes would be drawn smaller than this size, in pixels.",
+        min=0,
+        soft_max=20,
+        )
+    minimap_lod_budget : bpy.props.FloatProperty(
+        default=8,
+        name="Time Budget",
+        description="Use the level of detail drawing when drawing each node takes longer than this time, in milliseconds. Set to 0 to disable.",
+        min=0,
+        soft_max=100,
+        )
+    minimap_lod_cell_size : bpy.props.FloatProperty(
+        default=3,
+        name="Cell Size",
+        description="Size of the heatmap cells, in pixels.",
+        min=1,
+        soft_max=20,
+        )
+    minimap_lod_color : bpy.props.FloatVectorProperty(
+        default=(0.8, 0.8, 0.8, 0.9),
+        subtype="COLOR",
+        name="Heatmap Color",
+        min=0,
+        max=1,
+        size=4,
+        )
     #view outline
     minimap_view_fill_color : bpy.props.FloatVectorProperty(
         default=(0.296174, 0.040511, 0.027817, 0.0),
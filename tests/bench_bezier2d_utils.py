@@ -0,0 +1,54 @@
+# SPDX-FileCopyrightText: 2025 BD3D DIGITAL DESIGN (Dorian B.)
+#
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+# NOTE
+# micro-benchmark of the vectorized utils/bezier2d_utils.py functions, against their previous loop implementations.
+# run with 'python tests/bench_bezier2d_utils.py' from the addon directory.
+
+
+import timeit
+import numpy as np
+
+import bezier2d_reference as ref
+from headless import load_module, random_bezsegs
+
+bez = load_module("utils/bezier2d_utils.py")
+
+
+def bench(label:str, func, number:int=50) -> float:
+    """time the given function, best of 5 runs, in milliseconds per call"""
+
+    best = min(timeit.repeat(func, number=number, repeat=5)) / number * 1000
+    print(f"  {label:<34} {best:9.3f}ms")
+    return best
+
+
+def main():
+
+    rng = np.random.default_rng(0)
+
+    for count in (10, 200, 2000):
+        segments = random_bezsegs(rng, count)
+        t_map = np.where(rng.uniform(size=count) < 0.5, rng.uniform(0.1, 0.9, count), 0.0)
+        number = max(1, 2000 // count)
+
+        print(f"{count} segments:")
+        for name, args in (
+            ('sample_bezsegs', (segments, 100)),
+            ('sample_bezsegs_with_t', (segments, 100)),
+            ('casteljau_subdiv_bezsegs', (segments, t_map)),
+            ('cut_bezsegs', (segments, 0.5)),
+            ('get_bezsegs_length', (segments, 100)),
+            ):
+            before = bench(f"{name} (loops)", lambda: getattr(ref, name)(*args), number=number)
+            after = bench(f"{name}", lambda: getattr(bez, name)(*args), number=number)
+            print(f"  {'':<34} x{before / after:.1f}")
+            continue
+        continue
+
+    return None
+
+
+if (__name__ == "__main__"):
+    main()
@@ -0,0 +1,61 @@
+# SPDX-FileCopyrightText: 2025 BD3D DIGITAL DESIGN (Dorian B.)
+#
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+# NOTE
+# micro-benchmark of the minimap redraw geometry against the node count, see get_minimap_nodes_batches()
+# & get_minimap_lod_batches() in gpudraw/minimap.py. only the numpy geometry is timed here, the gpu batches
+# upload & draw calls need blender. run with 'python tests/bench_minimap_geometry.py' from the addon directory.
+
+
+import timeit
+import numpy as np
+
+from headless import load_module
+
+shp = load_module("utils/shape_utils.py")
+
+
+def bench(label:str, func, number:int=20) -> float:
+    """time the given function, best of 5 runs, in milliseconds per call"""
+
+    best = min(timeit.repeat(func, number=number, repeat=5)) / number * 1000
+    print(f"  {label:<34} {best:9.3f}ms")
+    return best
+
+
+def nodes_geometry(bounds:np.ndarray, colors:np.ndarray, header_heights:np.ndarray, header_colors:np.ndarray, outline_colors:np.ndarray):
+    """the geometry built by get_minimap_nodes_batches(), bodies followed by their headers, then the outlines"""
+
+    rects = np.stack((bounds, shp.headers_bounds(bounds, header_heights)), axis=1).reshape(-1, 2, 2)
+    rects_colors = np.stack((colors, header_colors), axis=1).reshape(-1, 4)
+    fill = shp.rectangles_geometry(rects, rects_colors)
+    outlines = shp.rectangles_outlines_geometry(bounds, outline_colors)
+    return fill, outlines
+
+
+def main():
+
+    rng = np.random.default_rng(0)
+
+    for count in (10, 100, 1000, 10000):
+        extent = 300.0 * np.sqrt(count)
+        corners = rng.uniform(0.0, extent, (count, 2))
+        sizes = np.stack((rng.uniform(140.0, 240.0, count), rng.uniform(80.0, 400.0, count)), axis=-1)
+        bounds = np.stack((corners, corners + sizes), axis=1).astype(np.float32)
+        colors = rng.uniform(size=(count, 4)).astype(np.float32)
+        header_heights = np.full(count, 20.0, dtype=np.float32)
+        domain = np.array((bounds[:,0].min(axis=0), bounds[:,1].max(axis=0)), dtype=np.float32)
+        number = max(1, 20000 // count)
+
+        print(f"{count} nodes:")
+        exact = bench("nodes geometry", lambda: nodes_geometry(bounds, colors, header_heights, colors, colors), number=number)
+        lod = bench("density grid geometry", lambda: shp.density_grid_geometry(bounds, domain, 200.0, (1, 1, 1, 0.5)), number=number)
+        print(f"  {'per node':<34} {exact / count * 1000:9.3f}us {lod / count * 1000:9.3f}us")
+        continue
+
+    return None
+
+
+if (__name__ == "__main__"):
+    main()
@@ -0,0 +1,49 @@
+# SPDX-FileCopyrightText: 2025 BD3D DIGITAL DESIGN (Dorian B.)
+#
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+# NOTE
+# helpers for the headless tests & benchmarks, running outside of blender with numpy only.
+# the addon package itself imports bpy, so the bpy-free modules are loaded directly from their file.
+
+
+import sys
+import importlib.util
+from pathlib import Path
+
+import numpy as np
+
+
+ADDON_DIR = Path(__file__).resolve().parents[1]
+
+
+def load_module(relpath:str):
+    """load a bpy-free module of the addon from its path relative to the addon directory, ex: 'utils/shape_utils.py'"""
+
+    name = "nodebooster_headless_" + Path(relpath).stem
+    module = sys.modules.get(name)
+    if (module is not None):
+        return module
+
+    spec = importlib.util.spec_from_file_location(name, ADDON_DIR / relpath)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def random_bezsegs(rng:np.random.Generator, count:int, xmin:float=0.0, xmax:float=1.0) -> np.ndarray:
+    """generate a random x-monotonic curve of count (N, 8) bezier segments, like the ones of a CurveMapping"""
+
+    knots_x = np.sort(rng.uniform(xmin, xmax, count + 1))
+    knots_x[0], knots_x[-1] = xmin, xmax
+    knots_y = rng.uniform(-1.0, 1.0, count + 1)
+
+    x0, x3 = knots_x[:-1], knots_x[1:]
+    width = x3 - x0
+    segments = np.empty((count, 8), dtype=np.float64)
+    segments[:,0], segments[:,1] = x0, knots_y[:-1]
+    segments[:,2], segments[:,3] = x0 + width * rng.uniform(0.0, 0.5, count), knots_y[:-1] + rng.uniform(-0.5, 0.5, count)
+    segments[:,4], segments[:,5] = x3 - width * rng.uniform(0.0, 0.5, count), knots_y[1:] + rng.uniform(-0.5, 0.5, count)
+    segments[:,6], segments[:,7] = x3, knots_y[1:]
+    return segments
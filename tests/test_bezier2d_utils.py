@@ -0,0 +1,283 @@
+# SPDX-FileCopyrightText: 2025 BD3D DIGITAL DESIGN (Dorian B.)
+#
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+# NOTE
+# headless tests of utils/bezier2d_utils.py, the vectorized functions are compared against
+# their previous per-segment loop implementations, see bezier2d_reference.py.
+# run with 'python -m unittest discover -s tests' from the addon directory, or 'python -m pytest' from the tests directory.
+# (pytest would otherwise import the addon package __init__.py, which needs bpy)
+
+
+import unittest
+import numpy as np
+
+import bezier2d_reference as ref
+from headless import load_module, random_bezsegs
+
+bez = load_module("utils/bezier2d_utils.py")
+
+
+def exact_t_at_x(segment:np.ndarray, x:float, iterations:int=80) -> float:
+    """find the t of an x-monotonic segment at the given x by bisection"""
+
+    lo, hi = 0.0, 1.0
+    for _ in range(iterations):
+        mid = (lo + hi) / 2
+        if (bez.evaluate_bezsegs(segment[np.newaxis], np.array([mid]))[0,0,0] < x):
+              lo = mid
+        else: hi = mid
+        continue
+    return (lo + hi) / 2
+
+
+def exact_y_at_x(segments:np.ndarray, x:float) -> float:
+    """evaluate an x-monotonic curve at the given x, by bisection on the segment containing x"""
+
+    i = int(np.clip(np.searchsorted(segments[:,6], x), 0, len(segments) - 1))
+    t = exact_t_at_x(segments[i], x)
+    return float(bez.evaluate_bezsegs(segments[i][np.newaxis], np.array([t]))[0,0,1])
+
+
+class TestSampling(unittest.TestCase):
+
+    def setUp(self):
+        self.rng = np.random.default_rng(0)
+
+    def test_sample_identical(self):
+        for count, rate in ((1, 1), (7, 2), (50, 100), (200, 33)):
+            segments = random_bezsegs(self.rng, count)
+            np.testing.assert_array_equal(bez.sample_bezsegs(segments, rate), ref.sample_bezsegs(segments, rate))
+
+    def test_sample_with_t_identical(self):
+        for dtype in (np.float64, np.float32):
+            segments = random_bezsegs(self.rng, 30).astype(dtype)
+            points, t_values = bez.sample_bezsegs_with_t(segments, 20)
+            ref_points, ref_t_values = ref.sample_bezsegs_with_t(segments, 20)
+            self.assertEqual(points.dtype, ref_points[0].dtype)
+            np.testing.assert_array_equal(points, np.array(ref_points))
+            np.testing.assert_array_equal(t_values, np.array(ref_t_values))
+
+    def test_sample_batch(self):
+        batch = np.stack([random_bezsegs(self.rng, 12) for _ in range(5)])
+        points = bez.sample_bezsegs(batch, 10)
+        for curve, curve_points in zip(batch, points):
+            np.testing.assert_array_equal(curve_points, ref.sample_bezsegs(curve, 10))
+
+    def test_length_identical(self):
+        segments = random_bezsegs(self.rng, 40)
+        lengths, total = bez.get_bezsegs_length(segments, 100)
+        ref_lengths, ref_total = ref.get_bezsegs_length(segments, 100)
+        np.testing.assert_array_equal(lengths, ref_lengths)
+        self.assertEqual(total, ref_total)
+
+
+class TestSubdivision(unittest.TestCase):
+
+    def setUp(self):
+        self.rng = np.random.default_rng(1)
+
+    def random_t_map(self, shape):
+        t_map = self.rng.uniform(0.0, 1.0, shape)
+        t_map[self.rng.uniform(size=shape) < 0.4] = 0.0
+        return t_map
+
+    def test_casteljau_identical(self):
+        for count in (1, 5, 64):
+            segments = random_bezsegs(self.rng, count)
+            t_map = self.random_t_map(count)
+            np.testing.assert_array_equal(bez.casteljau_subdiv_bezsegs(segments, t_map), ref.casteljau_subdiv_bezsegs(segments, t_map))
+
+    def test_casteljau_batch(self):
+        batch = np.stack([random_bezsegs(self.rng, 16) for _ in range(4)])
+        t_map = self.random_t_map(16)
+        t_batch = np.where(t_map > 0, self.rng.uniform(0.1, 0.9, (4, 16)), 0.0)
+        result = bez.casteljau_subdiv_bezsegs(batch, t_batch)
+        for curve, t, curve_result in zip(batch, t_batch, result):
+            np.testing.assert_array_equal(curve_result, ref.casteljau_subdiv_bezsegs(curve, t))
+
+    def test_casteljau_ragged_batch_raises(self):
+        batch = np.stack([random_bezsegs(self.rng, 3) for _ in range(2)])
+        t_batch = np.array(((0.5, 0.0, 0.0), (0.0, 0.5, 0.0)))
+        with self.assertRaises(ValueError):
+            bez.casteljau_subdiv_bezsegs(batch, t_batch)
+
+    def test_cut_batch_identical(self):
+        # the curves of the batch share their x layout, so they are cut on the same segments.
+        curve = random_bezsegs(self.rng, 10)
+        batch = np.stack([curve + (0, dy, 0, dy, 0, dy, 0, dy) for dy in (0.0, 0.5, -2.0)])
+        for x in (0.0, 0.37, 0.5, 0.99):
+            result = bez.cut_bezsegs(batch, x, sampling_rate=50)
+            for curve_batch, curve_result in zip(batch, result):
+                # a curve is cut at the same point alone or in a batch, on the same segments as before.
+                np.testing.assert_array_equal(curve_result, bez.cut_bezsegs(curve_batch, x, sampling_rate=50))
+                self.assertEqual(curve_result.shape, ref.cut_bezsegs(curve_batch, x, sampling_rate=50).shape)
+
+    def test_cut_ragged_batch_raises(self):
+        batch = np.stack([random_bezsegs(self.rng, 10) for _ in range(2)])
+        with self.assertRaises(ValueError):
+            bez.cut_bezsegs(batch, 0.5)
+
+    def test_cut_on_curve(self):
+        # single curves refine the estimated t, the new anchors sit on the curve.
+        segments = random_bezsegs(self.rng, 25)
+        for x in self.rng.uniform(0.0, 1.0, 20):
+            result = bez.cut_bezsegs(segments, x, sampling_rate=50)
+            self.assertEqual(result.shape, ref.cut_bezsegs(segments, x, sampling_rate=50).shape)
+            anchors = np.flatnonzero(np.isclose(result[:,6], x, rtol=0, atol=0))
+            for i in anchors:
+                self.assertAlmostEqual(result[i,7], exact_y_at_x(segments, x), delta=1e-9)
+                np.testing.assert_array_equal(result[i,6:8], result[i+1,0:2])
+
+
+
+class TestCompiled(unittest.TestCase):
+
+    def setUp(self):
+        self.rng = np.random.default_rng(2)
+
+    def test_y_at_x_exact(self):
+        for count in (1, 8, 60):
+            segments = random_bezsegs(self.rng, count)
+            x = np.concatenate((self.rng.uniform(0.0, 1.0, 100), segments[:,0], (-1.0, 0.0, 1.0, 2.0)))
+            y = bez.interpolate_bezsegs(segments, x, sampling_rate=20)
+            expected = [exact_y_at_x(segments, v) for v in np.clip(x, 0.0, 1.0)]
+            np.testing.assert_allclose(y, expected, rtol=0, atol=1e-9)
+
+
+
+def fit_bounds(segments:np.ndarray, padding:float=0.15) -> tuple:
+    """the 'FIT' bounds of the 2D curve preview node: the sampled curve bounds, padded"""
+
+    points = bez.get_compiled_bezsegs(segments, sampling_rate=100).points.reshape(-1, 2)
+    (x_min, y_min), (x_max, y_max) = points.min(axis=0), points.max(axis=0)
+    x_pad, y_pad = max((x_max - x_min) * padding, 0.1), max((y_max - y_min) * padding, 0.1)
+    return ((x_min - x_pad, y_min - y_pad), (x_max + x_pad, y_max + y_pad))
+
+
+class TestPreviewGeometry(unittest.TestCase):
+
+    def setUp(self):
+        self.rng = np.random.default_rng(3)
+
+    def preview(self, segments, dimensions=(200.0, 120.0), bounds=((-1, 0), (1, 1)), **kwargs):
+        return bez.bezsegs_preview_geometry(segments, dimensions, bounds, num_steps=20, anchor_size=4.0, handle_size=3.0, **kwargs)
+
+    def test_elements_shapes(self):
+        count = 6
+        geometry = self.preview(random_bezsegs(self.rng, count))
+
+        expected = {
+            'rectangle': ('TRIS', 4, 2), 'border': ('LINES', 4, 4), 'grid': ('LINES', 24, None), 'axis': ('LINES', 2, None),
+            'curve': ('LINE_STRIP', count * 21, None), 'handle_lines': ('LINES', count * 4, None),
+            'handles': ('TRIS', count * 2 * 4, count * 2 * 2), 'anchors': ('TRIS', (count + 1) * 4, (count + 1) * 2),
+            }
+        self.assertEqual(set(geometry), set(expected) | {'fill'})
+        for name, (primitive, vertices_count, indices_count) in expected.items():
+            primitive_type, vertices, indices = geometry[name]
+            self.assertEqual(primitive_type, primitive, name)
+            self.assertEqual(vertices.shape, (vertices_count, 2), name)
+            self.assertEqual(vertices.dtype, np.float32, name)
+            if (indices_count is None):
+                self.assertIsNone(indices, name)
+            else:
+                self.assertEqual(len(indices), indices_count, name)
+            continue
+
+    def test_indices_ranges(self):
+        for count in (1, 5, 40):
+            for bounds in (((-1, 0), (1, 1)), ((0.2, -3), (0.8, 3))):
+                geometry = self.preview(random_bezsegs(self.rng, count), bounds=bounds)
+                for name, (primitive_type, vertices, indices) in geometry.items():
+                    if (indices is None):
+                        continue
+                    self.assertEqual(indices.dtype, np.int32, name)
+                    self.assertEqual(indices.shape[1], 3 if (primitive_type == 'TRIS') else 2, name)
+                    self.assertGreaterEqual(indices.min(), 0, name)
+                    self.assertLess(indices.max(), len(vertices), name)
+                    continue
+                continue
+            continue
+
+    def test_custom_bounds_mapping(self):
+        width, height = 200.0, 120.0
+        bounds = ((-1.0, 0.0), (1.0, 1.0))
+        segments = random_bezsegs(self.rng, 4)
+        geometry = self.preview(segments, dimensions=(width, height), bounds=bounds)
+
+        # the data bounds are mapped linearly onto the rectangle.
+        origin, scale = np.array(bounds[0]), np.array((width / 2.0, height / 1.0))
+        points = (segments.reshape(-1, 4, 2) - origin) * scale
+        np.testing.assert_allclose(geometry['handle_lines'][1], points.reshape(-1, 2), atol=1e-4)
+
+        anchors = np.concatenate((points[:1, 0], points[:, 3]))
+        np.testing.assert_allclose(geometry['anchors'][1].reshape(-1, 4, 2).mean(axis=1), anchors, atol=1e-4)
+        np.testing.assert_allclose(geometry['curve'][1][[0, -1]], anchors[[0, -1]], atol=1e-4)
+
+        # the y axis sits on x=0, the middle of the rectangle. the x axis is a bound, it isn't drawn.
+        np.testing.assert_allclose(geometry['axis'][1], ((width / 2, height), (width / 2, 0)))
+
+    def test_fit_bounds_mapping(self):
+        width, height = 180.0, 90.0
+        for count in (1, 3, 12):
+            segments = random_bezsegs(self.rng, count, xmin=-2.0, xmax=5.0)
+            bounds = fit_bounds(segments)
+            geometry = self.preview(segments, dimensions=(width, height), bounds=bounds)
+
+            # the fitted curve stays inside the rectangle, away from the borders by the padding.
+            curve = geometry['curve'][1]
+            self.assertTrue(np.all(curve >= 0.0) and np.all(curve <= (width, height)))
+            (x_min, y_min), (x_max, y_max) = bounds
+            margin = np.array((width * 0.1 / (x_max - x_min), height * 0.1 / (y_max - y_min)))
+            self.assertTrue(np.all(curve.min(axis=0) >= margin * 0.99))
+            self.assertTrue(np.all(curve.max(axis=0) <= (width, height) - margin * 0.99))
+
+            # the fill lies between the bottom border and the curve.
+            fill = geometry['fill'][1]
+            self.assertTrue(np.all(fill >= -1e-4) and np.all(fill <= np.array((width, height)) + 1e-4))
+            continue
+
+    def test_no_curve(self):
+        geometry = self.preview(None)
+        self.assertEqual(set(geometry), {'rectangle', 'grid', 'axis', 'border'})
+
+        # empty or degenerated bounds, only the background is drawn.
+        geometry = self.preview(random_bezsegs(self.rng, 3), bounds=((0, 0), (0, 0)))
+        self.assertEqual(set(geometry), {'rectangle', 'border'})
+
+
+class FakeCurvePoint():
+    def __init__(self, x, y):
+        self.location, self.handle_type = [x, y], 'AUTO'
+
+class FakeCurvePoints(list):
+    """mimics the points collection of a blender CurveMap"""
+    def new(self, x, y):
+        self.append(FakeCurvePoint(x, y))
+    def foreach_get(self, attr, buffer):
+        buffer[:] = np.ravel([getattr(p, attr) for p in self])
+    def foreach_set(self, attr, buffer):
+        for p, v in zip(self, np.reshape(buffer, (len(self), -1))):
+            setattr(p, attr, list(v))
+
+class FakeCurve():
+    def __init__(self):
+        self.points = FakeCurvePoints((FakeCurvePoint(0, 0), FakeCurvePoint(1, 1)))
+
+
+class TestCurveMapping(unittest.TestCase):
+
+    def test_set_points_unchanged(self):
+        curve = FakeCurve()
+        locations = np.array(((0.5, 0.2), (0.0, 0.0), (1.0, 1.0)), dtype=np.float32)
+        handles = ['VECTOR', 'AUTO', 'AUTO']
+        self.assertTrue(bez.set_curvemapping_points(curve, locations, handles))
+        self.assertEqual([p.location for p in curve.points], [[0.0, 0.0], [0.5, 0.2], [1.0, 1.0]])
+        self.assertEqual([p.handle_type for p in curve.points], ['AUTO', 'VECTOR', 'AUTO'])
+        # same points in another order, nothing to write.
+        self.assertFalse(bez.set_curvemapping_points(curve, locations[::-1], handles[::-1]))
+        self.assertTrue(bez.set_curvemapping_points(curve, locations, ['AUTO'] * 3))
+
+
+if (__name__ == "__main__"):
+    unittest.main()
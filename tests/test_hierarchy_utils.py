@@ -0,0 +1,140 @@
+# SPDX-FileCopyrightText: 2025 BD3D DIGITAL DESIGN (Dorian B.)
+#
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+# NOTE
+# headless tests of utils/hierarchy_utils.py, the nodes absolute locations through the frames hierarchy.
+# the nodes are plain python objects exposing the few attributes read by the module.
+# run with 'python -m unittest discover -s tests' from the addon directory, or 'python -m pytest' from the tests directory.
+
+
+import unittest
+import numpy as np
+
+from headless import load_module
+
+hie = load_module("utils/hierarchy_utils.py")
+
+
+class FakeNode():
+    """a node with a location relative to its parent frame, identified by a unique pointer"""
+
+    POINTERS = iter(range(1, 1_000_000))
+
+    def __init__(self, location, parent=None):
+        self.location = tuple(location)
+        self.parent = parent
+        self.pointer = next(self.POINTERS)
+
+    def as_pointer(self):
+        return self.pointer
+
+
+class FakeNodes(list):
+    """a nodes collection, supporting the batch read of the locations"""
+
+    def foreach_get(self, attr, buffer):
+        buffer[:] = np.array([getattr(n, attr) for n in self], dtype=buffer.dtype).ravel()
+        return None
+
+
+def naive_absolute_locations(nodes:list) -> np.ndarray:
+    """sum the locations of each node parents chain, one node at a time"""
+
+    absolute = []
+    for n in nodes:
+        x, y = n.location
+        p = n.parent
+        while (p is not None):
+            x, y = x + p.location[0], y + p.location[1]
+            p = p.parent
+        absolute.append((x, y))
+        continue
+    return np.array(absolute, dtype=np.float64).reshape(-1, 2)
+
+
+class TestAbsoluteLocations(unittest.TestCase):
+
+    def setUp(self):
+        self.rng = np.random.default_rng(0)
+
+    def random_nodes(self, count:int) -> FakeNodes:
+        """random nodes, each one parented to one of the previous nodes or to none, up to many levels deep"""
+
+        nodes = FakeNodes()
+        for i in range(count):
+            parent = nodes[int(self.rng.integers(0, i))] if (i and (self.rng.uniform() < 0.7)) else None
+            nodes.append(FakeNode(self.rng.uniform(-500, 500, 2), parent))
+            continue
+        # the frames are not necessarily listed before their children
+        self.rng.shuffle(nodes)
+        return nodes
+
+    def test_compute_absolute_locations(self):
+        for count in (1, 10, 300):
+            nodes = self.random_nodes(count)
+            indices = {n.as_pointer():i for i,n in enumerate(nodes)}
+            parents = hie.get_nodes_parents_indices(nodes, indices)
+            locations = np.array([n.location for n in nodes])
+            np.testing.assert_allclose(hie.compute_absolute_locations(locations, parents), naive_absolute_locations(nodes), atol=1e-9)
+            continue
+
+    def test_compute_absolute_locations_empty(self):
+        self.assertEqual(hie.compute_absolute_locations(np.empty((0, 2)), np.empty(0)).shape, (0, 2))
+
+    def check(self, nodes, memo):
+        memo = hie.update_absolute_locations(nodes, memo)
+        np.testing.assert_allclose(memo['absolute'], naive_absolute_locations(nodes), atol=1e-3)
+        return memo
+
+    def test_incremental_moves(self):
+        nodes = self.random_nodes(50)
+        memo = self.check(nodes, None)
+
+        # nothing changed, the same memo is given back.
+        self.assertIs(hie.update_absolute_locations(nodes, memo)['absolute'], memo['absolute'])
+
+        # moving a frame moves its children.
+        frame = next(n.parent for n in nodes if (n.parent is not None))
+        frame.location = (frame.location[0] + 100, frame.location[1] - 50)
+        memo = self.check(nodes, memo)
+
+    def test_incremental_reparent(self):
+        nodes = self.random_nodes(50)
+        memo = self.check(nodes, None)
+
+        # a node parented to a known frame is moved to keep its place
+        node = next(n for n in nodes if (n.parent is None))
+        frame = next(n for n in nodes if (n is not node) and (n.parent is None))
+        node.parent = frame
+        node.location = (node.location[0] - frame.location[0], node.location[1] - frame.location[1])
+        memo = self.check(nodes, memo)
+
+    def test_incremental_replaced_frame(self):
+        a, b, c = FakeNode((0, 0)), FakeNode((10, 10)), FakeNode((20, 20))
+        nodes = FakeNodes((a, b, c))
+        memo = self.check(nodes, None)
+
+        # remove c, add a new frame f at the same count, then parent a to f.
+        f = FakeNode((100, 100))
+        nodes.remove(c)
+        nodes.append(f)
+        a.parent = f
+        a.location = (-100, -100)
+        memo = self.check(nodes, memo)
+        np.testing.assert_allclose(memo['absolute'][0], (0, 0))
+
+    def test_incremental_replaced_node(self):
+        nodes = self.random_nodes(20)
+        memo = self.check(nodes, None)
+
+        # a node replaced by another one at the same index, the deleted node wasn't a frame.
+        parents = {n.parent for n in nodes}
+        i = next(i for i,n in enumerate(nodes) if (n not in parents))
+        nodes[i] = FakeNode((1, 2))
+        memo = self.check(nodes, memo)
+        self.assertEqual(memo['pointers'][i], nodes[i].as_pointer())
+
+
+if (__name__ == "__main__"):
+    unittest.main()
@@ -0,0 +1,175 @@
+# SPDX-FileCopyrightText: 2025 BD3D DIGITAL DESIGN (Dorian B.)
+#
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+# NOTE
+# headless tests of utils/shape_utils.py, the geometry of the minimap batches.
+# run with 'python -m unittest discover -s tests' from the addon directory, or 'python -m pytest' from the tests directory.
+
+
+import unittest
+import numpy as np
+
+from headless import load_module
+
+shp = load_module("utils/shape_utils.py")
+
+
+def random_bounds(rng:np.random.Generator, count:int, extent:float=1000.0) -> np.ndarray:
+    """generate count (M, 2, 2) random rectangles [[x1, y1], [x2, y2]] in the [0, extent] square"""
+
+    corners = rng.uniform(0.0, extent, (count, 2))
+    sizes = rng.uniform(10.0, extent / 5, (count, 2))
+    return np.stack((corners, corners + sizes), axis=1).astype(np.float32)
+
+
+def triangles_area(vertices:np.ndarray, indices:np.ndarray) -> np.ndarray:
+    """get the unsigned area of each triangle"""
+
+    a, b, c = vertices[indices[:,0]], vertices[indices[:,1]], vertices[indices[:,2]]
+    return np.abs((b[:,0] - a[:,0]) * (c[:,1] - a[:,1]) - (c[:,0] - a[:,0]) * (b[:,1] - a[:,1])) / 2
+
+
+def naive_density(bounds:np.ndarray, domain:np.ndarray, cell_size:float) -> np.ndarray:
+    """count the rectangles overlapping each cell of the grid, one rectangle at a time"""
+
+    (dx1, dy1), (dx2, dy2) = domain
+    nx = max(1, int(np.ceil((dx2 - dx1) / cell_size)))
+    ny = max(1, int(np.ceil((dy2 - dy1) / cell_size)))
+    density = np.zeros((nx, ny), dtype=np.int64)
+    for (x1, y1), (x2, y2) in bounds:
+        i1 = int(np.clip(np.floor((x1 - dx1) / cell_size), 0, nx - 1))
+        j1 = int(np.clip(np.floor((y1 - dy1) / cell_size), 0, ny - 1))
+        i2 = max(int(np.clip(np.ceil((x2 - dx1) / cell_size), 0, nx)), i1 + 1)
+        j2 = max(int(np.clip(np.ceil((y2 - dy1) / cell_size), 0, ny)), j1 + 1)
+        density[i1:i2, j1:j2] += 1
+        continue
+    return density
+
+
+class TestRectangles(unittest.TestCase):
+
+    def setUp(self):
+        self.rng = np.random.default_rng(0)
+
+    def test_rectangles_geometry(self):
+        bounds = random_bounds(self.rng, 25)
+        colors = self.rng.uniform(size=(25, 4))
+        vertices, vcolors, indices = shp.rectangles_geometry(bounds, colors)
+
+        self.assertEqual(vertices.shape, (100, 2))
+        self.assertEqual(vcolors.shape, (100, 4))
+        self.assertEqual(indices.shape, (50, 3))
+        self.assertEqual((vertices.dtype, vcolors.dtype, indices.dtype), (np.float32, np.float32, np.int32))
+
+        # each rectangle owns its 4 corners and 2 triangles, in the given order.
+        quads = vertices.reshape(-1, 4, 2)
+        np.testing.assert_array_equal(quads.min(axis=1), bounds[:,0])
+        np.testing.assert_array_equal(quads.max(axis=1), bounds[:,1])
+        np.testing.assert_array_equal(vcolors.reshape(-1, 4, 4), np.repeat(colors.astype(np.float32)[:,np.newaxis], 4, axis=1))
+        np.testing.assert_array_equal(indices.reshape(-1, 6) // 4, np.repeat(np.arange(25)[:,np.newaxis], 6, axis=1))
+
+        # the two triangles cover the whole rectangle.
+        sizes = bounds[:,1] - bounds[:,0]
+        np.testing.assert_allclose(triangles_area(vertices, indices).reshape(-1, 2).sum(axis=1), sizes[:,0] * sizes[:,1], rtol=1e-4)
+
+    def test_rectangles_geometry_empty(self):
+        vertices, vcolors, indices = shp.rectangles_geometry(np.empty((0, 2, 2)), np.empty((0, 4)))
+        self.assertEqual((vertices.shape, vcolors.shape, indices.shape), ((0, 2), (0, 4), (0, 3)))
+
+    def test_rectangles_outlines_geometry(self):
+        bounds = random_bounds(self.rng, 10)
+        colors = self.rng.uniform(size=(10, 4))
+        vertices, vcolors = shp.rectangles_outlines_geometry(bounds, colors)
+
+        self.assertEqual(vertices.shape, (80, 2))
+        self.assertEqual(vcolors.shape, (80, 4))
+
+        # each rectangle is outlined by 4 closed edges, each one axis aligned along a side of the rectangle.
+        edges = vertices.reshape(-1, 4, 2, 2)
+        np.testing.assert_array_equal(edges[:,:,1], np.roll(edges[:,:,0], -1, axis=1))
+        for rect, rect_edges in zip(bounds, edges):
+            expected = {((rect[0,0], rect[0,1]), (rect[1,0], rect[0,1])), ((rect[1,0], rect[0,1]), (rect[1,0], rect[1,1])),
+                        ((rect[1,0], rect[1,1]), (rect[0,0], rect[1,1])), ((rect[0,0], rect[1,1]), (rect[0,0], rect[0,1]))}
+            self.assertEqual({tuple(map(tuple, e)) for e in rect_edges}, expected)
+            continue
+
+        np.testing.assert_array_equal(vcolors.reshape(-1, 8, 4), np.repeat(colors.astype(np.float32)[:,np.newaxis], 8, axis=1))
+
+    def test_headers_bounds(self):
+        bounds = random_bounds(self.rng, 12)
+        original = bounds.copy()
+        heights = self.rng.uniform(0.0, 10.0, 12).astype(np.float32)
+        heights[0] = 0.0
+        headers = shp.headers_bounds(bounds, heights)
+
+        # the headers are placed on top of the rectangles, with the same width.
+        np.testing.assert_array_equal(headers[:,1], bounds[:,1])
+        np.testing.assert_array_equal(headers[:,0,0], bounds[:,0,0])
+        np.testing.assert_allclose(headers[:,1,1] - headers[:,0,1], heights, atol=1e-4)
+
+        # the given bounds are left untouched.
+        np.testing.assert_array_equal(bounds, original)
+
+
+class TestDensityGrid(unittest.TestCase):
+
+    def setUp(self):
+        self.rng = np.random.default_rng(0)
+
+    def check_against_naive(self, bounds:np.ndarray, domain:np.ndarray, cell_size:float):
+        color = (0.2, 0.4, 0.6, 0.8)
+        vertices, vcolors, indices = shp.density_grid_geometry(bounds, domain, cell_size, color)
+
+        density = naive_density(bounds, domain, cell_size)
+        self.assertEqual(len(vertices), 4 * np.count_nonzero(density))
+        self.assertEqual(len(indices), 2 * np.count_nonzero(density))
+
+        # find back the cell of each quad, and check its faded color against the expected overlap count.
+        cells = vertices.reshape(-1, 4, 2).min(axis=1)
+        ci = np.round((cells[:,0] - domain[0,0]) / cell_size).astype(int)
+        cj = np.round((cells[:,1] - domain[0,1]) / cell_size).astype(int)
+        counts = density[ci, cj]
+        self.assertTrue(np.all(counts > 0))
+
+        weights = np.log1p(counts) / np.log1p(density.max())
+        alphas = vcolors.reshape(-1, 4, 4)[:,0]
+        np.testing.assert_allclose(alphas[:,:3], np.broadcast_to(color[:3], (len(counts), 3)), atol=1e-6)
+        np.testing.assert_allclose(alphas[:,3], color[3] * (0.25 + 0.75 * weights), atol=1e-6)
+
+        # the cells stay inside the domain.
+        self.assertTrue(np.all(vertices >= domain[0] - 1e-3))
+        self.assertTrue(np.all(vertices <= domain[1] + 1e-3))
+
+    def test_density_random(self):
+        for count, cell_size in ((1, 50.0), (40, 100.0), (500, 37.5)):
+            bounds = random_bounds(self.rng, count)
+            domain = np.array((bounds[:,0].min(axis=0), bounds[:,1].max(axis=0)), dtype=np.float32)
+            self.check_against_naive(bounds, domain, cell_size)
+            continue
+
+    def test_density_overlaps(self):
+        # two overlapping rectangles, the shared cell is the densest one.
+        bounds = np.array((((0, 0), (20, 20)), ((10, 10), (30, 30))), dtype=np.float32)
+        domain = np.array(((0, 0), (30, 30)), dtype=np.float32)
+        self.check_against_naive(bounds, domain, 10.0)
+
+        vertices, vcolors, indices = shp.density_grid_geometry(bounds, domain, 10.0, (1, 1, 1, 1))
+        alphas = vcolors.reshape(-1, 4, 4)[:,0,3]
+        densest = vertices.reshape(-1, 4, 2)[np.argmax(alphas)].min(axis=0)
+        np.testing.assert_array_equal(densest, (10, 10))
+        self.assertAlmostEqual(float(alphas.max()), 1.0, places=6)
+
+    def test_density_outside_domain(self):
+        # rectangles out of the domain are clamped onto its border cells.
+        bounds = np.array((((-50, -50), (-40, -40)), ((200, 5), (260, 8))), dtype=np.float32)
+        domain = np.array(((0, 0), (100, 100)), dtype=np.float32)
+        self.check_against_naive(bounds, domain, 25.0)
+
+    def test_density_empty(self):
+        vertices, vcolors, indices = shp.density_grid_geometry(np.empty((0, 2, 2)), np.array(((0, 0), (10, 10))), 1.0, (1, 1, 1, 1))
+        self.assertEqual((vertices.shape, vcolors.shape, indices.shape), ((0, 2), (0, 4), (0, 3)))
+
+
+if (__name__ == "__main__"):
+    unittest.main()
@@ -92,6 +92,22 @@ class NODEBOOSTER_PT_tool_search(bpy.types.Panel):
 
         s = layout.column()
         s.label(text=f"Found {sett_scene.search_found} Element(s)")
+
+        #best ranked results, across all the nodetrees of the file
+        from ..operators.search import SEARCH_RESULTS
+        if (SEARCH_RESULTS):
+            col = layout.column(align=True)
+            for i, (_, tree, _, name) in enumerate(SEARCH_RESULTS[:8]):
+                try:
+                    node = tree.nodes.get(name)
+                except ReferenceError:
+                    continue
+                if (node is None):
+                    continue
+                label = node.label or node.bl_label
+                op = col.operator("nodebooster.search_jump", text=f"{label}  ({tree.name})", icon="NODE",)
+                op.index = i
+                continue
     
         return None
 
@@ -279,6 +295,21 @@ class NODEBOOSTER_PT_minimap(bpy.types.Panel):
             childcol.prop(sett_scene,"minimap_node_header_minheight", text="Min Height",)
             col.prop(sett_scene,"minimap_node_body_color", text="Body",)
 
+        header, panel = layout.panel("minimap_lod_params", default_closed=True,)
+        header.prop(sett_scene,"minimap_lod_enable", text="Level of Detail",)
+        if (panel):
+
+            col = panel.column()
+            col.active = sett_scene.minimap_lod_enable
+            col.use_property_split = True
+            col.use_property_decorate = False
+
+            col.prop(sett_scene,"minimap_lod_node_threshold", text="Nodes",)
+            col.prop(sett_scene,"minimap_lod_node_minsize", text="Min Size",)
+            col.prop(sett_scene,"minimap_lod_budget", text="Budget (ms)",)
+            col.prop(sett_scene,"minimap_lod_cell_size", text="Cell Size",)
+            col.prop(sett_scene,"minimap_lod_color", text="Color",)
+
         header, panel = layout.panel("minimap_view_params", default_closed=True,)
         header.label(text="View Theme",)
         if (panel):
@@ -18,6 +18,7 @@
 
 import hashlib
 import numpy as np
+from collections import OrderedDict
 
 
 def reverseengineer_curvemapping_to_bezsegs(curve) -> np.ndarray:
@@ -113,56 +114,43 @@ def reverseengineer_curvemapping_to_bezsegs(curve) -> np.ndarray:
 
         return h1_calc, h2_calc
 
-    def _ensure_monotonic_handles(points, all_left_h, all_right_h):
+    def _ensure_monotonic_handles(knots_x, all_left_h, all_right_h):
         """
-        Adjusts calculated handle X-coordinates to ensure X-monotonicity for each segment.
+        Adjusts calculated handle X-coordinates to ensure X-monotonicity for each segment, for all segments at once.
         Enforces x0 <= x1 <= x2 <= x3 where P1=HR_i, P2=HL_i+1.
 
         Args:
-            points: List of CurveMapPoint objects.
-            all_left_h: List of calculated left handle positions (np.arrays).
-            all_right_h: List of calculated right handle positions (np.arrays).
+            knots_x: (N,) array of the CurveMapPoint x locations.
+            all_left_h: (N,2) array of calculated left handle positions.
+            all_right_h: (N,2) array of calculated right handle positions.
 
         Returns:
-            tuple: (final_left_h, final_right_h) - Lists of adjusted handle positions.
+            tuple: (final_left_h, final_right_h) - (N,2) arrays of adjusted handle positions.
         """
-        n_points = len(points)
-        if (n_points < 2):
-            return list(all_left_h), list(all_right_h)
-
         # Create copies to modify
-        final_left_h = [h.copy() for h in all_left_h]
-        final_right_h = [h.copy() for h in all_right_h]
-
-        # Iterate through segments [i, i+1]
-        for i in range(n_points - 1):
-            # P0 = knot[i], P1 = HR[i], P2 = HL[i+1], P3 = knot[i+1]
-            x_k_i = points[i].location[0]
-            x_k_i1 = points[i+1].location[0]
-            # X-coords of handles relevant to this segment
-            x_hr_i_orig = final_right_h[i][0]   # P1.x original
-            x_hl_i1_orig = final_left_h[i+1][0] # P2.x original
-
-            # Apply clamping based on x0 <= x1 <= x2 <= x3
-            # 1. Clamp P1.x (x_hr_i) >= P0.x (x_k_i)
-            x_hr_i_clamped = max(x_k_i, x_hr_i_orig)
-            # 2. Clamp P2.x (x_hl_i1) <= P3.x (x_k_i1)
-            x_hl_i1_clamped = min(x_k_i1, x_hl_i1_orig)
-            # 3. Check for crossover: P1.x > P2.x after clamping
-            if x_hr_i_clamped > x_hl_i1_clamped:
-                # Crossover occurred. Handles need to meet.
-                # Calculate the midpoint of the conflicting interval.
-                x_split = (x_hr_i_clamped + x_hl_i1_clamped) / 2.0
-                # Ensure the split point is strictly within the knot interval.
-                x_split = max(x_k_i, min(x_k_i1, x_split))
-                # Set both handles' X to the split point.
-                final_right_h[i][0] = x_split
-                final_left_h[i+1][0] = x_split
-            else:
-                # No crossover, just apply the individual clamps.
-                final_right_h[i][0] = x_hr_i_clamped
-                final_left_h[i+1][0] = x_hl_i1_clamped
-            continue
+        final_left_h = all_left_h.copy()
+        final_right_h = all_right_h.copy()
+
+        if (len(knots_x) < 2):
+            return final_left_h, final_right_h
+
+        # Segments [i, i+1]: P0 = knot[i], P1 = HR[i], P2 = HL[i+1], P3 = knot[i+1]
+        # NOTE each segment only touch its own handles, they can all be processed at once.
+        x_k_i, x_k_i1 = knots_x[:-1], knots_x[1:]
+
+        # Apply clamping based on x0 <= x1 <= x2 <= x3
+        # 1. Clamp P1.x (x_hr_i) >= P0.x (x_k_i)
+        x_hr_i_clamped = np.maximum(x_k_i, final_right_h[:-1,0])
+        # 2. Clamp P2.x (x_hl_i1) <= P3.x (x_k_i1)
+        x_hl_i1_clamped = np.minimum(x_k_i1, final_left_h[1:,0])
+        # 3. Check for crossover: P1.x > P2.x after clamping
+        # if so, the handles need to meet at the midpoint of the conflicting interval, 
+        # strictly within the knot interval.
+        crossover = x_hr_i_clamped > x_hl_i1_clamped
+        x_split = np.maximum(x_k_i, np.minimum(x_k_i1, (x_hr_i_clamped + x_hl_i1_clamped) / 2.0))
+
+        final_right_h[:-1,0] = np.where(crossover, x_split, x_hr_i_clamped)
+        final_left_h[1:,0] = np.where(crossover, x_split, x_hl_i1_clamped)
 
         return final_left_h, final_right_h
 
@@ -217,30 +205,22 @@ def reverseengineer_curvemapping_to_bezsegs(curve) -> np.ndarray:
                     all_left_h[last_idx] = P3 + scaled_direction
 
     # Apply X-Monotonicity
-    final_left_h, final_right_h = _ensure_monotonic_handles(points, all_left_h, all_right_h)
-
-    # Build segments
-    segments_list = []
-    for i in range(n_points - 1):
-
-        P0 = np.array(points[i].location, dtype=float)
-        P3 = np.array(points[i + 1].location, dtype=float)
-
-        P1 = final_right_h[i]
-        P2 = final_left_h[i + 1]
+    knots = np.empty(n_points * 2, dtype=float)
+    points.foreach_get('location', knots)
+    knots = knots.reshape(n_points, 2)
+    final_left_h, final_right_h = _ensure_monotonic_handles(knots[:,0], np.array(all_left_h), np.array(all_right_h))
 
-        if (np.any(np.isnan(P0)) or np.any(np.isnan(P1)) or \
-            np.any(np.isnan(P2)) or np.any(np.isnan(P3))):
-            print(f"WARNING: NaN detected in segment {i}. Skipping.")
-            continue
+    # Build segments, [P0, P1, P2, P3] = [knot i, right handle i, left handle i+1, knot i+1]
+    segments = np.concatenate((knots[:-1], final_right_h[:-1], final_left_h[1:], knots[1:]), axis=1)
 
-        segment_row = np.concatenate((P0, P1, P2, P3))
-        segments_list.append(segment_row)
-        continue
+    nan_rows = np.isnan(segments).any(axis=1)
+    for i in np.flatnonzero(nan_rows):
+        print(f"WARNING: NaN detected in segment {i}. Skipping.")
+    segments = segments[~nan_rows]
 
-    if (not segments_list):
+    if (not len(segments)):
          return None
-    return np.array(segments_list, dtype=float)
+    return segments
 
 
 def is_handles_aligned(handle, anchor1, anchor2, tolerance:float=1e-6) -> bool:
@@ -268,58 +248,77 @@ def is_handles_aligned(handle, anchor1, anchor2, tolerance:float=1e-6) -> bool:
     return (abs(cross_product) < tolerance)
 
 
-def bezsegs_to_curvemapping(curve, segments:np.ndarray) -> None:
-    """Apply an N x 8 NumPy array of Bézier segments [P0x, P0y, P1x, P1y, P2x, P2y, P3x, P3y] to the blender mapping.curve API."""
+def bezsegs_to_curvemapping(curve, segments:np.ndarray) -> bool:
+    """Apply an N x 8 NumPy array of Bézier segments [P0x, P0y, P1x, P1y, P2x, P2y, P3x, P3y] to the blender mapping.curve API.
+    Only the points that changed are written. Returns True if the curve changed, 
+    in which case the caller is responsible for sending an update to the mapping."""
 
     # number of points needed to represent the segments as points
     num_segments = segments.shape[0]
     num_points = num_segments + 1
 
-    # Start fresh with default 2 points
-    reset_curvemapping(curve)
+    # the points locations, first point of the first segment, then the end point of each segments.
+    # NOTE blender store the locations as float32, we compare them with the same precision.
+    locations = np.empty((num_points, 2), dtype=np.float32)
+    locations[0] = segments[0, 0:2]
+    locations[1:] = segments[:, 6:8]
 
-    # Ensure enough points exist in the Blender curve
-    while (len(curve.points) < num_points):
-        curve.points.new(0, 0) 
-
-    # Set first point's location
-    P0_first = segments[0, 0:2] # First point of first segment
-    curve.points[0].location = tuple(P0_first) # Convert slice to tuple for location
-
-    # Set subsequent points and handle types based on segments
+    # Set point handle type. We just watch out for VECTOR handles.
+    vectors = [False] * num_points
     for i in range(num_segments):
-        # Extract points directly using slicing
-        P0 = segments[i, 0:2]
-        P1 = segments[i, 2:4]
-        P2 = segments[i, 4:6]
-        P3 = segments[i, 6:8]
-
-        # Set Point Locations
-        # Location of the end point of this segment corresponds to curve.points[i+1]
-        curve.points[i+1].location = tuple(P3) # Convert slice to tuple
-
-        # Set point handle type. We just watch out for VECTOR handles.
-        if ((curve.points[i].handle_type != 'VECTOR') and is_handles_aligned(P1, P0, P3)):
-            curve.points[i].handle_type = 'VECTOR'
-        if ((curve.points[i+1].handle_type != 'VECTOR') and is_handles_aligned(P2, P3, P0)):
-            curve.points[i+1].handle_type = 'VECTOR'
+        P0, P1, P2, P3 = segments[i, 0:2], segments[i, 2:4], segments[i, 4:6], segments[i, 6:8]
+        vectors[i] |= is_handles_aligned(P1, P0, P3)
+        vectors[i+1] |= is_handles_aligned(P2, P3, P0)
         continue
+    handle_types = ['VECTOR' if v else 'AUTO' for v in vectors]
 
-    return None
+    return set_curvemapping_points(curve, locations, handle_types)
 
 
-def reset_curvemapping(curve) -> None:
-    """clear all points of this curve (2 pts need to be left)"""
+def set_curvemapping_points(curve, locations:np.ndarray, handle_types:list) -> bool:
+    """Set the points of a blender mapping.curve from a (N,2) float32 locations array and a list of N handle types.
+    The curve is only resized by the difference in number of points, and only the changed values are written.
+    Returns True if the curve changed."""
 
     points = curve.points
+    num_points = len(locations)
+    current_count = len(points)
+
+    # blender keeps the points sorted by x, we sort ours the same way to compare them.
+    order = np.argsort(locations[:,0], kind='stable')
+    locations = np.ascontiguousarray(locations[order], dtype=np.float32)
+    handle_types = [handle_types[i] for i in order]
+
+    # compare with the current state of the curve, nothing to do if identical.
+    if (current_count == num_points):
+        current = np.empty(current_count * 2, dtype=np.float32)
+        points.foreach_get('location', current)
+        if (np.array_equal(current, locations.ravel()) and
+            all(p.handle_type == h for p, h in zip(points, handle_types))):
+            return False
+
+    # resize the curve, a curve always need at least 2 points.
+    # NOTE the python API doesn't offer bulk operations on the points, we only add/remove the difference.
+    while (len(points) > max(num_points, 2)):
+        points.remove(points[-2])
+    while (len(points) < num_points):
+        points.new(0, 0)
+
+    # write all locations in one go, already sorted like mapping.update() would.
+    points.foreach_set('location', locations.ravel())
+
+    for p, h in zip(points, handle_types):
+        if (p.handle_type != h):
+            p.handle_type = h
+        continue
 
-    while (len(curve.points)>2):
-        points.remove(points[1])
+    return True
 
-    points[0].location = (0,0)
-    points[1].location = (1,1)
 
-    return None
+def reset_curvemapping(curve) -> bool:
+    """clear all points of this curve (2 pts need to be left). Returns True if the curve changed."""
+
+    return set_curvemapping_points(curve, np.array(((0,0),(1,1)), dtype=np.float32), ('AUTO','AUTO'))
 
 
 def hash_bezsegs(segments:np.ndarray) -> str:
@@ -330,14 +329,43 @@ def hash_bezsegs(segments:np.ndarray) -> str:
     return hashlib.md5(segments.tobytes()).hexdigest()
 
 
-def is_bezsegs_monotonic(segments:np.ndarray, sample_rate:int=500) -> bool:
+def is_bezsegs_monotonic(segments:np.ndarray, tolerance:float=1e-9) -> bool:
     """Check if the segments represent a monotonic curve in it's x-axis.
     Curve monotinicity means that the curve points never backtrace on itself on the x-axis.
     segments (np.ndarray): An (N-1) x 8 NumPy array [P0x, P0y, P1x, P1y, P2x, P2y, P3x, P3y].
     Returns True if the segments are monotonic in x, False otherwise.
     """
-    points = sample_bezsegs(segments, sample_rate)
-    return np.all(np.diff(points[:,0]) >= 0)
+    # NOTE this check is done analytically, the derivative of a segment x(t) is a quadratic:
+    # x'(t)/3 = (1-t)²d0 + 2(1-t)t·d1 + t²d2 = A·t² + B·t + C, with d0=x1-x0, d1=x2-x1, d2=x3-x2
+    # it's non-negative on [0,1] if it is at both ends, and at its vertex when the vertex is within ]0,1[.
+
+    x0, x1, x2, x3 = segments[:,0], segments[:,2], segments[:,4], segments[:,6]
+    d0, d1, d2 = x1 - x0, x2 - x1, x3 - x2
+
+    # the derivative at the segments ends
+    if np.any(d0 < -tolerance) or np.any(d2 < -tolerance):
+        return False
+
+    # the segments need to follow each other on the x axis
+    if np.any(x0[1:] - x3[:-1] < -tolerance):
+        return False
+
+    # the derivative minimum within the segments
+    A = d0 - 2.0*d1 + d2
+    B = 2.0 * (d1 - d0)
+    C = d0
+    convex = A > tolerance
+    safe_A = np.where(convex, A, 1.0)
+    t_vertex = -B / (2.0 * safe_A)
+    has_vertex = convex & (0.0 < t_vertex) & (t_vertex < 1.0)
+    vertex_value = C - (B * B) / (4.0 * safe_A)
+
+    return not np.any(has_vertex & (vertex_value < -tolerance))
+
+
+# Least recently used cache of monotonic curves {(hash, shape): monotonic segments, or None if already monotonic}
+MONOTONIC_BEZSEGS = OrderedDict()
+MONOTONIC_BEZSEGS_MAX = 128
 
 
 def ensure_monotonic_bezsegs(segments:np.ndarray) -> np.ndarray:
@@ -346,13 +374,30 @@ def ensure_monotonic_bezsegs(segments:np.ndarray) -> np.ndarray:
     How it's done:
     - We sort the anchor points by their x-coordinate.
     - We then adjust the handles if needed. 
+    The results are memoized per curve content, see MONOTONIC_BEZSEGS.
     segments (np.ndarray): An (N-1) x 8 NumPy array [P0x, P0y, P1x, P1y, P2x, P2y, P3x, P3y].
     """
-    # NOTE this function is optimized for numpy.
 
-    # we don't need to do anything if the curve is already monotonic
-    if is_bezsegs_monotonic(segments):
+    key = (hash_bezsegs(segments), segments.shape, segments.dtype.str)
+
+    if (key in MONOTONIC_BEZSEGS):
+        MONOTONIC_BEZSEGS.move_to_end(key)
+        r = MONOTONIC_BEZSEGS[key]
+    else:
+        # we don't need to do anything if the curve is already monotonic
+        r = None if is_bezsegs_monotonic(segments) else make_bezsegs_monotonic(segments)
+        MONOTONIC_BEZSEGS[key] = r
+        if (len(MONOTONIC_BEZSEGS) > MONOTONIC_BEZSEGS_MAX):
+            MONOTONIC_BEZSEGS.popitem(last=False)
+
+    if (r is None):
         return segments
+    return r.copy()
+
+
+def make_bezsegs_monotonic(segments:np.ndarray) -> np.ndarray:
+    """The sorting and handles clamping logic of ensure_monotonic_bezsegs(), without the checks and caching."""
+    # NOTE this function is optimized for numpy.
 
     num_segments = segments.shape[0]
     num_points = num_segments + 1
@@ -481,29 +526,22 @@ def ensure_monotonic_bezsegs(segments:np.ndarray) -> np.ndarray:
 #     return (P0 * omt3) + (P1 * 3.0 * omt2 * t) + (P2 * 3.0 * omt * t2) + (P3 * t3)
 
 
-def sample_bezsegs(segments:np.ndarray, sampling_rate:int) -> np.ndarray:
-    """Generate sampled points from the segments numpy array using vectorized operations.
-    segments (np.ndarray): An (N-1) x 8 NumPy array [P0x, P0y, P1x, P1y, P2x, P2y, P3x, P3y].
-    sampling_rate (int): Number of steps per segment (e.g., 1 gives start/end, 2 gives start/mid/end).
-    Returns a NumPy array of 2D points (sampling_rate + 1, 2).
-    """
+def bezsegs_control_points(segments:np.ndarray) -> tuple:
+    """Split segments arrays (..., N, 8) into their 4 control points arrays (..., N, 2).
+    Any leading batch dimensions are preserved, in order to work on many curves at once."""
 
-    if (sampling_rate < 1): raise ValueError("sampling_rate must be at least 1")
+    control_points = segments.reshape(*segments.shape[:-1], 4, 2)
+    return control_points[...,0,:], control_points[...,1,:], control_points[...,2,:], control_points[...,3,:]
 
-    num_segments = segments.shape[0]
-    num_points_per_segment = sampling_rate + 1
 
-    # Extract control points for all segments
-    # Reshape to (num_segments, 4, 2) for easier access
-    control_points = segments.reshape(num_segments, 4, 2)
-    P0 = control_points[:, 0, :][:, np.newaxis, :] # Shape (N, 1, 2)
-    P1 = control_points[:, 1, :][:, np.newaxis, :] # Shape (N, 1, 2)
-    P2 = control_points[:, 2, :][:, np.newaxis, :] # Shape (N, 1, 2)
-    P3 = control_points[:, 3, :][:, np.newaxis, :] # Shape (N, 1, 2)
+def evaluate_bezsegs(segments:np.ndarray, t:np.ndarray) -> np.ndarray:
+    """Evaluate the points of all segments (..., N, 8) at the given t values (S,), in one vectorized pass.
+    Returns an array of points of shape (..., N, S, 2)."""
 
-    # Generate t values (parameterization)
-    # Shape (1, num_points_per_segment, 1) to broadcast correctly with points
-    t = np.linspace(0, 1, num_points_per_segment).reshape(1, num_points_per_segment, 1)
+    P0, P1, P2, P3 = (P[...,np.newaxis,:] for P in bezsegs_control_points(segments)) # Shape (..., N, 1, 2)
+
+    # Shape (S, 1) to broadcast correctly with points
+    t = t.reshape(-1, 1)
 
     # Calculate powers of t and (1-t)
     omt = 1.0 - t
@@ -513,112 +551,92 @@ def sample_bezsegs(segments:np.ndarray, sampling_rate:int) -> np.ndarray:
     t3 = t2 * t
 
     # Calculate points using the Bezier formula with broadcasting
-    # Result shape: (num_segments, num_points_per_segment, 2)
-    points = (P0 * omt3) + (P1 * 3.0 * omt2 * t) + (P2 * 3.0 * omt * t2) + (P3 * t3)
+    return (P0 * omt3) + (P1 * 3.0 * omt2 * t) + (P2 * 3.0 * omt * t2) + (P3 * t3)
 
-    # Reshape to a 2D array: (num_segments * num_points_per_segment, 2)
-    all_points = points.reshape(-1, 2)
 
-    # Remove duplicate points at segment junctions
-    # Keep the first point (t=0) of the first segment.
-    # Keep points from t=1/sampling_rate to t=1 for all segments.
-    # Create indices to keep: 0 (start of first seg), and then 1 to sampling_rate+1 for each segment
-    indices_to_keep = [0] # Keep the very first point
-    for i in range(num_segments):
-        start = i * num_points_per_segment + 1
-        end = start + sampling_rate # +1 for num_points, -1 because index starts at 1
-        indices_to_keep.extend(range(start, end + 1))
-        continue
+def sample_bezsegs(segments:np.ndarray, sampling_rate:int) -> np.ndarray:
+    """Generate sampled points from the segments numpy array using vectorized operations.
+    segments (np.ndarray): An (N-1) x 8 NumPy array [P0x, P0y, P1x, P1y, P2x, P2y, P3x, P3y]. 
+                           Also accept a batch of curves with the same number of segments (B, N-1, 8).
+    sampling_rate (int): Number of steps per segment (e.g., 1 gives start/end, 2 gives start/mid/end).
+    Returns a NumPy array of 2D points (num_segments * (sampling_rate + 1), 2), or (B, num_segments * (sampling_rate + 1), 2).
+    """
+
+    if (sampling_rate < 1): raise ValueError("sampling_rate must be at least 1")
 
-    # Ensure indices are within bounds (handles cases like sampling_rate=1 correctly)
-    indices_to_keep = [idx for idx in indices_to_keep if (idx < all_points.shape[0])]
-    sampled_points = all_points[indices_to_keep]
+    # Result shape: (..., num_segments, sampling_rate + 1, 2)
+    t = np.linspace(0, 1, sampling_rate + 1)
+    points = evaluate_bezsegs(segments, t)
+
+    # NOTE the points at segment junctions are present twice, at the end of a segment and at the start of the next one.
+    # (the previous implementation intended to remove them, but its indices ended up keeping all points)
+    sampled_points = points.reshape(*points.shape[:-3], -1, 2)
 
     return sampled_points
 
 
-def sample_bezsegs_with_t(segments:np.ndarray, sampling_rate:int) -> tuple[list, list]:
+def sample_bezsegs_with_t(segments:np.ndarray, sampling_rate:int) -> tuple[np.ndarray, np.ndarray]:
     """Generate an array of points **and** their corresponding t-values per segment, using vectorized operations.
     NOTE: This is an useful information to have in order to retrieve the t-value for a given x-coordinate for example.
     Args:
         segments (np.ndarray): An (N-1) x 8 NumPy array [P0x, P0y, P1x, P1y, P2x, P2y, P3x, P3y].
+                               Also accept a batch of curves with the same number of segments (B, N-1, 8).
         sampling_rate (int): Number of steps per segment (e.g., 1 gives start/end, 2 gives start/mid/end).
     Returns:
-        tuple[list[np.ndarray], list[np.ndarray]]:
-            - points_per_segment: List of numpy arrays sampled points per segments.
-            - t_values_per_segment: List of numpy arrays t-values per segments.
+        tuple[np.ndarray, np.ndarray]:
+            - points_per_segment: (..., N-1, sampling_rate + 1, 2) array of sampled points per segments.
+            - t_values_per_segment: (..., N-1, sampling_rate + 1) array of t-values per segments. 
+              NOTE it's a read-only broadcasted view, all segments share the same t-values.
     """
 
     if (sampling_rate < 1): raise ValueError("sampling_rate must be at least 1")
 
-    num_segments = segments.shape[0]
-    num_points_per_segment = sampling_rate + 1
     original_dtype = segments.dtype
 
-    # Extract control points for all segments
-    control_points = segments.reshape(num_segments, 4, 2)
-    P0 = control_points[:, 0, :][:, np.newaxis, :] # Shape (N, 1, 2)
-    P1 = control_points[:, 1, :][:, np.newaxis, :] # Shape (N, 1, 2)
-    P2 = control_points[:, 2, :][:, np.newaxis, :] # Shape (N, 1, 2)
-    P3 = control_points[:, 3, :][:, np.newaxis, :] # Shape (N, 1, 2)
-
     # Generate t values (parameterization)
-    t_1d = np.linspace(0, 1, num_points_per_segment, dtype=np.float64) # Use float64 for precision
-    # Reshape for broadcasting calculation
-    t = t_1d.reshape(1, num_points_per_segment, 1)
+    t_1d = np.linspace(0, 1, sampling_rate + 1, dtype=np.float64) # Use float64 for precision
 
-    # Calculate powers of t and (1-t)
-    omt = 1.0 - t
-    omt2 = omt * omt
-    omt3 = omt2 * omt
-    t2 = t * t
-    t3 = t2 * t
+    # Calculate points using float64, then potentially cast back if needed
+    # Result shape: (..., num_segments, num_points_per_segment, 2)
+    points = evaluate_bezsegs(segments.astype(np.float64), t_1d)
 
-    # Calculate points using the Bezier formula with broadcasting
-    # Result shape: (num_segments, num_points_per_segment, 2)
-    # Ensure calculation uses float64, then potentially cast back if needed
-    points = (P0.astype(np.float64) * omt3) + \
-             (P1.astype(np.float64) * 3.0 * omt2 * t) + \
-             (P2.astype(np.float64) * 3.0 * omt * t2) + \
-             (P3.astype(np.float64) * t3)
-    
     # Convert result back to original dtype if it was float32 or similar
     if (original_dtype != np.float64):
         points = points.astype(original_dtype)
 
-    # Populate lists using list comprehensions
-    # points_per_segment will be a list of (num_points_per_segment, 2) arrays
-    points_per_segment = [points[i] for i in range(num_segments)]
-    # t_values_per_segment will be a list of (num_points_per_segment,) arrays (all identical)
-    t_values_per_segment = [t_1d for _ in range(num_segments)]
+    t_values = np.broadcast_to(t_1d, points.shape[:-1])
 
-    return points_per_segment, t_values_per_segment
+    return points, t_values
 
 
 def casteljau_subdiv_bezsegs(segments:np.ndarray, t_map:np.ndarray, tolerance:float=1e-6) -> np.ndarray:
     """Batch numpy array subdivision of Bézier segments at t-values using the Casteljau algorithm.
     Args:
         segments (np.ndarray): An (N-1, 8) NumPy array of Bézier segments [P0x, P0y, P1x, P1y, P2x, P2y, P3x, P3y].
+                               Also accept a batch of curves with the same number of segments (B, N-1, 8).
         t_map (np.ndarray): An NumPy array of t-values (ranging from0.0 to 1.0) corresponding to each segment for subdivision.
-                            length of t_map should match length of segments.
+                            shape of t_map should match the shape of segments, without the last dimension.
                             Use 0 value for segments that should not be subdivided.
         tolerance (float): Tolerance of t-values near 0 or 1 for avoiding subdivision.
     Returns:
         np.ndarray: A new NumPy array containing all segments after subdivision operation.
+    NOTE batches are not ragged: all curves of a batch must be subdivided on the same segments,
+         a ValueError is raised otherwise. Subdivide the curves one by one if they differ.
     """
 
-    num_segments = segments.shape[0]
-    if (t_map.shape != (num_segments,)):
+    num_segments = segments.shape[-2]
+    if (t_map.shape != segments.shape[:-1]):
         raise ValueError(f"ERROR: casteljau_subdiv_bezsegs(): t_map must be an (N,) NumPy array, got shape {t_map.shape}")
 
-    control_points = segments.reshape(num_segments, 4, 2)
-    P0 = control_points[:, 0, :]
-    P1 = control_points[:, 1, :]
-    P2 = control_points[:, 2, :]
-    P3 = control_points[:, 3, :]
+    # failed to subdivide anything?
+    if (num_segments == 0):
+        print(f"WARNING: casteljau_subdiv_bezsegs(): No segments were subdivided.")
+        return None
+
+    P0, P1, P2, P3 = bezsegs_control_points(segments)
 
     # Perform Vectorized Calculation
-    t = np.clip(t_map, 0.0, 1.0).reshape(-1, 1)
+    t = np.clip(t_map, 0.0, 1.0)[...,np.newaxis]
     omt = 1.0 - t
     Q0 = P0 * omt + P1 * t
     Q1 = P1 * omt + P2 * t
@@ -629,29 +647,189 @@ def casteljau_subdiv_bezsegs(segments:np.ndarray, t_map:np.ndarray, tolerance:fl
 
     # Construct Potential Sub-segments
     # These arrays hold the potential results IF subdivision happens
-    potential_seg1 = np.concatenate((P0, Q0, R0, S), axis=1)
-    potential_seg2 = np.concatenate((S, R1, Q2, P3), axis=1)
+    potential_seg1 = np.concatenate((P0, Q0, R0, S), axis=-1)
+    potential_seg2 = np.concatenate((S, R1, Q2, P3), axis=-1)
 
     # Identify Segments to Subdivide
     subdivide_mask = (t_map > tolerance) & (t_map < 1.0 - tolerance) # Use original t_map for mask
 
+    # batched curves needs to be subdivided in the same manner, the output would be ragged otherwise.
+    if (subdivide_mask.ndim > 1):
+        if (not np.all(subdivide_mask == subdivide_mask.reshape(-1, num_segments)[0])):
+            raise ValueError("ERROR: casteljau_subdiv_bezsegs(): batched curves must be subdivided on the same segments")
+        subdivide_mask = subdivide_mask.reshape(-1, num_segments)[0]
+
     # Assemble the Output Array
-    new_segments = []
-    for i in range(num_segments):
-        if subdivide_mask[i]:
-            new_segments.append(potential_seg1[i])
-            new_segments.append(potential_seg2[i])
+    # each segment is replaced by either itself, or its two children
+    starts = get_subdivided_indices(subdivide_mask)
+    result_dtype = np.promote_types(segments.dtype, potential_seg2.dtype)
+    new_segments = np.empty((*segments.shape[:-2], num_segments + np.count_nonzero(subdivide_mask), 8), dtype=result_dtype)
+    new_segments[...,starts[~subdivide_mask],:] = segments[...,~subdivide_mask,:]
+    new_segments[...,starts[subdivide_mask],:] = potential_seg1[...,subdivide_mask,:]
+    new_segments[...,starts[subdivide_mask]+1,:] = potential_seg2[...,subdivide_mask,:]
+
+    return new_segments
+
+
+def get_subdivided_indices(subdivide_mask:np.ndarray) -> np.ndarray:
+    """get the indices of each original segment in the subdivided segments array,
+    when the segments of the given mask are split in two children."""
+
+    counts = 1 + subdivide_mask.astype(np.intp)
+    return np.cumsum(counts) - counts
+
+
+class CompiledBezsegs():
+    """Precomputed sampling and x->t inverse lookup tables of a bezier curve, in order to evaluate it 
+    at many x locations quickly. Don't instanciate it directly, use get_compiled_bezsegs(), 
+    the compiled curves are cached per curve content hash.
+    NOTE the arrays of a compiled curve are shared, don't modify them."""
+
+    def __init__(self, segments:np.ndarray, sampling_rate:int=100,):
+
+        num_segments = segments.shape[0]
+        self.segments = np.array(segments, dtype=np.float64)
+        self.sampling_rate = sampling_rate
+
+        # samples of each segments, (N, sampling_rate+1, 2) and (N, sampling_rate+1)
+        self.points, self.t_values = sample_bezsegs_with_t(self.segments, sampling_rate)
+        self.x_min = self.points[...,0].min(axis=-1)
+        self.x_max = self.points[...,0].max(axis=-1)
+
+        # inverse lookup table of the whole curve, x -> (segment, t).
+        # NOTE the x samples are forced to be non-decreasing, for a non-monotonic curve the lookup is an approximation.
+        self.lut_x = np.maximum.accumulate(self.points[...,0].ravel())
+        self.lut_seg = np.repeat(np.arange(num_segments), sampling_rate + 1)
+        self.lut_t = self.t_values.ravel()
+
+        self._lengths = None
+
+    @property
+    def lengths(self) -> np.ndarray:
+        """the length of each segments (N,), measured from the samples"""
+        if (self._lengths is None):
+            self._lengths = np.linalg.norm(np.diff(self.points, axis=-2), axis=-1).sum(axis=-1)
+        return self._lengths
+
+    def evaluate(self, seg_idx:np.ndarray, t:np.ndarray, axis:int=None) -> np.ndarray:
+        """evaluate the points (M,2), or only one of their axis (M,), of the given segments indices at the given t-values"""
+
+        P0, P1, P2, P3 = bezsegs_control_points(self.segments[seg_idx])
+        if (axis is not None):
+            P0, P1, P2, P3 = P0[...,axis], P1[...,axis], P2[...,axis], P3[...,axis]
         else:
-            new_segments.append(segments[i])
+            t = t[...,np.newaxis]
+        omt = 1.0 - t
+        return (P0 * omt**3) + (P1 * 3.0 * omt**2 * t) + (P2 * 3.0 * omt * t**2) + (P3 * t**3)
+
+    def refine_t(self, seg_idx:np.ndarray, x:np.ndarray, t:np.ndarray, t_lo:np.ndarray, t_hi:np.ndarray,
+        tolerance:float=1e-12, max_iterations:int=60,) -> np.ndarray:
+        """refine the t-values estimations of the given x locations, within their [t_lo, t_hi] brackets.
+        Safeguarded Newton iterations: a step leaving the bracket is replaced by a bisection, and the bracket shrinks
+        on each iteration, until the x error is below the tolerance. Converges on x-monotonic segments."""
+
+        P0, P1, P2, P3 = (P[...,0] for P in bezsegs_control_points(self.segments[seg_idx]))
+        t, t_lo, t_hi = (np.array(a, dtype=np.float64) for a in np.broadcast_arrays(t, t_lo, t_hi))
+        active = np.arange(len(t))
+
+        for _ in range(max_iterations):
+            a0, a1, a2, a3, ta = P0[active], P1[active], P2[active], P3[active], t[active]
+            omt = 1.0 - ta
+            err = (a0 * omt**3) + (a1 * 3.0 * omt**2 * ta) + (a2 * 3.0 * omt * ta**2) + (a3 * ta**3) - x[active]
+            deriv = 3.0 * ((omt**2 * (a1 - a0)) + (2.0 * omt * ta * (a2 - a1)) + (ta**2 * (a3 - a2)))
+
+            # the solution is on the left of t if we are past x
+            lo = np.where(err < 0, ta, t_lo[active])
+            hi = np.where(err < 0, t_hi[active], ta)
+
+            safe = np.abs(deriv) > 1e-300
+            newton = ta - np.divide(err, deriv, out=np.zeros_like(err), where=safe)
+            bisect = (~safe) | (newton <= lo) | (newton >= hi)
+            t_new = np.where(bisect, (lo + hi) / 2, newton)
+
+            done = (np.abs(err) <= tolerance) | ((hi - lo) <= 1e-15)
+            t[active] = np.where(done, ta, t_new)
+            t_lo[active], t_hi[active] = lo, hi
+
+            active = active[~done]
+            if (not len(active)):
+                break
+            continue
 
-    # failed to subdivide anything?
-    if (not new_segments):
-        print(f"WARNING: casteljau_subdiv_bezsegs(): No segments were subdivided.")
-        return None
+        return t
 
-    # Determine appropriate dtype (original or float if potential_seg2 was involved)
-    result_dtype = np.promote_types(segments.dtype, potential_seg2.dtype)
-    return np.array(new_segments, dtype=result_dtype)
+    def segments_t_at_x(self, xlocation:float) -> tuple[np.ndarray, np.ndarray]:
+        """find the t-value equivalent to the given x-location on each segment.
+        Returns a tuple of arrays (in_range (N,) mask of the segments reaching the x-location, t-values (N,))"""
+
+        sampled_pts_x = self.points[...,0]
+        in_range = (self.x_min <= xlocation) & (xlocation <= self.x_max)
+
+        # nearest sample, then refined between its neighbouring samples
+        idx = np.argmin(np.abs(sampled_pts_x - xlocation), axis=-1)
+        t_values = self.t_values[0] if len(idx) else np.zeros(1)
+        t = self.refine_t(np.arange(len(idx)), np.full(len(idx), xlocation, dtype=np.float64), t_values[idx],
+            t_lo=t_values[np.maximum(idx - 1, 0)], t_hi=t_values[np.minimum(idx + 1, self.sampling_rate)],)
+
+        return in_range, t
+
+    def y_at_x(self, x:np.ndarray) -> np.ndarray:
+        """evaluate the y values of the curve at the given x locations (M,), the curve is extended horizontally"""
+
+        x = np.clip(np.asarray(x, dtype=np.float64), self.lut_x[0], self.lut_x[-1])
+
+        # find the lookup bracket of each x, [i0, i1]
+        i1 = np.clip(np.searchsorted(self.lut_x, x, side='left'), 1, len(self.lut_x) - 1)
+        i0 = i1 - 1
+        seg_idx = self.lut_seg[i1]
+
+        # linear estimation of t within the bracket, if the bracket straddle two segments, we start from t=0.
+        t0 = np.where(self.lut_seg[i0] == seg_idx, self.lut_t[i0], 0.0)
+        t1 = self.lut_t[i1]
+        x0, x1 = self.lut_x[i0], self.lut_x[i1]
+        dx = x1 - x0
+        frac = np.divide(x - x0, dx, out=np.ones_like(x), where=(dx > 0))
+        t = t0 + frac * (t1 - t0)
+
+        t = self.refine_t(seg_idx, x, t, t_lo=t0, t_hi=t1)
+
+        return self.evaluate(seg_idx, t, axis=1)
+
+
+# Least recently used cache of compiled curves {(hash, sampling_rate): CompiledBezsegs}
+COMPILED_BEZSEGS = OrderedDict()
+COMPILED_BEZSEGS_MAX = 128
+
+
+def get_compiled_bezsegs(segments:np.ndarray, sampling_rate:int=100,) -> CompiledBezsegs:
+    """get the compiled lookup tables of a curve, compiled once per curve content and kept in a LRU cache."""
+
+    key = (hash_bezsegs(segments), segments.shape, sampling_rate)
+
+    compiled = COMPILED_BEZSEGS.get(key)
+    if (compiled is not None):
+        COMPILED_BEZSEGS.move_to_end(key)
+        return compiled
+
+    compiled = COMPILED_BEZSEGS[key] = CompiledBezsegs(segments, sampling_rate=sampling_rate)
+    if (len(COMPILED_BEZSEGS) > COMPILED_BEZSEGS_MAX):
+        COMPILED_BEZSEGS.popitem(last=False)
+
+    return compiled
+
+
+def interpolate_bezsegs(segments:np.ndarray, x:np.ndarray, sampling_rate:int=100,) -> np.ndarray:
+    """Evaluate an interpolation curve at the given x locations, similar to what the blender curvemapping does.
+    Args:
+        segments (np.ndarray): An (N, 8) NumPy array of Bézier segments [P0x, P0y, P1x, P1y, P2x, P2y, P3x, P3y].
+                               The curve is expected to be monotonic on the x axis.
+        x (np.ndarray): The x locations to evaluate (M,). Outside of the curve bounds, the curve is extended horizontally.
+        sampling_rate (int): The density of the lookup table used for estimating 't' before refinement.
+    Returns:
+        np.ndarray: The y values (M,).
+    """
+
+    return get_compiled_bezsegs(segments, sampling_rate=sampling_rate).y_at_x(x)
 
 
 def cut_bezsegs(segments:np.ndarray, xlocation:float, sampling_rate:int=50, tolerance:float=1e-6,) -> np.ndarray:
@@ -663,6 +841,7 @@ def cut_bezsegs(segments:np.ndarray, xlocation:float, sampling_rate:int=50, tole
         2 Once an equivalent t-value is found we run the casteljau_subdiv_bezsegs() function to subdivide the segment.
     Args:
         segments (np.ndarray): An (N, 8) NumPy array of Bézier segments [P0x, P0y, P1x, P1y, P2x, P2y, P3x, P3y].
+                               Also accept a batch of curves with the same number of segments (B, N, 8).
         xlocation (float): The target x-coordinate for subdivision.
         sampling_rate (int): The density used by sample_bezsegs_with_t to generate points for estimating 't'. 
                              Higher values increase accuracy but cost more computation upfront.
@@ -670,67 +849,36 @@ def cut_bezsegs(segments:np.ndarray, xlocation:float, sampling_rate:int=50, tole
         np.ndarray: A new NumPy array containing all resulting segments after
                     subdivision. Shape will be (M, 8) where N <= M <= 2*N.
                     Returns the original array if no subdivisions occur.
+    NOTE batches are not ragged: the xlocation must cross the same segments in all curves of a batch,
+         ex: curves sharing their knots x locations. A ValueError is raised otherwise, see casteljau_subdiv_bezsegs().
     """
 
     if sampling_rate < 1: raise ValueError("sampling_rate must be at least 1")
 
-    num_segments = segments.shape[0]
+    # 1. find the t-values equivalent to our target x-location, might match multiple segments
+    # the segments not reaching the target x-location are skipped. see CompiledBezsegs.segments_t_at_x()
+    # NOTE each segment is solved on its own, a batch is compiled as one flat list of segments,
+    # so a curve is cut at the same t-values alone or in a batch.
+    flat = segments.reshape(-1, segments.shape[-1])
+    in_range, estimated_t = get_compiled_bezsegs(flat, sampling_rate=sampling_rate).segments_t_at_x(xlocation)
+    in_range, estimated_t = in_range.reshape(segments.shape[:-1]), estimated_t.reshape(segments.shape[:-1])
 
-    # 1. Sample points and t-values for estimation
-    points_per_segment, t_values_per_segment = sample_bezsegs_with_t(segments, sampling_rate)
+    # 2. mark for subdivision, use t=0 where no subdivision is needed
+    subdivide_mask = in_range & (tolerance < estimated_t) & (estimated_t < (1.0 - tolerance))
+    t_map = np.where(subdivide_mask, estimated_t, 0.0)
 
-    if (len(points_per_segment) != num_segments) or (len(t_values_per_segment) != num_segments):
-        print(f"WARNING: Mismatch between segment count and sampling results. This should not happen.")
-        return None
-
-    # 2. Initialize the t-map for subdivision
-    t_map = np.zeros(num_segments, dtype=np.float64)
-    # Track which segments is being subdivided
-    subdivide_mask = np.zeros(num_segments, dtype=bool)
-
-    # 3. find the t-values equivalent to our target x-location, might match multiple segments
-    for i in range(num_segments):
-        sampled_pts_x, sampled_ts = points_per_segment[i][:, 0], t_values_per_segment[i]
-
-        # if we have no points or t-values, skip this segment
-        if ((sampled_pts_x.size==0) or (sampled_ts.size==0)):
-            continue
-
-        # if we have no points or t-values, skip this segment
-        min_x, max_x = np.min(sampled_pts_x), np.max(sampled_pts_x)
-        if (xlocation < min_x) or (xlocation > max_x):
-            continue
-
-        # find the t-value equivalent to our target x-location
-        idx = np.argmin(np.abs(sampled_pts_x - xlocation))
-        estimated_t = sampled_ts[idx]
-
-        # mark for subdivision
-        if (tolerance < estimated_t < (1.0 - tolerance)):
-            t_map[i] = estimated_t
-            subdivide_mask[i] = True
-        continue
-
-    # 4. Call the batch subdivision function
-    # Use the t_map where subdivision is needed, otherwise t=0 (no split)
+    # 3. Call the batch subdivision function
     segments = casteljau_subdiv_bezsegs(segments, t_map, tolerance=tolerance)
 
-    # 5. Adjust x-coordinate of the new anchor points
+    # 4. Adjust x-coordinate of the new anchor points
     # Ensure we modify a float array copy
     segments = segments.astype(float, copy=True)
-    output_idx = 0
-    for i in range(num_segments):
-        if subdivide_mask[i]: # Check if this original segment *was* actually split
-            # Adjust P3x of first child segment
-            segments[output_idx, 6] = xlocation
-            # Adjust P0x of second child segment
-            segments[output_idx + 1, 0] = xlocation
-            # Move output index past the two children
-            output_idx += 2
-            continue
-        # Move output index past the single original segment
-        output_idx += 1
-        continue
+    if (subdivide_mask.ndim > 1):
+        subdivide_mask = subdivide_mask.reshape(-1, subdivide_mask.shape[-1])[0]
+    starts = get_subdivided_indices(subdivide_mask)[subdivide_mask]
+    # Adjust P3x of first child segment, and P0x of second child segment
+    segments[...,starts,6] = xlocation
+    segments[...,starts+1,0] = xlocation
 
     return segments
 
@@ -886,15 +1034,11 @@ def get_bezsegs_length(segments:np.ndarray, sampling_rate:int=100) -> np.ndarray
         float: The total length of the curve.
     """
     points_per_segment, _ = sample_bezsegs_with_t(segments, sampling_rate)
-    lengths = []
-    for pts in points_per_segment:
-        # Compute differences between consecutive sample points
-        diffs = np.diff(pts, axis=0)
-        # Euclidean distances for each subinterval
-        seg_len = np.linalg.norm(diffs, axis=1).sum()
-        lengths.append(seg_len)
-        continue
-    return np.array(lengths), np.sum(lengths)
+    # Compute differences between consecutive sample points
+    diffs = np.diff(points_per_segment, axis=-2)
+    # Euclidean distances for each subinterval
+    lengths = np.linalg.norm(diffs, axis=-1).sum(axis=-1)
+    return lengths, lengths.sum(axis=-1)
 
 
 def subdiv_project_bezsegs(segments:np.ndarray, segsref:np.ndarray, tolerance:float=1e-6,) -> tuple[np.ndarray, np.ndarray]:
@@ -912,9 +1056,10 @@ def subdiv_project_bezsegs(segments:np.ndarray, segsref:np.ndarray, tolerance:fl
         return None
 
     # 1. Unrolling both curves into the x axis. Is equal to calculating their cumulative length.
-    # get the lengths of our segments/total curve
-    segO_lengths, segO_total_length = get_bezsegs_length(segments)
-    segR_lengths, segR_total_length = get_bezsegs_length(segsref)
+    # get the lengths of our segments/total curve, from their compiled samples
+    segO_lengths = get_compiled_bezsegs(segments).lengths.copy()
+    segR_lengths = get_compiled_bezsegs(segsref).lengths
+    segO_total_length, segR_total_length = segO_lengths.sum(), segR_lengths.sum()
 
     # we fit their lengths range together, so work on the same x range.
     segO_lengths *= (segR_total_length / segO_total_length)
@@ -1045,22 +1190,24 @@ def subdiv_project_bezsegs(segments:np.ndarray, segsref:np.ndarray, tolerance:fl
 #     return segsMod
 
 
-def lerp_bezsegs(segsA:np.ndarray, segsB:np.ndarray, mixfac:float, cut_precision:int=100, tolerance:float=1e-6) -> np.ndarray:
-    """
-    Interpolates linearly between two Bézier curve segment arrays.
-    If the number of segments differs, new segments will be added at similar X locations.
-    Args:
-        segsA, segsB (np.ndarray): curves to mix in format (N, 8) NumPy array [P0x, P0y, P1x, P1y, P2x, P2y, P3x, P3y].
-        mixfac (float): The mixing factor (0.0 returns segsA, 1.0 returns segsB).
-        cut_precision (int): Sampling rate used by subdiv_project_bezsegs if alignment is needed.
-        tolerance (float): Tolerance for comparing mixfac to 0 and 1, and used internally by subdiv_project_bezsegs.
-    Returns:
-        np.ndarray: The resulting mixed Bézier curve as an (L, 8) NumPy array.
-                    L will be the length of segsA/segsB after potential matching.
-    """
+# Least recently used cache of aligned curves pairs {(hashA, hashB, tolerance): (alignedA, alignedB) or None}
+ALIGNED_BEZSEGS = OrderedDict()
+ALIGNED_BEZSEGS_MAX = 64
 
-    # Clamp mixfac just in case it's slightly outside [0, 1] after tolerance check
-    mixfac = np.clip(mixfac, 0.0, 1.0)
+
+def align_bezsegs(segsA:np.ndarray, segsB:np.ndarray, tolerance:float=1e-6) -> tuple[np.ndarray, np.ndarray]:
+    """Subdivide two curves so they share the same number of segments, at similar X locations.
+    The alignment only depends on the two curves, it is computed once per pair and kept in a LRU cache.
+    NOTE the returned arrays are shared with the cache, don't modify them.
+    Returns a tuple of arrays (alignedA, alignedB) with the same (L, 8) shape, or None if the alignment failed."""
+
+    key = (hash_bezsegs(segsA), segsA.shape, hash_bezsegs(segsB), segsB.shape, tolerance)
+
+    if (key in ALIGNED_BEZSEGS):
+        ALIGNED_BEZSEGS.move_to_end(key)
+        return ALIGNED_BEZSEGS[key]
+
+    r = (segsA.astype(float), segsB.astype(float))
 
     # Ensure Curves have the same numbers of segments by subdivide in place at key X locations.
     if (segsA.shape[0] != segsB.shape[0]):
@@ -1068,33 +1215,61 @@ def lerp_bezsegs(segsA:np.ndarray, segsB:np.ndarray, mixfac:float, cut_precision
             # Call subdiv_project_bezsegs, this will cut new segments, so we have the same number of segments.
             NsegsA = subdiv_project_bezsegs(segsA, segsB, tolerance=tolerance,)
             NsegsB = subdiv_project_bezsegs(segsB, segsA, tolerance=tolerance,)
-            segsA, segsB = NsegsA, NsegsB
+            r = (NsegsA.astype(float), NsegsB.astype(float))
             # Verify matching worked (should have same length now)
-            if (segsA.shape[0] != segsB.shape[0]):
-                 print(f"ERROR: internal subdiv_project_bezsegs() failed to return segments of same knots length. Cannot mix. len{segsA.shape[0]} with len{segsB.shape[0]}")
-                 return None
+            if (NsegsA.shape[0] != NsegsB.shape[0]):
+                 print(f"ERROR: internal subdiv_project_bezsegs() failed to return segments of same knots length. Cannot mix. len{NsegsA.shape[0]} with len{NsegsB.shape[0]}")
+                 r = None
         except Exception as e:
             print(f"ERROR: during subdiv_project_bezsegs in lerp_bezsegs: {e}.")
-            return None
+            r = None
+
+    ALIGNED_BEZSEGS[key] = r
+    if (len(ALIGNED_BEZSEGS) > ALIGNED_BEZSEGS_MAX):
+        ALIGNED_BEZSEGS.popitem(last=False)
+
+    return r
 
-    # Handle Edge Cases for mixfac
-    if (abs(mixfac - 0.0) < tolerance):
-        return segsA
-    if (abs(mixfac - 1.0) < tolerance):
-        return segsB
+
+def lerp_bezsegs(segsA:np.ndarray, segsB:np.ndarray, mixfac, cut_precision:int=100, tolerance:float=1e-6) -> np.ndarray:
+    """
+    Interpolates linearly between two Bézier curve segment arrays.
+    If the number of segments differs, new segments will be added at similar X locations, see align_bezsegs().
+    Args:
+        segsA, segsB (np.ndarray): curves to mix in format (N, 8) NumPy array [P0x, P0y, P1x, P1y, P2x, P2y, P3x, P3y].
+        mixfac (float or np.ndarray): The mixing factor (0.0 returns segsA, 1.0 returns segsB).
+                                      Pass an (M,) array of factors to evaluate many mixes at once.
+        cut_precision (int): Sampling rate used by subdiv_project_bezsegs if alignment is needed.
+        tolerance (float): Tolerance for comparing mixfac to 0 and 1, and used internally by subdiv_project_bezsegs.
+    Returns:
+        np.ndarray: The resulting mixed Bézier curve as an (L, 8) NumPy array, or (M, L, 8) for an array of factors.
+                    L will be the length of segsA/segsB after potential matching.
+    """
+
+    aligned = align_bezsegs(segsA, segsB, tolerance=tolerance)
+    if (aligned is None):
+        return None
+    segsA, segsB = aligned
 
     # Check for empty arrays after potential matching
     if (segsA.size == 0) or (segsB.size == 0):
          print("WARNING: One or both segment arrays are empty after matching. Returning empty.")
          return None
 
-    # Perform Optimized NumPy Lerp
-    try:
-        # Linear interpolation: result = A * (1 - factor) + B * factor. Ensure float.
-        mixed_segments = segsA.astype(float) * (1.0 - mixfac) + segsB.astype(float) * mixfac
-    except Exception as e:
-        print(f"ERROR: during segment interpolation: {e}.")
-        return None
+    # Clamp mixfac just in case it's slightly outside [0, 1] after tolerance check
+    mixfac = np.clip(mixfac, 0.0, 1.0)
+
+    # Handle Edge Cases for mixfac
+    if (mixfac.ndim == 0):
+        if (abs(mixfac - 0.0) < tolerance):
+            return segsA.copy()
+        if (abs(mixfac - 1.0) < tolerance):
+            return segsB.copy()
+
+    # Perform vectorized NumPy Lerp, for one or many factors at once.
+    # Linear interpolation: result = A * (1 - factor) + B * factor
+    mixfac = mixfac[...,np.newaxis,np.newaxis]
+    mixed_segments = segsA * (1.0 - mixfac) + segsB * mixfac
 
     return mixed_segments
 
@@ -1208,4 +1383,171 @@ def looped_offset_bezsegs(segments:np.ndarray, offset:float, cut_precision:int=1
     final_segments[:, 4] -= distance # P2x
     final_segments[:, 6] -= distance # P3x
 
-    return final_segments
\ No newline at end of file
+    return final_segments
+
+def _get_rect_intersection(point:np.ndarray, tangent:np.ndarray, width:float, height:float, epsilon:float=1e-6) -> tuple:
+    """get the first intersection of a ray with the borders of a (0,0)-(width,height) rectangle, clamped in the rectangle."""
+
+    P, T = point, tangent
+    min_t = float('inf')
+    intersect = (P[0], P[1]) # Default to original point
+
+    # Check Left/Right Edges (x = 0, x = width)
+    if abs(T[0]) > epsilon:
+        for edge_x in (0.0, width):
+            t = (edge_x - P[0]) / T[0]
+            y = P[1] + t * T[1]
+            if (t >= -epsilon) and (-epsilon <= y <= height + epsilon) and (t < min_t):
+                min_t = t
+                intersect = (edge_x, y)
+
+    # Check Bottom/Top Edges (y = 0, y = height)
+    if abs(T[1]) > epsilon:
+        for edge_y in (0.0, height):
+            t = (edge_y - P[1]) / T[1]
+            x = P[0] + t * T[0]
+            if (t >= -epsilon) and (-epsilon <= x <= width + epsilon) and (t < min_t):
+                min_t = t
+                intersect = (x, edge_y)
+
+    # Final clamp
+    return (min(max(intersect[0], 0.0), width), min(max(intersect[1], 0.0), height))
+
+
+def _get_squares_geometry(centers:np.ndarray, size:float) -> tuple[np.ndarray, np.ndarray]:
+    """get the vertices (4M,2) and triangles indices (2M,3) of squares of the given size, centered on the (M,2) centers."""
+
+    s = size / 2.0
+    corners = np.array(((-s, s), (s, s), (s, -s), (-s, -s)), dtype=np.float32)
+    vertices = (centers[:,np.newaxis,:] + corners).reshape(-1, 2)
+    starts = np.arange(len(centers), dtype=np.int32)[:,np.newaxis,np.newaxis] * 4
+    indices = (starts + np.array(((0, 1, 2), (0, 2, 3)), dtype=np.int32)).reshape(-1, 3)
+
+    return vertices, indices
+
+
+def bezsegs_preview_geometry(segments:np.ndarray, dimensions:tuple, bounds:tuple,
+    tick_interval:float=0.25, num_steps:int=20, anchor_size:float=0.0, handle_size:float=0.0,
+    draw_grid:bool=True, draw_fill:bool=True, draw_curve:bool=True, draw_anchor:bool=True, draw_handles:bool=True,
+    epsilon:float=1e-6,) -> dict:
+    """Generate the vertices needed to draw a preview of a curve in a rectangle.
+    The geometry is expressed in the local space of the rectangle, from its bottom left corner (0,0) to (width,height),
+    so it only needs to be offset & scaled to be drawn anywhere.
+    Args:
+        segments (np.ndarray): An (N, 8) NumPy array of Bézier segments, or None to only generate the rectangle.
+        dimensions (tuple): The (width, height) of the rectangle.
+        bounds (tuple): The ((xmin, ymin), (xmax, ymax)) data bounds mapped to the rectangle.
+        anchor_size, handle_size (float): Size of the anchors and handles squares, in the rectangle space.
+    Returns:
+        dict: {name: (primitive type, vertices (M,2) float32, indices or None)} of the elements to draw, among
+              'rectangle', 'grid', 'axis', 'border', 'fill', 'curve', 'handle_lines', 'handles', 'anchors'.
+    """
+
+    width, height = dimensions
+    (x_min, y_min), (x_max, y_max) = bounds
+    data_width = x_max - x_min
+    data_height = y_max - y_min
+
+    geometry = {}
+    rectangle = np.array(((0, height), (width, height), (width, 0), (0, 0)), dtype=np.float32)
+    geometry['rectangle'] = ('TRIS', rectangle, np.array(((0,1,2), (0,2,3)), dtype=np.int32))
+
+    def get_ticks(vmin, vmax):
+        """get the grid ticks between the bounds, skipping the zero axis (drawn separately) and zero boundaries"""
+        ticks = np.arange(np.ceil(vmin / tick_interval), np.floor((vmax + epsilon) / tick_interval) + 1) * tick_interval
+        skip = (np.abs(ticks) < epsilon) \
+            | ((abs(vmin) < epsilon) & (np.abs(ticks - vmin) < epsilon)) \
+            | ((abs(vmax) < epsilon) & (np.abs(ticks - vmax) < epsilon))
+        return ticks[~skip]
+
+    # Vertical & Horizontal Grid Lines
+    if (draw_grid) and (tick_interval > epsilon):
+        lines = []
+        if (abs(data_width) > epsilon):
+            xpos = (get_ticks(x_min, x_max) - x_min) / data_width * width
+            lines.append(np.stack((np.repeat(xpos, 2), np.tile((height, 0), len(xpos))), axis=-1))
+        if (abs(data_height) > epsilon):
+            ypos = (get_ticks(y_min, y_max) - y_min) / data_height * height
+            lines.append(np.stack((np.tile((0, width), len(ypos)), np.repeat(ypos, 2)), axis=-1))
+        if (lines):
+            geometry['grid'] = ('LINES', np.concatenate(lines).astype(np.float32), None)
+
+    # Y Axis (X=0) and X Axis (Y=0)
+    axis = []
+    if (x_min < -epsilon) and (x_max > epsilon):
+        x_zero = -x_min / data_width * width
+        axis += [(x_zero, height), (x_zero, 0)]
+    if (y_min < -epsilon) and (y_max > epsilon):
+        y_zero = -y_min / data_height * height
+        axis += [(0, y_zero), (width, y_zero)]
+    if (axis):
+        geometry['axis'] = ('LINES', np.array(axis, dtype=np.float32), None)
+
+    geometry['border'] = ('LINES', rectangle, np.array(((0,1), (1,2), (2,3), (3,0)), dtype=np.int32))
+
+    # Nothing else to draw?
+    if (segments is None) \
+        or (not isinstance(segments, np.ndarray)) \
+        or (segments.ndim != 2) \
+        or (segments.shape[1] != 8) \
+        or (segments.shape[0] == 0) \
+        or (width <= 0) or (height <= 0) \
+        or (abs(data_width) < epsilon) or (abs(data_height) < epsilon):
+        return geometry
+
+    # mapping from data to the rectangle space
+    origin = np.array((x_min, y_min), dtype=np.float64)
+    scale = np.array((width / data_width, height / data_height), dtype=np.float64)
+    points = (segments.reshape(-1, 4, 2) - origin) * scale # (N, 4, 2) [P0, P1, P2, P3]
+    curvepts = (get_compiled_bezsegs(segments, sampling_rate=num_steps).points.reshape(-1, 2) - origin) * scale
+
+    # Filled area under the curve, extended with the start/end tangents up to the rectangle borders.
+    if (draw_fill) and (len(curvepts) >= 2):
+
+        keep = np.ones(len(curvepts), dtype=bool)
+        keep[1:] = ~np.all(np.isclose(curvepts[1:], curvepts[:-1]), axis=1)
+        strip = curvepts[keep]
+
+        P0, P1 = points[0, 0], points[0, 1]
+        P2, P3 = points[-1, 2], points[-1, 3]
+        intersect_start = _get_rect_intersection(P0, P0 - P1, width, height)
+        intersect_end = _get_rect_intersection(P3, P3 - P2, width, height)
+
+        # a strip alternating bottom and top vertices
+        tops = np.concatenate(((intersect_start,), strip, (intersect_end,)))
+        bottoms = np.stack((tops[:,0], np.zeros(len(tops))), axis=-1)
+        vertices = np.stack((bottoms, tops), axis=1).reshape(-1, 2)
+        starts = np.arange(len(vertices) - 2, dtype=np.int32)[:,np.newaxis]
+        indices = [starts + np.arange(3, dtype=np.int32)]
+
+        # Corner Rectangles if Intersection Hit Top Edge
+        corners = []
+        if (abs(intersect_start[1] - height) < 1e-4) and (intersect_start[0] > epsilon):
+            corners.append(((0, 0), (0, height), (intersect_start[0], height), (intersect_start[0], 0)))
+        if (abs(intersect_end[1] - height) < 1e-4) and (intersect_end[0] < width - epsilon):
+            corners.append(((intersect_end[0], 0), (intersect_end[0], height), (width, height), (width, 0)))
+        for quad in corners:
+            indices.append(len(vertices) + np.array(((0,1,2), (0,2,3)), dtype=np.int32))
+            vertices = np.concatenate((vertices, quad))
+            continue
+
+        geometry['fill'] = ('TRIS', vertices.astype(np.float32), np.concatenate(indices))
+
+    # Curve Line
+    if (draw_curve) and (len(curvepts) >= 2):
+        geometry['curve'] = ('LINE_STRIP', curvepts.astype(np.float32), None)
+
+    # Handles lines (P0,P1) and (P2,P3) and their points
+    if (draw_handles):
+        geometry['handle_lines'] = ('LINES', points.reshape(-1, 2).astype(np.float32), None)
+        if (handle_size > 0):
+            vertices, indices = _get_squares_geometry(points[:, 1:3].reshape(-1, 2), handle_size)
+            geometry['handles'] = ('TRIS', vertices.astype(np.float32), indices)
+
+    # Anchor points, the first point and all segments ends.
+    if (draw_anchor) and (anchor_size > 0):
+        anchors = np.concatenate((points[:1, 0], points[:, 3]))
+        vertices, indices = _get_squares_geometry(anchors, anchor_size)
+        geometry['anchors'] = ('TRIS', vertices.astype(np.float32), indices)
+
+    return geometry
@@ -0,0 +1,92 @@
+# SPDX-FileCopyrightText: 2025 BD3D DIGITAL DESIGN (Dorian B.)
+#
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+# NOTE
+# this is a numpy library resolving the frames hierarchy of the nodes, the nodes absolute locations.
+# it should stay free of any bpy dependencies, so it can be used & tested outside of blender.
+# the nodes are only expected to support as_pointer(), parent, and their collection foreach_get('location').
+
+
+import numpy as np
+
+
+def compute_absolute_locations(locations:np.ndarray, parents:np.ndarray) -> np.ndarray:
+    """compute the absolute locations of nodes in one top-down pass over the frames hierarchy.
+    Each level of the hierarchy is resolved at once, from the root nodes to the deepest children.
+    Args:
+        locations (np.ndarray): The (N,2) locations of the nodes, relative to their parent.
+        parents (np.ndarray): The (N,) indices of the nodes parents, -1 if no parent.
+    Returns:
+        np.ndarray: The (N,2) absolute locations.
+    """
+
+    absolute = np.array(locations, dtype=np.float64).reshape(-1, 2)
+    parents = np.asarray(parents, dtype=np.int64)
+    resolved = (parents < 0)
+
+    while (not np.all(resolved)):
+        ready = (~resolved) & resolved[np.maximum(parents, 0)]
+        if (not np.any(ready)):
+            break #parenting loop? should not be possible.
+        absolute[ready] += absolute[parents[ready]]
+        resolved |= ready
+        continue
+
+    return absolute
+
+
+def get_nodes_parents_indices(nodes:list, indices:dict) -> np.ndarray:
+    """get the (N,) indices of the given nodes parents, -1 if no parent. indices is {node pointer: index}"""
+
+    return np.array([indices[n.parent.as_pointer()] if (n.parent is not None) else -1 for n in nodes], dtype=np.int64)
+
+
+def update_absolute_locations(nodes, memo:dict|None) -> dict:
+    """resolve the absolute locations of the given nodes collection, reusing the memo of a previous call if given.
+    When only a few nodes moved, only the parents of the moved nodes are read again.
+    Returns the memo {'count', 'pointers', 'indices', 'parents', 'locations', 'absolute'}, the absolute locations
+    being a (N,2) array in the nodes order."""
+
+    count = len(nodes)
+    locations = np.empty(count * 2, dtype=np.float32)
+    nodes.foreach_get('location', locations)
+    locations = locations.reshape(count, 2)
+
+    if (memo is not None) and (memo['count'] == count):
+        changed = np.flatnonzero(np.any(locations != memo['locations'], axis=1))
+        if (changed.size == 0):
+            return memo
+
+        # NOTE a node re-parented to a frame is moved to keep its place, only the moved nodes parents may have changed.
+        # all the moved nodes are checked first, a node replaced by another one makes the memo obsolete.
+        pointers, indices = memo['pointers'], memo['indices']
+        moved = [nodes[i] for i in changed.tolist()]
+        if any(n.as_pointer() != pointers[i] for i, n in zip(changed.tolist(), moved)):
+            memo = None
+
+        # a node parented to a frame we don't know about? the memo is obsolete as well.
+        elif any((n.parent is not None) and (n.parent.as_pointer() not in indices) for n in moved):
+            memo = None
+
+        else:
+            memo['parents'][changed] = get_nodes_parents_indices(moved, indices)
+
+    else:
+        memo = None
+
+    if (memo is None):
+        all_nodes = nodes[:]
+        pointers = [n.as_pointer() for n in all_nodes]
+        indices = {ptr:i for i,ptr in enumerate(pointers)}
+        memo = {
+            'count': count,
+            'pointers': pointers,
+            'indices': indices,
+            'parents': get_nodes_parents_indices(all_nodes, indices),
+            }
+
+    memo['locations'] = locations
+    memo['absolute'] = compute_absolute_locations(locations, memo['parents'])
+
+    return memo
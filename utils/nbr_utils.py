@@ -32,4 +32,95 @@ def map_positions(old_positions:np.array, old_bounds:tuple[Vector, Vector], new_
     new_positions = normalized * new_range + np.array([new_min.x, new_min.y])
     
     return new_positions
-    
\ No newline at end of file
+    
+
+class RingBuffer():
+    """Fixed-capacity numpy ring buffer of float rows. 
+    Once full, the oldest rows are overwritten, the memory footprint never grows."""
+
+    def __init__(self, capacity:int, width:int, dtype=np.float64,):
+        assert capacity>0, "RingBuffer(): capacity must be at least 1"
+        self.data = np.zeros((capacity, width), dtype=dtype)
+        self.capacity = capacity
+        self.head = 0 #index of the next row to be written
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def clear(self) -> None:
+        """forget all rows, the preallocated memory is kept"""
+        self.head = 0
+        self.count = 0
+        return None
+
+    def append(self, row) -> None:
+        """write a new row, overwriting the oldest one if the buffer is full"""
+        self.data[self.head] = row
+        self.head = (self.head + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+        return None
+
+    def pop(self) -> None:
+        """forget the newest row"""
+        if (self.count):
+            self.head = (self.head - 1) % self.capacity
+            self.count -= 1
+        return None
+
+    def last(self) -> np.ndarray:
+        """get the newest row"""
+        assert self.count, "RingBuffer.last(): buffer is empty"
+        return self.data[(self.head - 1) % self.capacity]
+
+    def resize(self, capacity:int) -> None:
+        """change the capacity of the buffer, the newest rows are kept"""
+        assert capacity>0, "RingBuffer.resize(): capacity must be at least 1"
+        rows = self.ordered()[-capacity:]
+        self.data = np.zeros((capacity, self.data.shape[1]), dtype=self.data.dtype)
+        self.data[:len(rows)] = rows
+        self.capacity = capacity
+        self.count = len(rows)
+        self.head = self.count % capacity
+        return None
+
+    def ordered(self) -> np.ndarray:
+        """get the rows in chronological order, oldest first. 
+        NOTE might be a view on the internal buffer, don't modify it."""
+        start = (self.head - self.count) % self.capacity
+        if (start + self.count <= self.capacity):
+            return self.data[start:start + self.count]
+        return np.concatenate((self.data[start:], self.data[:self.head]))
+
+
+def polyfit_at(x:np.ndarray, values:np.ndarray, degree:int=2, x_eval:float=None, weights:np.ndarray=None,) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Least-squares polynomial fit of 'values' (N,D) over 'x' (N,), all D columns are solved in one pass.
+    Optionally pass per-sample weights (N,) for a weighted fit.
+    Returns the fitted value, first and second derivatives (D,) evaluated at x_eval (defaults to the last x).
+    The degree is automatically lowered when there's not enough samples to fit it."""
+
+    x = np.asarray(x, dtype=np.float64)
+    values = np.asarray(values, dtype=np.float64)
+    if (x_eval is None):
+        x_eval = x[-1]
+
+    degree = max(1, min(degree, len(x)-1))
+
+    # centering on the evaluation point, so the derivatives are directly the fitted coefficients.
+    A = np.vander(x - x_eval, degree+1, increasing=True) #columns [1, dx, dx², ..]
+    if (weights is not None):
+        w = np.sqrt(np.asarray(weights, dtype=np.float64))[:,None]
+        A, values = A * w, values * w
+    coefs = np.linalg.lstsq(A, values, rcond=None)[0]
+
+    d0 = coefs[0]
+    d1 = coefs[1]
+    d2 = 2.0 * coefs[2] if (degree >= 2) else np.zeros_like(coefs[0])
+
+    return d0, d1, d2
+
+
+def polyfit_derivatives(x:np.ndarray, values:np.ndarray, degree:int=2, x_eval:float=None, weights:np.ndarray=None,) -> tuple[np.ndarray, np.ndarray]:
+    """Same as polyfit_at(), only returns the first and second derivatives (D,) evaluated at x_eval."""
+
+    return polyfit_at(x, values, degree=degree, x_eval=x_eval, weights=weights)[1:]
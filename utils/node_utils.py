@@ -12,12 +12,18 @@
 
 
 import bpy 
+import numpy as np
 
 from math import hypot
+from collections import deque
 from mathutils import Vector, Matrix, Quaternion
 
 from .draw_utils import get_dpifac
 from .fct_utils import ColorRGBA
+from .hierarchy_utils import (
+    get_nodes_parents_indices,
+    update_absolute_locations,
+)
 
 
 SOCK_AVAILABILITY_TABLE = {
@@ -107,94 +113,137 @@ def send_refresh_signal(socket):
     return None
 
 
-def socket_intersections(socket, direction:str='LEFT',) -> dict:
-    """ parcour a nodetree from a given socket with given direction. 
-    Will return a dictionary of colliding sockets and their links route.
-    Reroutes and muted nodes sockets are ignored along the way, except for dead end reroutes.
-    - direction: 'LEFT' or 'RIGHT'
-    - return function will return a dictionary of {socket: links}.
-    """
-
-    #TODO add support for muted node or links. 
-    # - should skip parcouring if muted node, and respect internal links system.
+def parcour_intersections(socket, direction:str, get_links, is_linked) -> dict:
+    """ parcour a nodetree from a given socket with given direction, see socket_intersections().
+    - get_links: a function (socket, direction) returning the unmuted links of a socket in the given direction.
+    - is_linked: a function (socket) checking if the socket has any links."""
 
     result = {}  # Will store final sockets and their links
-    visited_sockets = set()  # To avoid feedback loops
-    visited_links = []  # Store all visited links
-    
+    visited_sockets = {socket.as_pointer()}  # To avoid feedback loops
+
     # Start with the initial socket
-    sockets_to_process = [socket]
-    visited_sockets.add(socket)
+    sockets_to_process = deque((socket,))
 
     while sockets_to_process:
-        current_socket = sockets_to_process.pop(0)
+        current_socket = sockets_to_process.popleft()
 
-        # Get all links connected to this socket
-        match direction:
-            case 'LEFT': # Going left means we look at inputs, so we need links where current_socket is the to_socket
-                links = [link for link in current_socket.links if link.to_socket == current_socket]
-            case 'RIGHT': # Going right means we look at outputs, so we need links where current_socket is the from_socket
-                links = [link for link in current_socket.links if link.from_socket == current_socket]
-
-        for link in links:
-            
-            # ignore muted links
-            if (link.is_muted):
-                continue
-            
-            # Add link to visited links
-            visited_links.append(link)
+        for link in get_links(current_socket, direction):
 
             # Determine the next socket to process
             next_socket = link.from_socket if (direction == 'LEFT') else link.to_socket
 
             # Skip if we've already visited this socket
-            if (next_socket in visited_sockets):
+            ptr = next_socket.as_pointer()
+            if (ptr in visited_sockets):
                 continue
-            visited_sockets.add(next_socket)
+            visited_sockets.add(ptr)
 
             # Get the node of the next socket
             next_node = next_socket.node
+            next_socket_to_process = None
 
             # If it's a reroute node, continue traversing
             if (next_node.bl_idname == 'NodeReroute'):
-                # For reroute, add the socket to process
                 next_socket_to_process = next_node.inputs[0] if (direction == 'LEFT') else next_node.outputs[0]
-                # Check if this reroute leads nowhere (colliding reroute)
-                if (not next_socket_to_process.links):
-                    # This is a dead end
-                    if (next_socket not in result):
-                        result[next_socket] = []
-                    result[next_socket].append(link)
-                else:
-                    sockets_to_process.append(next_socket_to_process)
-                continue
-            
-            # if the node is muted, we need to follow the internal link, skip it..
-            if (next_node.mute):
+
+            # if the node is muted, we need to follow the internal link
+            elif (next_node.mute):
                 if (not next_node.internal_links):
                     continue
                 internal_link = next_node.internal_links[0]
-                # For reroute, add the socket to process
                 next_socket_to_process = internal_link.from_socket if (direction == 'LEFT') else internal_link.to_socket
-                # Check if this reroute leads nowhere (colliding reroute)
-                if (not next_socket_to_process.links):
-                    # This is a dead end
-                    if (next_socket not in result):
-                        result[next_socket] = []
-                    result[next_socket].append(link)
-                else:
-                    sockets_to_process.append(next_socket_to_process)
+
+            # Check if the reroute or muted node leads nowhere, if so it's a dead end, we collide with it.
+            if (next_socket_to_process is not None) and is_linked(next_socket_to_process):
+                sockets_to_process.append(next_socket_to_process)
                 continue
 
             # For non-reroute nodes, add the socket to result
             if (next_socket not in result):
                 result[next_socket] = []
             result[next_socket].append(link)
+            continue
 
     return result
 
 
+class NodeLinkIndex():
+    """Adjacency index of the links of a nodetree, {socket pointer: links}, built in one pass over the links.
+    Walking the graph with this index avoid filtering 'socket.links' for every visited socket.
+    The intersections found are memoized, reroutes and muted nodes are collapsed.
+    NOTE the index is a snapshot, it needs to be rebuilt if the links change. 
+    Build one per operation (evaluation pass, purge ect..) and share it between all graph walks of that operation."""
+
+    def __init__(self, node_tree):
+        self.node_tree = node_tree
+        self.links_to = {}   # {socket pointer: [unmuted links going into this socket]}
+        self.links_from = {} # {socket pointer: [unmuted links going out of this socket]}
+        self.all_links_to = {}   # same, muted links included
+        self.all_links_from = {}
+        self.memo = {}       # memoized intersections {(socket pointer, direction): {socket: links}}
+
+        for link in node_tree.links:
+            fromptr, toptr = link.from_socket.as_pointer(), link.to_socket.as_pointer()
+            self.all_links_to.setdefault(toptr, []).append(link)
+            self.all_links_from.setdefault(fromptr, []).append(link)
+            if (link.is_muted):
+                continue
+            self.links_to.setdefault(toptr, []).append(link)
+            self.links_from.setdefault(fromptr, []).append(link)
+            continue
+
+    def get_links(self, socket, direction:str='LEFT', include_muted:bool=False,) -> list:
+        """get the links of a socket, either arriving from the left or leaving to the right"""
+
+        match direction:
+            case 'LEFT':  links = self.all_links_to if include_muted else self.links_to
+            case 'RIGHT': links = self.all_links_from if include_muted else self.links_from
+
+        return links.get(socket.as_pointer(), [])
+
+    def is_linked(self, socket) -> bool:
+        """check if the socket has any links, muted or not"""
+
+        ptr = socket.as_pointer()
+        return (ptr in self.all_links_to) or (ptr in self.all_links_from)
+
+    def intersections(self, socket, direction:str='LEFT',) -> dict:
+        """ parcour the nodetree from a given socket with given direction. 
+        Will return a dictionary of colliding sockets and their links route {socket: links}.
+        Reroutes and muted nodes sockets are ignored along the way, except for dead end reroutes.
+        NOTE the returned dict is memoized, don't modify it."""
+
+        memokey = (socket.as_pointer(), direction)
+        r = self.memo.get(memokey)
+        if (r is not None):
+            return r
+
+        result = parcour_intersections(socket, direction, self.get_links, self.is_linked)
+        self.memo[memokey] = result
+        return result
+
+
+def socket_intersections(socket, direction:str='LEFT', link_index:NodeLinkIndex=None,) -> dict:
+    """ parcour a nodetree from a given socket with given direction. 
+    Will return a dictionary of colliding sockets and their links route.
+    Reroutes and muted nodes sockets are ignored along the way, except for dead end reroutes.
+    - direction: 'LEFT' or 'RIGHT'
+    - link_index: pass a NodeLinkIndex to reuse it between many calls, otherwise the links are read locally from the sockets.
+    - return function will return a dictionary of {socket: links}.
+    """
+
+    if (link_index is not None):
+        return link_index.intersections(socket, direction=direction)
+
+    #one-off walk, only the visited sockets links are read
+    def get_links(sock, direction):
+        match direction:
+            case 'LEFT':  return [l for l in sock.links if (not l.is_muted) and (l.to_socket == sock)]
+            case 'RIGHT': return [l for l in sock.links if (not l.is_muted) and (l.from_socket == sock)]
+
+    return parcour_intersections(socket, direction, get_links, lambda sock: sock.is_linked)
+
+
 def get_node_objusers(node) -> set:
     """Return a list of objects using the given Node."""
     
@@ -227,6 +276,34 @@ def get_node_absolute_location(node) -> Vector:
     return Vector((x,y))
 
 
+# Absolute locations of the nodes of the nodetrees {node_tree pointer: memo dict}
+NODES_ABSOLUTE_LOCATIONS = {}
+
+
+def get_nodes_absolute_locations(node_tree) -> np.ndarray:
+    """get the absolute locations of all the nodes of a nodetree, as a (N,2) array, in the nodes order.
+    The locations are read in batch and resolved in one top-down pass, see compute_absolute_locations().
+    The result is memoized until the nodes locations change, then only the parents of the moved nodes are read again.
+    NOTE the returned array is shared, don't modify it in place."""
+
+    key = node_tree.as_pointer()
+    memo = NODES_ABSOLUTE_LOCATIONS.get(key)
+    if (memo is not None) and (memo['node_tree'] != node_tree):
+        memo = None
+
+    memo = NODES_ABSOLUTE_LOCATIONS[key] = update_absolute_locations(node_tree.nodes, memo)
+    memo['node_tree'] = node_tree
+
+    return memo['absolute']
+
+
+def clear_nodes_absolute_locations() -> None:
+    """forget all memoized absolute locations, should be done when the data is reloaded (undo, file load)"""
+
+    NODES_ABSOLUTE_LOCATIONS.clear()
+    return None
+
+
 def get_node_bounds(node) -> tuple[Vector, Vector]:
     """find the absolute bounds of the node in global space.
     will return the node bottom left and top right bounding 2d coords"""
@@ -243,6 +320,11 @@ def get_node_bounds(node) -> tuple[Vector, Vector]:
 def get_nodes_bounds(nodes) -> tuple[Vector, Vector]:
     """find the top right and bottom left bounds location a list of nodes"""
 
+    #all nodes of a nodetree? their bounds are already indexed.
+    if (hasattr(nodes, 'id_data') and len(nodes)):
+        bounds = get_node_spatial_index(nodes.id_data).bounds
+        return Vector(bounds[:,0].min(axis=0)), Vector(bounds[:,1].max(axis=0))
+
     locs = [loc for node in nodes for loc in get_node_bounds(node)]
     min_x, min_y = min(vec.x for vec in locs), min(vec.y for vec in locs)
     max_x, max_y = max(vec.x for vec in locs), max(vec.y for vec in locs)
@@ -250,6 +332,275 @@ def get_nodes_bounds(nodes) -> tuple[Vector, Vector]:
     return Vector((min_x, min_y)), Vector((max_x, max_y))
 
 
+class NodeSpatialIndex():
+    """Uniform grid index over the absolute bounds of the nodes of a nodetree, for point, rectangle and nearest queries.
+    Each node is binned in the grid cells its bounds overlap, queries only visit the cells in range.
+    The index is updated incrementally with 'refresh()': the nodes dimensions are read in batches with foreach_get(),
+    the absolute locations are taken from get_nodes_absolute_locations(), only the nodes whose bounds changed are re-binned.
+    NOTE don't build one yourself, use 'get_node_spatial_index()', the indexes are shared by all operators and draw routines."""
+
+    SNAPSHOT_PROPS = (('dimensions', 2), ('width', 1), ('height', 1),)
+    MAX_NODE_CELLS = 4096 #nodes overlapping more cells than this are not binned, but always tested.
+
+    def __init__(self, node_tree):
+        self.node_tree = node_tree
+        self.rebuild()
+
+    def read_bounds(self) -> np.ndarray:
+        """read the absolute bounds of all nodes in batches, as a (N,2,2) array, see get_node_bounds().
+        NOTE unlike get_node_bounds(), the nodes use their drawn width, collapsed nodes are drawn narrower than their width."""
+
+        nodes = self.node_tree.nodes
+        count = len(nodes)
+        buffers = []
+        for attr, size in self.SNAPSHOT_PROPS:
+            buf = np.empty(count * size, dtype=np.float32)
+            nodes.foreach_get(attr, buf)
+            buffers.append(buf.reshape(count, size).astype(np.float64))
+            continue
+        dimensions, width, height = buffers
+
+        # frames use their width & height with some margins, other nodes their drawn dimensions.
+        size = np.empty((count, 2), dtype=np.float64)
+        size[:,0] = np.where(self.is_frame, width[:,0] + 40, dimensions[:,0] / self.dpifac)
+        size[:,1] = np.where(self.is_frame, height[:,0] + 20, dimensions[:,1] / self.dpifac)
+
+        loc = get_nodes_absolute_locations(self.node_tree)
+        bounds = np.empty((count, 2, 2), dtype=np.float64)
+        bounds[:,0,0] = loc[:,0]
+        bounds[:,0,1] = loc[:,1] - size[:,1]
+        bounds[:,1,0] = loc[:,0] + size[:,0]
+        bounds[:,1,1] = loc[:,1]
+        return bounds
+
+    def rebuild(self) -> None:
+        """(re)build the whole index"""
+
+        self.nodes = self.node_tree.nodes[:]
+        self.pointers = [n.as_pointer() for n in self.nodes]
+        self.indices = {ptr:i for i,ptr in enumerate(self.pointers)}
+        self.is_frame = np.array([n.type == 'FRAME' for n in self.nodes], dtype=bool)
+        self.dpifac = get_dpifac()
+        self.bounds = self.read_bounds()
+
+        # cells about the size of a regular node, frames are usually much bigger.
+        sizes = (self.bounds[:,1] - self.bounds[:,0]).max(axis=1)
+        regular = sizes[~self.is_frame]
+        self.cell_size = max(float(np.median(regular)) if len(regular) else 200.0, 50.0)
+
+        self.cells = {}          #{(cell x, cell y): set of node indices}
+        self.node_cells = [None] * len(self.nodes)
+        self.oversized = set()
+        self.extent = None       #the cells range ever populated (ci1, cj1, ci2, cj2), never shrinks.
+        for i in range(len(self.nodes)):
+            self.insert(i)
+        return None
+
+    def get_cells_range(self, xmin, ymin, xmax, ymax) -> tuple:
+        """get the range of cells overlapped by the given rectangle"""
+
+        c = self.cell_size
+        return int(xmin // c), int(ymin // c), int(xmax // c), int(ymax // c)
+
+    def insert(self, i:int) -> None:
+        (xmin, ymin), (xmax, ymax) = self.bounds[i]
+        ci1, cj1, ci2, cj2 = self.get_cells_range(xmin, ymin, xmax, ymax)
+
+        if ((ci2 - ci1 + 1) * (cj2 - cj1 + 1) > self.MAX_NODE_CELLS):
+            self.oversized.add(i)
+            self.node_cells[i] = ()
+            return None
+
+        keys = [(ci, cj) for ci in range(ci1, ci2+1) for cj in range(cj1, cj2+1)]
+        for key in keys:
+            self.cells.setdefault(key, set()).add(i)
+        self.node_cells[i] = keys
+
+        if (self.extent is None):
+              self.extent = (ci1, cj1, ci2, cj2)
+        else: self.extent = (min(self.extent[0], ci1), min(self.extent[1], cj1), max(self.extent[2], ci2), max(self.extent[3], cj2))
+        return None
+
+    def remove(self, i:int) -> None:
+        self.oversized.discard(i)
+        for key in self.node_cells[i]:
+            cell = self.cells[key]
+            cell.discard(i)
+            if (not cell):
+                del self.cells[key]
+        self.node_cells[i] = ()
+        return None
+
+    def refresh(self) -> bool:
+        """update the index with the nodes changes, return True if anything changed"""
+
+        nodes = self.node_tree.nodes
+        if (len(nodes) != len(self.nodes)) or (get_dpifac() != self.dpifac):
+            self.rebuild()
+            return True
+
+        # the children of the moved frames are moved along, their bounds changed as well.
+        bounds = self.read_bounds()
+        changed = np.flatnonzero(np.any(bounds != self.bounds, axis=(1,2))).tolist()
+        if (not changed):
+            return False
+
+        # a node got replaced by another one? the index is obsolete.
+        if any(nodes[i].as_pointer() != self.pointers[i] for i in changed):
+            self.rebuild()
+            return True
+
+        for i in changed:
+            self.remove(i)
+            self.bounds[i] = bounds[i]
+            self.insert(i)
+            continue
+
+        return True
+
+    def query_rect_indices(self, xmin, ymin, xmax, ymax) -> set:
+        """get the indices of the nodes overlapping the given rectangle"""
+
+        ci1, cj1, ci2, cj2 = self.get_cells_range(xmin, ymin, xmax, ymax)
+
+        candidates = set(self.oversized)
+        if ((ci2 - ci1 + 1) * (cj2 - cj1 + 1) > len(self.cells)):
+            #big query, faster to visit the populated cells.
+            for (ci, cj), cell in self.cells.items():
+                if (ci1 <= ci <= ci2) and (cj1 <= cj <= cj2):
+                    candidates.update(cell)
+        else:
+            for ci in range(ci1, ci2+1):
+                for cj in range(cj1, cj2+1):
+                    cell = self.cells.get((ci, cj))
+                    if (cell):
+                        candidates.update(cell)
+
+        b = self.bounds
+        return {i for i in candidates if (b[i,0,0] <= xmax) and (b[i,1,0] >= xmin) and (b[i,0,1] <= ymax) and (b[i,1,1] >= ymin)}
+
+    def query_rect(self, xmin, ymin, xmax, ymax) -> list:
+        """get the nodes overlapping the given rectangle, in nodetree order"""
+
+        return [self.nodes[i] for i in sorted(self.query_rect_indices(xmin, ymin, xmax, ymax))]
+
+    def query_point(self, x, y) -> list:
+        """get the nodes under the given location, in nodetree order"""
+
+        return self.query_rect(x, y, x, y)
+
+    def get_bounds(self, node) -> tuple[Vector, Vector]:
+        """get the indexed absolute bounds of a node, see get_node_bounds()"""
+
+        (xmin, ymin), (xmax, ymax) = self.bounds[self.indices[node.as_pointer()]]
+        return Vector((xmin, ymin)), Vector((xmax, ymax))
+
+    def nearest(self, x, y, accept=None,):
+        """get the node nearest to the given location, measured from its corners and border middles.
+        Pass an accept(node)->bool function to filter the candidates. Return None if nothing is found."""
+
+        c = self.cell_size
+        ci, cj = int(x // c), int(y // c)
+
+        # the rings of cells that can contain nodes, given the grid extent
+        min_ring, max_ring = 0, -1
+        if (self.extent is not None):
+            ei1, ej1, ei2, ej2 = self.extent
+            min_ring = max(0, ei1 - ci, ci - ei2, ej1 - cj, cj - ej2)
+            max_ring = max(ci - ei1, ei2 - ci, cj - ej1, ej2 - cj)
+
+        best, best_dist = None, float('inf')
+        seen = set()
+
+        def visit(indices):
+            nonlocal best, best_dist
+            for i in indices:
+                if (i in seen):
+                    continue
+                seen.add(i)
+                node = self.nodes[i]
+                if (accept is not None) and (not accept(node)):
+                    continue
+                (x1, y1), (x2, y2) = self.bounds[i]
+                xm, ym = (x1 + x2) / 2, (y1 + y2) / 2
+                dist = min(hypot(x - px, y - py) for px, py in (
+                    (x1, y2), (x2, y2), (x1, y1), (x2, y1), (xm, y2), (xm, y1), (x1, ym), (x2, ym),))
+                if (dist < best_dist):
+                    best, best_dist = node, dist
+                continue
+            return None
+
+        visit(self.oversized)
+
+        # visit the rings of cells around the location, the nodes not met yet are at least (ring * cell_size) away.
+        for ring in range(min_ring, max_ring + 1):
+            if (best_dist <= (ring - 1) * c):
+                break
+            if (ring == 0):
+                  perimeter = ((ci, cj),)
+            else: perimeter = [(ri, cj + side) for side in (-ring, ring) for ri in range(ci - ring, ci + ring + 1)] \
+                            + [(ci + side, rj) for side in (-ring, ring) for rj in range(cj - ring + 1, cj + ring)]
+            for key in perimeter:
+                cell = self.cells.get(key)
+                if (cell):
+                    visit(cell)
+            continue
+
+        return best
+
+
+# Spatial indexes of the nodetrees {node_tree pointer: NodeSpatialIndex}
+NODE_SPATIAL_INDEXES = {}
+
+
+def get_node_spatial_index(node_tree) -> NodeSpatialIndex:
+    """get the spatial index of the nodetree nodes, built once and refreshed with the nodes changes"""
+
+    key = node_tree.as_pointer()
+    index = NODE_SPATIAL_INDEXES.get(key)
+    if (index is None) or (index.node_tree != node_tree):
+        index = NODE_SPATIAL_INDEXES[key] = NodeSpatialIndex(node_tree)
+    else:
+        index.refresh()
+    return index
+
+
+def clear_node_spatial_indexes() -> None:
+    """forget all spatial indexes, should be done when the data is reloaded (undo, file load)"""
+
+    NODE_SPATIAL_INDEXES.clear()
+    return None
+
+
+# the nodes properties impacting their drawing, with their number of values per node
+FINGERPRINT_PROPS = (
+    ('location', 2, np.float32),
+    ('dimensions', 2, np.float32),
+    ('width', 1, np.float32),
+    ('height', 1, np.float32),
+    ('color', 3, np.float32),
+    ('select', 1, bool),
+    ('mute', 1, bool),
+    ('hide', 1, bool),
+    ('use_custom_color', 1, bool),
+    )
+
+def get_nodes_fingerprint(nodes) -> tuple:
+    """get a cheap revision fingerprint of the nodes of a node_tree, read in batches with foreach_get().
+    The fingerprint changes if nodes are added/removed, moved, resized, recolored, selected, muted or hidden."""
+
+    count = len(nodes)
+    buffers = []
+    for attr, size, dtype in FINGERPRINT_PROPS:
+        buf = np.empty(count * size, dtype=dtype)
+        nodes.foreach_get(attr, buf)
+        buffers.append(buf.tobytes())
+        continue
+
+    active = nodes.active
+    return (count, hash(b''.join(buffers)), active.name if (active) else None, get_dpifac())
+
+
 def get_frame_children(frame) -> list:
     """get all children of a frame node"""
     assert frame.type == 'FRAME', "get_frame_children(): frame node expected"
@@ -791,68 +1142,34 @@ def frame_nodes(node_tree, *nodes, label:str="Frame",) -> None:
 
 def get_nearest_node_at_position(nodes:list|set, context, event, position=None, allow_reroute:bool=True, forbidden:list|set=None,):
     """get nearest node at cursor location"""
-    # Function from from 'node_wrangler.py'
+    # Function from from 'node_wrangler.py', the nodes are found with the nodetree spatial index.
 
-    nodes_near_mouse = []
-    nodes_under_mouse = []
-    target_node = None
+    if (not nodes):
+        return None
 
     x, y = position
+    nodes = nodes if hasattr(nodes, 'id_data') else set(nodes)
+    node_tree = nodes.id_data if hasattr(nodes, 'id_data') else next(iter(nodes)).id_data
+    index = get_node_spatial_index(node_tree)
 
-    # Make a list of each corner (and middle of border) for each node.
-    # Will be sorted to find nearest point and thus nearest node
-    node_points_with_dist = []
-
-    for n in nodes:
-        if (n.type == 'FRAME'):
-            continue
-        if (not allow_reroute and (n.type == 'REROUTE')):
-            continue
-        if (forbidden is not None) and (n in forbidden):
-            continue
-
-        locx, locy = get_node_absolute_location(n)
-        dimx, dimy = n.dimensions.x/get_dpifac(), n.dimensions.y/get_dpifac()
-
-        node_points_with_dist.append([n, hypot(x - locx, y - locy)])  # Top Left
-        node_points_with_dist.append([n, hypot(x - (locx + dimx), y - locy)])  # Top Right
-        node_points_with_dist.append([n, hypot(x - locx, y - (locy - dimy))])  # Bottom Left
-        node_points_with_dist.append([n, hypot(x - (locx + dimx), y - (locy - dimy))])  # Bottom Right
-
-        node_points_with_dist.append([n, hypot(x - (locx + (dimx / 2)), y - locy)])  # Mid Top
-        node_points_with_dist.append([n, hypot(x - (locx + (dimx / 2)), y - (locy - dimy))])  # Mid Bottom
-        node_points_with_dist.append([n, hypot(x - locx, y - (locy - (dimy / 2)))])  # Mid Left
-        node_points_with_dist.append([n, hypot(x - (locx + dimx), y - (locy - (dimy / 2)))])  # Mid Right
-
-        continue
-
-    nearest_node = sorted(node_points_with_dist, key=lambda k: k[1])[0][0]
-
-    for n in nodes:
+    def accept(n):
         if (n.type == 'FRAME'):
-            continue
+            return False
         if (not allow_reroute and (n.type == 'REROUTE')):
-            continue
+            return False
         if (forbidden is not None) and (n in forbidden):
-            continue
-
-        locx, locy = get_node_absolute_location(n)
-        dimx, dimy = n.dimensions.x/get_dpifac(), n.dimensions.y/get_dpifac()
-
-        if (locx <= x <= locx+dimx) and \
-           (locy-dimy <= y <= locy):
-               nodes_under_mouse.append(n)
-        continue
+            return False
+        if (type(nodes) is set) and (n not in nodes):
+            return False
+        return True
 
+    # the node under the mouse has priority, if there's only one.
+    nodes_under_mouse = [n for n in index.query_point(x, y) if accept(n)]
     if (len(nodes_under_mouse)==1):
+        return nodes_under_mouse[0]
 
-        if nodes_under_mouse[0] != nearest_node:
-              target_node = nodes_under_mouse[0]
-        else: target_node = nearest_node
-    else:
-        target_node = nearest_node
-
-    return target_node
+    # Otherwise the nearest node, measured from its corners and borders middle.
+    return index.nearest(x, y, accept=accept)
 
 
 def get_farest_node(node_tree, mode='BOTTOM_RIGHT',):
@@ -878,4 +1195,252 @@ def get_farest_node(node_tree, mode='BOTTOM_RIGHT',):
                     farest = node
                     max_x, min_y = x, y
 
-    return farest
\ No newline at end of file
+    return farest
+
+def count_layers_crossings(layers:list, layer_of:list, left_nbrs:list, ranks:list) -> int:
+    """count the links crossings between each pair of adjacent layers, links spanning more layers are ignored.
+    The crossings are the inversions of the links sorted by their left end, counted with a fenwick tree in O(E log V)."""
+
+    crossings = 0
+
+    for l in range(1, len(layers)):
+        pairs = sorted((ranks[n], ranks[i]) for i in layers[l] for n in left_nbrs[i] if (layer_of[n] == l - 1))
+        tree = [0] * (len(layers[l]) + 1)
+        for seen, (_, r) in enumerate(pairs):
+            #count the previous links ending strictly below this one
+            k, below = r + 1, 0
+            while (k > 0):
+                below += tree[k]
+                k -= k & -k
+            crossings += seen - below
+            k = r + 1
+            while (k < len(tree)):
+                tree[k] += 1
+                k += k & -k
+            continue
+        continue
+
+    return crossings
+
+
+def place_layer_centers(desired:list, heights:list, ygap:float) -> list:
+    """find the vertical centers of the ordered nodes of a layer, closest to their desired centers (least squares),
+    keeping their order from top to bottom without overlaps. Solved in O(n) with the pool adjacent violators algorithm:
+    offsetting each center by the separations above it turns the constraints into a non-increasing sequence."""
+
+    offsets, acc = [], 0.0
+    for k in range(len(desired)):
+        if (k > 0):
+            acc += heights[k - 1] / 2 + ygap + heights[k] / 2
+        offsets.append(acc)
+        continue
+
+    blocks = [] #[sum, count] of the pooled values
+    for d, o in zip(desired, offsets):
+        blocks.append([d + o, 1])
+        while (len(blocks) > 1) and (blocks[-2][0] / blocks[-2][1] < blocks[-1][0] / blocks[-1][1]):
+            s, c = blocks.pop()
+            blocks[-1][0] += s
+            blocks[-1][1] += c
+        continue
+
+    centers = []
+    for s, c in blocks:
+        centers.extend([s / c] * c)
+
+    return [z - o for z, o in zip(centers, offsets)]
+
+
+def compute_layered_layout(sizes:np.ndarray, edges:list, order_hint:np.ndarray=None, xgap:float=70, ygap:float=30, sweeps:int=4,) -> np.ndarray:
+    """Sugiyama style layered layout of a directed graph, flowing from left to right, in O((N+E) log N) per sweep.
+    1- the cycles are broken, the nodes are layered by their longest path to a sink, the outputs on the rightmost layer.
+    2- the nodes order within the layers is found by barycentric sweeps, the order with the fewest crossings is kept.
+    3- the layers are spaced by their widest node, the nodes centers are aligned with their neighbors without overlaps.
+    Args:
+        sizes (np.ndarray): The (N,2) width and height of the nodes.
+        edges (list): The (from index, to index) pairs.
+        order_hint (np.ndarray): The (N,) initial order of the nodes within their layer, ex: their -y location.
+    Returns:
+        np.ndarray: The (N,2) top left locations of the nodes, the top left corner of the layout at (0,0).
+    """
+
+    count = len(sizes)
+    if (count == 0):
+        return np.empty((0, 2), dtype=np.float64)
+
+    sizes = np.asarray(sizes, dtype=np.float64).reshape(-1, 2)
+    if (order_hint is None):
+        order_hint = np.arange(count)
+
+    succ = [[] for _ in range(count)]
+    pred = [[] for _ in range(count)]
+    for a, b in set(edges):
+        if (a != b):
+            succ[a].append(b)
+            pred[b].append(a)
+        continue
+
+    # 1- topological order, a node of a cycle is forced when stuck, its links looping back are ignored for the layering.
+    indegree = [len(p) for p in pred]
+    queue = deque(i for i in range(count) if (indegree[i] == 0))
+    topo_rank = [-1] * count
+    topo, forced = [], 0
+
+    while (len(topo) < count):
+        if (not queue):
+            while (topo_rank[forced] != -1):
+                forced += 1
+            queue.append(forced)
+        i = queue.popleft()
+        if (topo_rank[i] != -1):
+            continue
+        topo_rank[i] = len(topo)
+        topo.append(i)
+        for j in succ[i]:
+            indegree[j] -= 1
+            if (indegree[j] == 0) and (topo_rank[j] == -1):
+                queue.append(j)
+        continue
+
+    depth = [0] * count
+    for i in reversed(topo):
+        for j in succ[i]:
+            if (topo_rank[j] > topo_rank[i]) and (depth[j] + 1 > depth[i]):
+                depth[i] = depth[j] + 1
+        continue
+
+    maxdepth = max(depth)
+    layer_of = [maxdepth - d for d in depth]
+    layers = [[] for _ in range(maxdepth + 1)]
+    for i in sorted(range(count), key=lambda i: (order_hint[i], i)):
+        layers[layer_of[i]].append(i)
+
+    left_nbrs = [[n for n in (*pred[i], *succ[i]) if (layer_of[n] < layer_of[i])] for i in range(count)]
+    right_nbrs = [[n for n in (*pred[i], *succ[i]) if (layer_of[n] > layer_of[i])] for i in range(count)]
+
+    # 2- crossing reduction, positions are normalized around the layer middle, layers of different sizes face each other.
+    ranks = [0] * count
+    positions = [0.0] * count
+
+    def update_layer(nodes):
+        half = (len(nodes) - 1) / 2
+        for r, i in enumerate(nodes):
+            ranks[i], positions[i] = r, r - half
+        return None
+
+    for nodes in layers:
+        update_layer(nodes)
+
+    best_crossings = count_layers_crossings(layers, layer_of, left_nbrs, ranks)
+    best_layers = [nodes[:] for nodes in layers]
+
+    for sweep in range(sweeps):
+        if (best_crossings == 0):
+            break
+
+        forward = (sweep % 2 == 0)
+        nbrs = left_nbrs if forward else right_nbrs
+        for l in (range(1, len(layers)) if forward else range(len(layers) - 2, -1, -1)):
+            bary = {i: (sum(positions[n] for n in nbrs[i]) / len(nbrs[i])) if nbrs[i] else positions[i] for i in layers[l]}
+            layers[l].sort(key=lambda i: (bary[i], positions[i]))
+            update_layer(layers[l])
+            continue
+
+        crossings = count_layers_crossings(layers, layer_of, left_nbrs, ranks)
+        if (crossings < best_crossings):
+            best_crossings = crossings
+            best_layers = [nodes[:] for nodes in layers]
+        continue
+
+    layers = best_layers
+
+    # 3- coordinates, the nodes are first stacked, then pulled toward the centers of their neighbors, layer by layer.
+    heights = sizes[:,1].tolist()
+    centers = [0.0] * count
+    for nodes in layers:
+        for i, c in zip(nodes, place_layer_centers([0.0] * len(nodes), [heights[i] for i in nodes], ygap)):
+            centers[i] = c
+        continue
+
+    for sweep in range(sweeps):
+        forward = (sweep % 2 == 0)
+        for nodes in (layers if forward else reversed(layers)):
+            desired = []
+            for i in nodes:
+                nbrs = left_nbrs[i] + right_nbrs[i]
+                desired.append((sum(centers[n] for n in nbrs) / len(nbrs)) if nbrs else centers[i])
+                continue
+            for i, c in zip(nodes, place_layer_centers(desired, [heights[i] for i in nodes], ygap)):
+                centers[i] = c
+            continue
+        continue
+
+    columns = np.array([sizes[nodes, 0].max() for nodes in layers], dtype=np.float64)
+    columns_x = np.concatenate(([0.0], np.cumsum(columns + xgap)[:-1]))
+
+    locations = np.empty((count, 2), dtype=np.float64)
+    locations[:,0] = columns_x[layer_of]
+    locations[:,1] = np.array(centers) + sizes[:,1] / 2
+    locations[:,1] -= locations[:,1].max()
+
+    return locations
+
+
+def arrange_nodes_layered(node_tree, nodes=None, xgap:float=70, ygap:float=30, sweeps:int=4,) -> None:
+    """arrange the nodes of a nodetree with compute_layered_layout(), the links flowing from left to right.
+    - nodes: the nodes to arrange, all nodes by default. Frames are never arranged, they follow their children.
+    The arrangement top left corner stays where the top left corner of the arranged nodes was,
+    the locations of all the nodes are written at once with foreach_set()."""
+
+    all_nodes = node_tree.nodes[:]
+    indices = {n.as_pointer():i for i,n in enumerate(all_nodes)}
+    if (nodes is None):
+        nodes = all_nodes
+
+    arranged = [indices[n.as_pointer()] for n in nodes if (n.type != 'FRAME')]
+    if (not arranged):
+        return None
+    local = {j:i for i,j in enumerate(arranged)}
+
+    edges = []
+    for link in node_tree.links:
+        a = local.get(indices[link.from_node.as_pointer()])
+        b = local.get(indices[link.to_node.as_pointer()])
+        if (a is not None) and (b is not None):
+            edges.append((a, b))
+        continue
+
+    count = len(all_nodes)
+    dimensions = np.empty(count * 2, dtype=np.float32)
+    node_tree.nodes.foreach_get('dimensions', dimensions)
+    widths = np.empty(count, dtype=np.float32)
+    node_tree.nodes.foreach_get('width', widths)
+
+    sizes = np.empty((len(arranged), 2), dtype=np.float64)
+    sizes[:,0] = widths[arranged]
+    sizes[:,1] = dimensions.reshape(count, 2)[arranged, 1] / get_dpifac()
+
+    #NOTE the nodes dimensions are only known once drawn, the height of newly created nodes is estimated from their sockets.
+    for i in np.flatnonzero(sizes[:,1] <= 0).tolist():
+        n = all_nodes[arranged[i]]
+        sockets = sum(1 for s in (*n.inputs, *n.outputs) if (s.enabled and not s.hide))
+        sizes[i,1] = 30 if n.hide else 40 + 22 * sockets
+        continue
+
+    absolute = get_nodes_absolute_locations(node_tree)
+    layout = compute_layered_layout(sizes, edges, order_hint=-absolute[arranged, 1], xgap=xgap, ygap=ygap, sweeps=sweeps,)
+    layout[:,0] += absolute[arranged, 0].min()
+    layout[:,1] += absolute[arranged, 1].max()
+
+    # the children of frames are located relatively to their parent
+    parents = get_nodes_parents_indices([all_nodes[j] for j in arranged], indices)
+    parented = (parents >= 0)
+    layout[parented] -= absolute[parents[parented]]
+
+    locations = np.empty(count * 2, dtype=np.float32)
+    node_tree.nodes.foreach_get('location', locations)
+    locations = locations.reshape(count, 2)
+    locations[arranged] = layout
+    node_tree.nodes.foreach_set('location', locations.ravel())
+
+    return None
@@ -0,0 +1,134 @@
+# SPDX-FileCopyrightText: 2025 BD3D DIGITAL DESIGN (Dorian B.)
+#
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+# NOTE
+# this is a numpy library generating the vertices of 2D shapes, ready to be passed to gpu batches.
+# it should stay free of any bpy/gpu dependencies, so it can be used & tested outside of blender.
+
+
+import numpy as np
+
+
+def rectangles_geometry(bounds:np.ndarray, colors:np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Get the vertices of M filled rectangles, to draw them all in one 'TRIS' batch.
+    Args:
+        bounds (np.ndarray): An (M, 2, 2) array of rectangles [[x1, y1], [x2, y2]], bottom left and top right.
+        colors (np.ndarray): An (M, 4) array of RGBA colors, one per rectangle.
+    Returns:
+        tuple: (vertices (4M,2) float32, vertices colors (4M,4) float32, triangles indices (2M,3) int32)
+               the rectangles are drawn in the given order.
+    """
+
+    bounds = np.asarray(bounds, dtype=np.float32).reshape(-1, 2, 2)
+    count = len(bounds)
+
+    x1, y1 = bounds[:,0,0], bounds[:,0,1]
+    x2, y2 = bounds[:,1,0], bounds[:,1,1]
+
+    # corners in order (x1, y1), (x2, y1), (x1, y2), (x2, y2)
+    vertices = np.stack((
+        np.stack((x1, y1), axis=-1),
+        np.stack((x2, y1), axis=-1),
+        np.stack((x1, y2), axis=-1),
+        np.stack((x2, y2), axis=-1),
+        ), axis=1).reshape(-1, 2)
+
+    vcolors = np.repeat(np.asarray(colors, dtype=np.float32).reshape(-1, 4), 4, axis=0)
+
+    starts = np.arange(count, dtype=np.int32)[:,np.newaxis,np.newaxis] * 4
+    indices = (starts + np.array(((0, 1, 2), (1, 3, 2)), dtype=np.int32)).reshape(-1, 3)
+
+    return vertices, vcolors, indices
+
+
+def rectangles_outlines_geometry(bounds:np.ndarray, colors:np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Get the vertices of the outlines of M rectangles, to draw them all in one 'LINES' batch.
+    Args:
+        bounds (np.ndarray): An (M, 2, 2) array of rectangles [[x1, y1], [x2, y2]], bottom left and top right.
+        colors (np.ndarray): An (M, 4) array of RGBA colors, one per rectangle.
+    Returns:
+        tuple: (vertices (8M,2) float32, vertices colors (8M,4) float32)
+    """
+
+    bounds = np.asarray(bounds, dtype=np.float32).reshape(-1, 2, 2)
+
+    x1, y1 = bounds[:,0,0], bounds[:,0,1]
+    x2, y2 = bounds[:,1,0], bounds[:,1,1]
+
+    # the 4 edges, bottom, right, top, left
+    corners = [np.stack(c, axis=-1) for c in ((x1, y1), (x2, y1), (x2, y2), (x1, y2))]
+    vertices = np.stack((
+        corners[0], corners[1],
+        corners[1], corners[2],
+        corners[2], corners[3],
+        corners[3], corners[0],
+        ), axis=1).reshape(-1, 2)
+
+    vcolors = np.repeat(np.asarray(colors, dtype=np.float32).reshape(-1, 4), 8, axis=0)
+
+    return vertices, vcolors
+
+
+def headers_bounds(bounds:np.ndarray, heights:np.ndarray) -> np.ndarray:
+    """Get the bounds of headers of the given heights (M,), placed on top of the given (M, 2, 2) rectangles."""
+
+    headers = np.array(bounds, dtype=np.float32).reshape(-1, 2, 2)
+    headers[:,0,1] = headers[:,1,1] - heights
+
+    return headers
+
+
+def density_grid_geometry(bounds:np.ndarray, domain:np.ndarray, cell_size:float, color:tuple) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Bin M rectangles into a density grid covering the domain, and get the vertices of its non empty cells,
+    to draw them all in one 'TRIS' batch as a heatmap.
+    Args:
+        bounds (np.ndarray): An (M, 2, 2) array of rectangles [[x1, y1], [x2, y2]], bottom left and top right.
+        domain (np.ndarray): The [[x1, y1], [x2, y2]] rectangle covered by the grid.
+        cell_size (float): The size of the grid cells, in the same unit as the bounds.
+        color (tuple): The RGBA color of the densest cells, the others are faded by their density.
+    Returns:
+        tuple: (vertices (4C,2) float32, vertices colors (4C,4) float32, triangles indices (2C,3) int32)
+    """
+
+    bounds = np.asarray(bounds, dtype=np.float32).reshape(-1, 2, 2)
+    (dx1, dy1), (dx2, dy2) = np.asarray(domain, dtype=np.float32)
+
+    nx = max(1, int(np.ceil((dx2 - dx1) / cell_size)))
+    ny = max(1, int(np.ceil((dy2 - dy1) / cell_size)))
+
+    # the cells ranges [i1, i2[ overlapped by each rectangle, at least one cell each.
+    i1 = np.clip(np.floor((bounds[:,0,0] - dx1) / cell_size), 0, nx - 1).astype(np.int64)
+    j1 = np.clip(np.floor((bounds[:,0,1] - dy1) / cell_size), 0, ny - 1).astype(np.int64)
+    i2 = np.clip(np.ceil((bounds[:,1,0] - dx1) / cell_size), 0, nx).astype(np.int64)
+    j2 = np.clip(np.ceil((bounds[:,1,1] - dy1) / cell_size), 0, ny).astype(np.int64)
+    i2, j2 = np.maximum(i2, i1 + 1), np.maximum(j2, j1 + 1)
+
+    # NOTE the rectangles are rasterized in O(M + cells): we mark the corners of each rectangle in a
+    # difference grid, its two dimensional cumulative sum is the number of rectangles overlapping each cell.
+    grid = np.zeros((nx + 1, ny + 1), dtype=np.int64)
+    np.add.at(grid, (i1, j1), 1)
+    np.add.at(grid, (i2, j1), -1)
+    np.add.at(grid, (i1, j2), -1)
+    np.add.at(grid, (i2, j2), 1)
+    density = np.cumsum(np.cumsum(grid, axis=0), axis=1)[:nx,:ny]
+
+    ci, cj = np.nonzero(density)
+    if (len(ci) == 0):
+        return np.empty((0, 2), dtype=np.float32), np.empty((0, 4), dtype=np.float32), np.empty((0, 3), dtype=np.int32)
+
+    # the overlaps counts are faded logarithmically, a few dense zones would otherwise hide everything else.
+    counts = density[ci, cj]
+    weights = np.log1p(counts) / np.log1p(counts.max())
+
+    cells = np.empty((len(ci), 2, 2), dtype=np.float32)
+    cells[:,0,0] = dx1 + ci * cell_size
+    cells[:,0,1] = dy1 + cj * cell_size
+    cells[:,1,0] = np.minimum(cells[:,0,0] + cell_size, dx2)
+    cells[:,1,1] = np.minimum(cells[:,0,1] + cell_size, dy2)
+
+    colors = np.empty((len(ci), 4), dtype=np.float32)
+    colors[:,:3] = color[:3]
+    colors[:,3] = color[3] * (0.25 + 0.75 * weights)
+
+    return rectangles_geometry(cells, colors)